@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+"""Benchmarks single-band COG writing.
+
+Compares the previous writers with ``stactools.noaa_cdr.cog.write``:
+
+- two-pass: flip and roll the whole grid, write it to an uncompressed GTiff in a
+  ``MemoryFile``, then ``rasterio.shutil.copy`` to COG
+- one-pass: flip and roll the whole grid, stage it in a MEM dataset, then copy
+  to COG so the COG driver encodes it once
+- windowed: ``cog.write``, which stages the flipped and remapped grid in a MEM
+  dataset with windowed writes of views, without whole-grid copies
+
+Each write runs in a fresh process, so the reported peak RSS is the high-water
+mark of that process above the baseline measured just before the write.
+
+Usage:
+    scripts/benchmark_cog_write.py [--repeat N] [NETCDF VARIABLE]
+
+If no NetCDF is given, a synthetic 720x1440 grid (the OISST and WHOI shape) is
+used.
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import statistics
+import time
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy
+import rasterio
+import rasterio.shutil
+import xarray
+from numpy.typing import NDArray
+from rasterio import MemoryFile
+from stactools.noaa_cdr import cog
+from stactools.noaa_cdr.profile import BandProfile
+
+
+def flip_and_roll(values: NDArray[Any], profile: BandProfile) -> NDArray[Any]:
+    if profile.needs_vertical_flip:
+        values = numpy.flipud(values)
+    if profile.needs_longitude_remap:
+        values = numpy.roll(values, int(profile.width / 2), 1)
+    return values
+
+
+def two_pass_write(values: NDArray[Any], path: str, profile: BandProfile) -> None:
+    with MemoryFile() as memory_file:
+        with memory_file.open(**profile.gtiff()) as open_memory_file:
+            open_memory_file.write(flip_and_roll(values, profile), 1)
+            rasterio.shutil.copy(open_memory_file, path, **profile.cog())
+
+
+def one_pass_write(values: NDArray[Any], path: str, profile: BandProfile) -> None:
+    with rasterio.open("", "w", **{**profile.gtiff(), "driver": "MEM"}) as staging:
+        staging.write(flip_and_roll(values, profile), 1)
+        rasterio.shutil.copy(staging, path, **profile.cog())
+
+
+WRITERS: Dict[str, Callable[[NDArray[Any], str, BandProfile], None]] = {
+    "two-pass": two_pass_write,
+    "one-pass": one_pass_write,
+    "windowed": cog.write,
+}
+
+
+def load(netcdf: Optional[str], variable: Optional[str]) -> Tuple[Any, BandProfile]:
+    if netcdf is None:
+        ds = xarray.Dataset(
+            {
+                "sst": (
+                    ("time", "lat", "lon"),
+                    numpy.random.default_rng(42)
+                    .normal(15, 10, (1, 720, 1440))
+                    .astype("float32"),
+                    {"long_name": "Synthetic sea surface temperature"},
+                )
+            },
+            attrs={
+                "geospatial_lon_min": 0,
+                "geospatial_lon_max": 360,
+                "geospatial_lat_min": -90,
+                "geospatial_lat_max": 90,
+                "geospatial_lon_resolution": 0.25,
+                "geospatial_lat_resolution": 0.25,
+            },
+        )
+        variable = "sst"
+    else:
+        assert variable is not None
+        ds = xarray.open_dataset(netcdf, mask_and_scale=False)
+    profile = BandProfile.build(ds, variable)
+    values = numpy.ascontiguousarray(ds[variable].values.squeeze())
+    return values, profile
+
+
+def run(
+    writer: str,
+    netcdf: Optional[str],
+    variable: Optional[str],
+    queue: "multiprocessing.Queue[Tuple[float, int]]",
+) -> None:
+    values, profile = load(netcdf, variable)
+    with TemporaryDirectory() as temporary_directory:
+        path = os.path.join(temporary_directory, "out.tif")
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        WRITERS[writer](values, path, profile)
+        elapsed = time.perf_counter() - start
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, peak - baseline))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("netcdf", nargs="?")
+    parser.add_argument("variable", nargs="?")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{'writer':<22} {'time (s)':>10} {'peak RSS (MiB)':>16}")
+    for writer in WRITERS:
+        times: List[float] = []
+        peaks: List[int] = []
+        for _ in range(args.repeat):
+            queue = context.Queue()
+            process = context.Process(
+                target=run, args=(writer, args.netcdf, args.variable, queue)
+            )
+            process.start()
+            elapsed, peak = queue.get()
+            process.join()
+            times.append(elapsed)
+            peaks.append(peak)
+        print(
+            f"{writer:<22} {statistics.median(times):>10.3f} "
+            f"{statistics.median(peaks) / 1024:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
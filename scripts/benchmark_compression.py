@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+"""Benchmarks the COG compression profiles on each CDR's grid shape.
+
+For every grid and profile, a COG is written with
+``stactools.noaa_cdr.cog.write`` and read back in full. Throughput is measured
+against the raw (uncompressed) size of the grid.
+
+The grids are synthetic but shaped and typed like the real data: smooth
+fields with a little noise and a block of nodata, packed to the CDR's storage
+type.
+
+Usage:
+    scripts/benchmark_compression.py [--repeat N] [--profile NAME ...]
+"""
+
+import argparse
+import os
+import statistics
+import time
+from dataclasses import dataclass
+from tempfile import TemporaryDirectory
+from typing import Any, List
+
+import numpy
+import rasterio
+from numpy.typing import NDArray
+from pyproj import CRS
+from pystac.extensions.raster import DataType
+from rasterio import Affine
+from stactools.noaa_cdr import cog
+from stactools.noaa_cdr.compression import PROFILES, Compression
+from stactools.noaa_cdr.profile import BandProfile, DatasetProfile
+
+
+@dataclass
+class Grid:
+    name: str
+    height: int
+    width: int
+    dtype: DataType
+    nodata: Any
+    unit: str
+
+
+GRIDS = [
+    Grid("ocean-heat-content", 180, 360, DataType.FLOAT32, numpy.nan, "10^18 joules"),
+    Grid(
+        "sea-surface-temperature (OISST, WHOI)",
+        720,
+        1440,
+        DataType.INT16,
+        -999,
+        "degree Celsius",
+    ),
+    Grid("sea-ice-concentration (north)", 448, 304, DataType.UINT8, 255, "percent"),
+    Grid("sea-ice-concentration (south)", 332, 316, DataType.UINT8, 255, "percent"),
+]
+
+
+def values(grid: Grid) -> NDArray[Any]:
+    rng = numpy.random.default_rng(42)
+    y, x = numpy.mgrid[0 : grid.height, 0 : grid.width]
+    field = numpy.sin(x / 37) * numpy.cos(y / 23) + rng.normal(
+        0, 0.05, (grid.height, grid.width)
+    )
+    data: NDArray[Any]
+    if grid.dtype == DataType.FLOAT32:
+        data = field.astype("float32")
+    else:
+        info = numpy.iinfo(grid.dtype)
+        span = min(info.max, 10000) - max(info.min, 0) - 1
+        data = ((field + 1.2) / 2.4 * span + max(info.min, 0)).astype(grid.dtype)
+    data[: grid.height // 8, :] = grid.nodata
+    return data
+
+
+def profile(grid: Grid, compression: Compression) -> BandProfile:
+    dataset_profile = DatasetProfile(
+        xmin=-180,
+        xmax=180,
+        ymin=-90,
+        ymax=90,
+        epsg=4326,
+        crs=CRS("EPSG:4326"),
+        wkt2=None,
+        shape=[grid.height, grid.width],
+        transform=Affine(360 / grid.width, 0, -180, 0, -180 / grid.height, 90),
+        needs_longitude_remap=False,
+        needs_vertical_flip=False,
+    )
+    return BandProfile(
+        width=grid.width,
+        height=grid.height,
+        data_type=grid.dtype,
+        nodata=grid.nodata,
+        unit=grid.unit,
+        scale=None,
+        offset=None,
+        attrs={},
+        title=grid.name,
+        dataset_profile=dataset_profile,
+        variable="benchmark",
+        compression=compression,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--profile",
+        action="append",
+        type=Compression.parse,
+        help="A compression profile to benchmark (defaults to a representative set)",
+    )
+    args = parser.parse_args()
+    profiles: List[Compression] = args.profile or PROFILES
+
+    print(
+        f"{'grid':<40} {'profile':<20} {'encode MB/s':>12} {'decode MB/s':>12} "
+        f"{'bytes':>12} {'ratio':>7}"
+    )
+    with TemporaryDirectory() as temporary_directory:
+        path = os.path.join(temporary_directory, "benchmark.tif")
+        for grid in GRIDS:
+            data = values(grid)
+            megabytes = data.nbytes / 1e6
+            for compression in profiles:
+                band_profile = profile(grid, compression)
+                encode: List[float] = []
+                decode: List[float] = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    cog.write(data, path, band_profile)
+                    encode.append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    with rasterio.open(path) as dataset:
+                        dataset.read(1)
+                    decode.append(time.perf_counter() - start)
+                size = os.path.getsize(path)
+                print(
+                    f"{grid.name:<40} {str(compression):<20} "
+                    f"{megabytes / statistics.median(encode):>12.1f} "
+                    f"{megabytes / statistics.median(decode):>12.1f} "
+                    f"{size:>12} {data.nbytes / size:>7.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+"""Benchmarks creating metadata-only NetCDF items.
+
+The dataset path (opening each file as an ``xarray.Dataset``, as
+``stac.create_item`` used to) is compared with the attribute-only path
+(``attributes.read``, which reads just the HDF5 attributes and dimension
+sizes), and their items are checked to be identical.
+
+By default the files are the sea ice concentration test files; pass NetCDF
+files (e.g. yearly aggregates) to use those instead.
+
+Usage:
+    scripts/benchmark_item_metadata.py [--repeat N] [NETCDF ...]
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import xarray
+from stactools.noaa_cdr import attributes, stac
+from stactools.noaa_cdr.profile import DatasetProfile
+
+DATA_FILES = Path(__file__).parents[1] / "tests" / "data-files"
+
+
+def from_dataset(href: str) -> Dict[str, Any]:
+    with xarray.open_dataset(href, decode_times=False) as ds:
+        return stac._create_item(href, None, ds, DatasetProfile.build(ds)).to_dict()
+
+
+def from_attributes(href: str) -> Dict[str, Any]:
+    dataset_attributes = attributes.read(href)
+    return stac._create_item(
+        href, None, dataset_attributes, DatasetProfile.build(dataset_attributes)
+    ).to_dict()
+
+
+def measure(
+    function: Callable[[str], Dict[str, Any]], hrefs: List[str], repeat: int
+) -> float:
+    durations = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for href in hrefs:
+            function(href)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("netcdf", nargs="*", help="NetCDF files")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    hrefs = args.netcdf or sorted(str(path) for path in DATA_FILES.glob("*.nc"))
+
+    for href in hrefs:
+        if from_dataset(href) != from_attributes(href):
+            raise AssertionError(f"Items for {href} differ")
+    dataset_seconds = measure(from_dataset, hrefs, args.repeat)
+    attributes_seconds = measure(from_attributes, hrefs, args.repeat)
+    print(f"{len(hrefs)} files")
+    print(f"{'dataset':<12} {dataset_seconds * 1e3 / len(hrefs):>10.3f} ms/item")
+    print(
+        f"{'attributes':<12} {attributes_seconds * 1e3 / len(hrefs):>10.3f} ms/item "
+        f"({dataset_seconds / attributes_seconds:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+"""Benchmarks decoding the ocean heat content time axis.
+
+The scalar path (``add_months_to_datetime``, ``datetime_bounds``, and
+``as_str`` for every time step) is compared with the vectorized one
+(``add_months_to_datetimes``, ``datetime_bounds_array``, and
+``as_str_array``), and their results are checked to be identical.
+
+By default the axis is the monthly one, 207 mid-month offsets from January
+2005; pass a NetCDF file to use its ``time`` coordinate instead.
+
+Usage:
+    scripts/benchmark_time_decoding.py [--repeat N] [--length N] [NETCDF]
+"""
+
+import argparse
+import datetime
+import statistics
+import time
+from typing import Any, Callable, List, Tuple
+
+import numpy
+import xarray
+from numpy.typing import NDArray
+from stactools.noaa_cdr import time as noaa_cdr_time
+from stactools.noaa_cdr.ocean_heat_content.constants import BASE_TIME
+from stactools.noaa_cdr.time import TimeResolution
+
+Decoded = Tuple[
+    List[datetime.datetime],
+    List[datetime.datetime],
+    List[datetime.datetime],
+    List[str],
+]
+
+
+def scalar(months: NDArray[Any], time_resolution: TimeResolution) -> Decoded:
+    datetimes = list()
+    starts = list()
+    ends = list()
+    strings = list()
+    for month in months:
+        dt = noaa_cdr_time.add_months_to_datetime(BASE_TIME, month)
+        start, end = time_resolution.datetime_bounds(dt)
+        datetimes.append(dt)
+        starts.append(start)
+        ends.append(end)
+        strings.append(time_resolution.as_str(dt))
+    return datetimes, starts, ends, strings
+
+
+def vectorized(months: NDArray[Any], time_resolution: TimeResolution) -> Decoded:
+    datetimes = noaa_cdr_time.add_months_to_datetimes(BASE_TIME, months)
+    starts, ends = time_resolution.datetime_bounds_array(datetimes)
+    return (
+        [dt.replace(tzinfo=BASE_TIME.tzinfo) for dt in datetimes.tolist()],
+        starts.tolist(),
+        ends.tolist(),
+        time_resolution.as_str_array(datetimes).tolist(),
+    )
+
+
+def measure(
+    function: Callable[[NDArray[Any], TimeResolution], Decoded],
+    months: NDArray[Any],
+    time_resolution: TimeResolution,
+    repeat: int,
+) -> float:
+    durations = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(months, time_resolution)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("netcdf", nargs="?", help="An ocean heat content NetCDF file")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--length",
+        type=int,
+        default=207,
+        help="The number of monthly time steps, without a NetCDF file",
+    )
+    args = parser.parse_args()
+    if args.netcdf:
+        with xarray.open_dataset(args.netcdf, decode_times=False) as ds:
+            months = ds.time.values
+            time_resolution = TimeResolution.from_value(ds.time_coverage_resolution)
+    else:
+        months = numpy.arange(args.length) + 600.5
+        time_resolution = TimeResolution.Monthly
+
+    if scalar(months, time_resolution) != vectorized(months, time_resolution):
+        raise AssertionError("Vectorized results differ from the scalar results")
+    scalar_seconds = measure(scalar, months, time_resolution, args.repeat)
+    vectorized_seconds = measure(vectorized, months, time_resolution, args.repeat)
+    print(f"{len(months)} {time_resolution.to_interval()} time steps")
+    print(f"{'scalar':<12} {scalar_seconds * 1e3:>10.3f} ms")
+    print(
+        f"{'vectorized':<12} {vectorized_seconds * 1e3:>10.3f} ms "
+        f"({scalar_seconds / vectorized_seconds:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
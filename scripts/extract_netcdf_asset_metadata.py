@@ -7,6 +7,9 @@ it on the fly.
 
 Progress and status are printed to stderr, so you can redirect stdout to a file.
 
+Only the HDF5 metadata of each file is fetched, with HTTP Range requests, and
+files are read in several processes at once.
+
 Usage:
     scripts/extract_netcdf_asset_metadata.py > \
         src/stactools/noaa_cdr/ocean-heat-content/asset-metadata.json
@@ -17,19 +20,21 @@ import os.path
 import sys
 from typing import Dict
 
-import fsspec
 import stactools.noaa_cdr.ocean_heat_content
-import xarray
+from stactools.noaa_cdr import attributes
 from tqdm import tqdm
 
+WORKERS = 8
+
+hrefs = list(stactools.noaa_cdr.ocean_heat_content.iter_noaa_hrefs())
 metadata: Dict[str, Dict[str, str]] = {}
-for href in tqdm(list(stactools.noaa_cdr.ocean_heat_content.iter_noaa_hrefs())):
+for href, dataset_attributes in zip(
+    hrefs, tqdm(attributes.read_many(hrefs, workers=WORKERS), total=len(hrefs))
+):
     key = os.path.splitext(os.path.basename(href))[0]
-    with fsspec.open(href) as file:
-        with xarray.open_dataset(file, decode_times=False) as dataset:
-            metadata[key] = {
-                "title": dataset.title,
-                "description": dataset.summary,
-            }
+    metadata[key] = {
+        "title": dataset_attributes.title,
+        "description": dataset_attributes.summary,
+    }
 
 json.dump(metadata, sys.stdout, indent=4)
@@ -0,0 +1,184 @@
+"""The attributes and dimension sizes of a NetCDF file, without its data.
+
+Item metadata only needs a NetCDF file's global attributes, the attributes of
+its ``projection`` variable, and the sizes of its dimensions. Opening the file
+as an `xarray.Dataset` also reads and decodes its coordinates and builds their
+indexes, which is wasted work when no pixels are read. `DatasetAttributes`
+reads just the HDF5 metadata through h5netcdf, and can stand in for the
+dataset in `DatasetProfile.build` and `stac.create_item`.
+
+Remote HTTP(S) files are read with `remote.RangeFile`, which only fetches the
+blocks holding the HDF5 metadata, unless an up-to-date copy is in the cache.
+"""
+
+import functools
+import io
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Any, Dict, Iterator, Mapping, Optional, Sequence, Union
+
+import h5netcdf
+from stactools.core.io import ReadHrefModifier
+
+from . import remote
+from .cache import Cache, open_href
+
+# Attributes that xarray doesn't decode from bytes, which we mirror.
+UNDECODED_ATTRIBUTES = ["_FillValue", "missing_value"]
+
+
+class VariableAttributes:
+    """The attributes of a NetCDF variable, also available as attributes of
+    this object, like those of an `xarray.DataArray`."""
+
+    def __init__(self, attrs: Mapping[str, Any]) -> None:
+        """Creates the attributes of a variable.
+
+        Args:
+            attrs (Mapping[str, Any]): The attributes, decoded as xarray
+                decodes them.
+        """
+        self.attrs = dict(attrs)
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self.__dict__["attrs"][name]
+        except KeyError:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            )
+
+
+class DatasetAttributes(VariableAttributes):
+    """The global attributes, variable attributes, and dimension sizes of a
+    NetCDF file.
+
+    Like an `xarray.Dataset`, variables and then global attributes are
+    available as attributes of this object, e.g. ``attributes.title`` or
+    ``attributes.projection.proj4text``.
+    """
+
+    def __init__(
+        self,
+        attrs: Mapping[str, Any],
+        variables: Mapping[str, VariableAttributes],
+        sizes: Mapping[str, int],
+    ) -> None:
+        """Creates the attributes of a dataset.
+
+        Args:
+            attrs (Mapping[str, Any]): The global attributes.
+            variables (Mapping[str, VariableAttributes]): The attributes of
+                each variable, by name.
+            sizes (Mapping[str, int]): The size of each dimension, by name.
+        """
+        super().__init__(attrs)
+        self.variables = dict(variables)
+        self.sizes = dict(sizes)
+
+    @classmethod
+    def read(cls, file: Union[str, IO[bytes], io.IOBase]) -> "DatasetAttributes":
+        """Reads the attributes of a NetCDF4 (HDF5) file.
+
+        Args:
+            file (Union[str, IO[bytes], io.IOBase]): The path of the file,
+                or the open file.
+
+        Returns:
+            DatasetAttributes: The attributes.
+        """
+        with h5netcdf.File(file, "r") as f:
+            return cls(
+                attrs=_read_attributes(f),
+                variables={
+                    name: VariableAttributes(_read_attributes(variable))
+                    for name, variable in f.variables.items()
+                },
+                sizes={
+                    name: int(dimension.size)
+                    for name, dimension in f.dimensions.items()
+                },
+            )
+
+    def __getattr__(self, name: str) -> Any:
+        variables = self.__dict__.get("variables", {})
+        if name in variables:
+            return variables[name]
+        return super().__getattr__(name)
+
+
+def read(
+    href: str, read_href_modifier: Optional[ReadHrefModifier] = None
+) -> DatasetAttributes:
+    """Reads the attributes of a NetCDF4 file.
+
+    HTTP(S) files are read with Range requests, unless an up-to-date copy is
+    in the cache.
+    Other remote files are read through the cache, if one is configured.
+
+    Args:
+        href (str): The href of the file.
+        read_href_modifier (Optional[ReadHrefModifier]): A function to modify
+            the href before reading.
+
+    Returns:
+        DatasetAttributes: The attributes.
+    """
+    if read_href_modifier:
+        read_href = read_href_modifier(href)
+    else:
+        read_href = href
+    if remote.is_http(read_href):
+        cache = Cache.from_environment()
+        path = None if cache is None else cache.get(read_href, key=href)
+        if path is None:
+            with remote.RangeFile(read_href) as file:
+                return DatasetAttributes.read(file)
+        return DatasetAttributes.read(path)
+    with open_href(read_href, key=href) as file:
+        return DatasetAttributes.read(file)
+
+
+def read_many(
+    hrefs: Sequence[str],
+    workers: int = 1,
+    read_href_modifier: Optional[ReadHrefModifier] = None,
+) -> Iterator[DatasetAttributes]:
+    """Reads the attributes of many NetCDF4 files, ``workers`` at a time.
+
+    h5py serializes its reads, even of Python file objects, so the files are
+    read in a process pool rather than a thread pool.
+
+    Args:
+        hrefs (Sequence[str]): The hrefs of the files.
+        workers (int): The number of processes. With one, the files are read
+            in this process.
+        read_href_modifier (Optional[ReadHrefModifier]): A function to modify
+            each href before reading. It must be picklable if ``workers`` is
+            more than one.
+
+    Yields:
+        DatasetAttributes: The attributes of each file, in the order of
+        ``hrefs``.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    read_href = functools.partial(read, read_href_modifier=read_href_modifier)
+    if workers == 1:
+        yield from map(read_href, hrefs)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(read_href, hrefs)
+
+
+def _read_attributes(
+    h5netcdf_object: Union[h5netcdf.File, h5netcdf.Variable]
+) -> Dict[str, Any]:
+    attrs = dict()
+    for key, value in h5netcdf_object.attrs.items():
+        if key not in UNDECODED_ATTRIBUTES and isinstance(value, bytes):
+            try:
+                value = value.decode("utf-8")
+            except UnicodeDecodeError:
+                pass
+        attrs[key] = value
+    return attrs
@@ -0,0 +1,312 @@
+"""A local, size-capped, on-disk cache of remote NetCDF files.
+
+NetCDF files are HDF5 files, and reading one over HTTP turns into many small
+range requests, which every re-run pays for again. When a cache directory is
+configured, `open_href` downloads each remote file once, as a whole, and
+serves later reads from the local copy. Local files are never cached.
+
+The cache is configured with environment variables, so that it's shared by
+worker processes:
+
+- ``NOAA_CDR_CACHE_DIR``: The cache directory. No caching if unset.
+- ``NOAA_CDR_CACHE_SIZE``: The maximum size of the cache, in bytes. Defaults
+  to `DEFAULT_MAX_SIZE`.
+
+Each cached file's size, ETag, and Last-Modified, as available, are recorded
+in a hidden sidecar file (e.g. ``.<name>.json``). Every open checks them
+against the remote file's, with one HEAD request, and downloads the file again
+if it changed, since NOAA updates some files in place.
+
+When a new file pushes the cache over its size, the least recently used files
+are evicted. Files are filled through a temporary file and renamed into place,
+so concurrent processes never read a partial file.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+import fsspec
+from fsspec.utils import get_protocol
+
+from .download import read_sidecar, sidecar_path, write_sidecar
+
+CACHE_DIR_ENVIRONMENT_VARIABLE = "NOAA_CDR_CACHE_DIR"
+CACHE_SIZE_ENVIRONMENT_VARIABLE = "NOAA_CDR_CACHE_SIZE"
+DEFAULT_MAX_SIZE = 20 * 1024**3
+CHUNK_SIZE = 8 * 1024 * 1024
+TEMPORARY_SUFFIX = ".tmp"
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+FINGERPRINT_KEYS = [
+    "size",
+    "mtime",
+    "LastModified",
+    "last_modified",
+    "Last-Modified",
+    "ETag",
+    "etag",
+]
+
+logger = logging.getLogger(__name__)
+
+
+class Cache:
+    """A directory of whole-file copies of remote files, keyed by href."""
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        """Creates a cache, and its directory if it doesn't exist.
+
+        Args:
+            directory (str): The cache directory.
+            max_size (int): The maximum total size of the cached files, in
+                bytes. A single file larger than this is still cached, until
+                the next file is added.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_environment(cls) -> Optional["Cache"]:
+        """Returns the cache configured by the environment, if any.
+
+        Returns:
+            Optional[Cache]: The cache, or None if ``NOAA_CDR_CACHE_DIR``
+            isn't set.
+        """
+        directory = os.environ.get(CACHE_DIR_ENVIRONMENT_VARIABLE)
+        if not directory:
+            return None
+        size = os.environ.get(CACHE_SIZE_ENVIRONMENT_VARIABLE)
+        if size:
+            return cls(directory, parse_size(size))
+        else:
+            return cls(directory)
+
+    def path(self, key: str) -> str:
+        """Returns the path of the cached copy of a file.
+
+        Args:
+            key (str): The href of the file.
+
+        Returns:
+            str: The path, which might not exist.
+        """
+        digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{digest}-{os.path.basename(key)}")
+
+    def get(self, href: str, key: Optional[str] = None) -> Optional[str]:
+        """Returns the path of the cached copy of a file, if it's up to date,
+        without downloading it.
+
+        Args:
+            href (str): The href to check the file at.
+            key (Optional[str]): The href the file is cached under, if it's
+                different from ``href``.
+
+        Returns:
+            Optional[str]: The path, or None if the file isn't cached or has
+            changed.
+        """
+        path = self.path(key or href)
+        if self._is_current(path, source_fingerprint(href)):
+            return path
+        else:
+            return None
+
+    @contextmanager
+    def open(self, href: str, key: Optional[str] = None) -> Iterator[IO[bytes]]:
+        """Opens the cached copy of a file, downloading it on a miss.
+
+        Args:
+            href (str): The href to read the file from.
+            key (Optional[str]): The href to cache the file under, if it's
+                different from ``href`` (e.g. when ``href`` is signed).
+
+        Yields:
+            IO[bytes]: The open cached copy.
+        """
+        path = self.path(key or href)
+        fingerprint = source_fingerprint(href)
+        try:
+            file = self._open(href, path, fingerprint)
+        except FileNotFoundError:
+            # Evicted by another process between the fill and the open.
+            file = self._open(href, path, fingerprint)
+        with file:
+            yield file
+
+    def size(self) -> int:
+        """Returns the total size of the cached files, in bytes."""
+        return sum(size for _, _, size in self._entries())
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Removes the least recently used files until the cache fits in its
+        maximum size.
+
+        Args:
+            keep (Optional[str]): The path of a file that isn't removed, e.g.
+                the one that was just added.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if total <= self.max_size:
+                break
+            elif path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            else:
+                logger.debug(f"Evicted {path} from the cache")
+            try:
+                os.remove(sidecar_path(path))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _open(self, href: str, path: str, fingerprint: Dict[str, Any]) -> IO[bytes]:
+        if not self._is_current(path, fingerprint):
+            self._fill(href, path, fingerprint)
+        file = open(path, "rb")
+        # Marks the file as recently used, for eviction.
+        os.utime(path)
+        return file
+
+    def _is_current(self, path: str, fingerprint: Dict[str, Any]) -> bool:
+        if not os.path.exists(path):
+            return False
+        return read_sidecar(path) == fingerprint
+
+    def _fill(self, href: str, path: str, fingerprint: Dict[str, Any]) -> None:
+        logger.info(f"Caching {href} at {path}")
+        temporary_path = (
+            f"{path}.{os.getpid()}.{threading.get_ident()}{TEMPORARY_SUFFIX}"
+        )
+        try:
+            with fsspec.open(href) as source:
+                with open(temporary_path, "wb") as destination:
+                    shutil.copyfileobj(source, destination, CHUNK_SIZE)
+            os.replace(temporary_path, path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        # The fingerprint is taken before the download, so if the file
+        # changes during it, the next open downloads it again.
+        write_sidecar(path, fingerprint)
+        self.evict(keep=path)
+
+    def _entries(self) -> List[Tuple[float, str, int]]:
+        # (last used, path, size) of each cached file.
+        entries = list()
+        with os.scandir(self.directory) as iterator:
+            for entry in iterator:
+                if (
+                    not entry.is_file()
+                    or entry.name.endswith(TEMPORARY_SUFFIX)
+                    or entry.name.startswith(".")
+                ):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+
+def configure(directory: Optional[str], max_size: Optional[int] = None) -> None:
+    """Configures the cache used by `open_href`, in this process and in the
+    processes it starts.
+
+    Args:
+        directory (Optional[str]): The cache directory, or None to disable
+            caching.
+        max_size (Optional[int]): The maximum size of the cache, in bytes.
+            Defaults to `DEFAULT_MAX_SIZE`.
+    """
+    if directory:
+        os.environ[CACHE_DIR_ENVIRONMENT_VARIABLE] = directory
+    else:
+        os.environ.pop(CACHE_DIR_ENVIRONMENT_VARIABLE, None)
+    if max_size is None:
+        os.environ.pop(CACHE_SIZE_ENVIRONMENT_VARIABLE, None)
+    else:
+        os.environ[CACHE_SIZE_ENVIRONMENT_VARIABLE] = str(max_size)
+
+
+@contextmanager
+def open_href(href: str, key: Optional[str] = None) -> Iterator[IO[bytes]]:
+    """Opens a file for reading, through the configured cache if the file is
+    remote.
+
+    Args:
+        href (str): The href to read the file from.
+        key (Optional[str]): The href to cache the file under, if it's
+            different from ``href`` (e.g. when ``href`` is signed).
+
+    Yields:
+        IO[bytes]: The open file.
+    """
+    cache = Cache.from_environment()
+    if cache is not None and is_remote(href):
+        with cache.open(href, key) as file:
+            yield file
+    else:
+        with fsspec.open(href) as file:
+            yield file
+
+
+def source_fingerprint(href: str) -> Dict[str, Any]:
+    """Returns the size, modification time, and ETag of a file, as available.
+
+    Args:
+        href (str): The href of the file, local or remote.
+
+    Returns:
+        Dict[str, Any]: The fingerprint.
+    """
+    fs, path = fsspec.core.url_to_fs(href)
+    info = fs.info(path)
+    return dict((key, _to_json(info[key])) for key in FINGERPRINT_KEYS if key in info)
+
+
+def is_remote(href: str) -> bool:
+    """Returns True if an href isn't a local file."""
+    return get_protocol(href) not in ("file", "local")
+
+
+def parse_size(value: str) -> int:
+    """Parses a size in bytes, with an optional binary unit, e.g. ``512M`` or
+    ``20GiB``.
+
+    Args:
+        value (str): The size.
+
+    Returns:
+        int: The number of bytes.
+    """
+    text = value.strip().upper().removesuffix("B").removesuffix("I")
+    number, unit = text, ""
+    if text and text[-1] in SIZE_UNITS:
+        number, unit = text[:-1], text[-1]
+    try:
+        size = float(number) * SIZE_UNITS[unit]
+    except ValueError:
+        raise ValueError(f"Invalid size: {value}")
+    if size < 0:
+        raise ValueError(f"Invalid size: {value}")
+    return int(size)
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    else:
+        return str(value)
@@ -1,43 +1,144 @@
+import dataclasses
+import math
 import os
-from typing import Any, Dict, Type
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from enum import Enum
+from tempfile import TemporaryDirectory
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
 
-import fsspec
 import numpy
+import rasterio
 import rasterio.shutil
 import xarray
 from numpy.typing import NDArray
 from pystac import Asset
-from rasterio import MemoryFile
+from pystac.extensions.raster import DataType
+from rasterio.windows import Window
 
 from . import dataset
-from .profile import BandProfile
+from .compression import Compression, select_compression
+from .constants import BAND_ATTRIBUTE_NAME
+from .manifest import Manifest, ManifestEntry
+from .profile import BLOCKSIZE, BandProfile
+from .session import DatasetSession
+
+
+class Layout(str, Enum):
+    """How COGs are laid out for a NetCDF file with many time steps or
+    variables."""
+
+    Single = "single"
+    """One single-band COG per variable and time step."""
+
+    Time = "time"
+    """One COG per variable, with one band per time step."""
+
+    Variables = "variables"
+    """One COG per time step, with one band per variable."""
 
 
 def cogify(
     path: str,
     directory: str,
     band_profile_class: Type[BandProfile] = BandProfile,
+    workers: int = 1,
+    compression: Optional[Compression] = None,
+    variable_compression: Optional[Dict[str, Compression]] = None,
+    streaming: bool = False,
+    manifest: Optional[Manifest] = None,
+    session: Optional[DatasetSession] = None,
 ) -> Dict[str, Asset]:
+    """Creates one single-band COG per data variable in a NetCDF file.
+
+    Args:
+        path (str): The href of the NetCDF file.
+        directory (str): The directory in which to write the COGs.
+        band_profile_class (Type[BandProfile]): The band profile class to use
+            for each variable.
+        workers (int): The number of processes used to encode COGs. Variables
+            are read in this process and only their values are sent to the
+            workers. Defaults to 1, which writes in this process.
+        compression (Optional[Compression]): The compression profile for all
+            variables. Defaults to deflate.
+        variable_compression (Optional[Dict[str, Compression]]): Compression
+            profiles for specific variables, overriding ``compression``.
+        streaming (bool): Read and write each variable one block of rows at a
+            time with `write_streamed`, so memory use doesn't grow with the grid
+            size. Can't be combined with more than one worker.
+        manifest (Optional[Manifest]): If provided, COGs that the manifest
+            shows are up to date aren't re-written, and the written COGs are
+            recorded in it. When streaming, only the source fingerprint is
+            checked, since the values aren't read up front.
+        session (Optional[DatasetSession]): An open session for the file at
+            ``path``, to read from instead of opening the file again.
+
+    Returns:
+        Dict[str, Asset]: The COG assets, keyed by variable name, in the same
+            order as the variables in the NetCDF file.
+    """
+    if streaming and workers > 1:
+        raise ValueError("Streaming writes can't be used with more than one worker")
     os.makedirs(directory, exist_ok=True)
     file_name = os.path.splitext(os.path.basename(path))[0]
     assets = dict()
-    with fsspec.open(path) as file:
-        with xarray.open_dataset(file, mask_and_scale=False) as ds:
-            for variable in dataset.data_variable_names(ds):
-                profile = band_profile_class.build(ds, variable)
-                data = ds[variable]
+    with ExitStack() as stack:
+        if session is None:
+            session = stack.enter_context(DatasetSession(path))
+        ds = session.dataset
+        jobs = list()
+        entries: Dict[str, ManifestEntry] = dict()
+        dataset_profile = session.profile
+        for variable in dataset.data_variable_names(ds):
+            profile = band_profile_class.build(
+                ds,
+                variable,
+                compression=select_compression(
+                    variable, compression, variable_compression
+                ),
+                dataset_profile=dataset_profile,
+            )
+            cog_path = os.path.join(directory, f"{file_name}-{variable}.tif")
+            assets[variable] = profile.cog_asset(cog_path)
+            if manifest:
+                entry = manifest.entry(path, variable, None, [profile])
+                if manifest.is_current(cog_path, entry):
+                    continue
+                entries[cog_path] = entry
+            jobs.append((ds[variable], cog_path, profile))
+
+        def prepared() -> Iterator[Tuple[NDArray[Any], str, BandProfile]]:
+            for data, cog_path, profile in jobs:
                 values = data.values.squeeze()
-                if profile.needs_vertical_flip:
-                    values = numpy.flipud(values)
-                if profile.needs_longitude_remap:
-                    values = numpy.roll(values, int(profile.width / 2), 1)
-                path = os.path.join(directory, f"{file_name}-{variable}.tif")
-                write(
-                    values,
-                    path,
-                    profile,
-                )
-                assets[variable] = profile.cog_asset(path)
+                if manifest:
+                    entry = entries[cog_path].with_values([values])
+                    entries[cog_path] = entry
+                    if manifest.is_current(cog_path, entry):
+                        continue
+                yield values, cog_path, profile
+
+        if streaming:
+            for data, cog_path, profile in jobs:
+                write_streamed(data.squeeze(), cog_path, profile)
+        else:
+            write_all(prepared(), workers=workers)
+    if manifest:
+        for cog_path, entry in entries.items():
+            manifest.record(cog_path, entry)
+        manifest.save()
     return assets
 
 
@@ -46,7 +147,229 @@ def write(
     path: str,
     profile: BandProfile,
 ) -> None:
-    with MemoryFile() as memory_file:
-        with memory_file.open(**profile.gtiff()) as open_memory_file:
-            open_memory_file.write(values, 1)
-            rasterio.shutil.copy(open_memory_file, path, **profile.cog())
+    """Writes a single-band COG.
+
+    The values are staged in an in-memory (MEM driver) dataset, which holds the
+    raw pixels without any encoding, so the COG driver's copy is the only pass
+    that tiles, compresses, and builds overviews.
+
+    The profile's vertical flip and longitude remap are applied while staging:
+    the values are written in blocks of rows, taken from the other end of the
+    array when flipping, and each block goes out as two windows when remapping.
+    No flipped or rolled copy of the whole grid is made.
+
+    Args:
+        values (NDArray[Any]): The two-dimensional array of values, as stored
+            in the NetCDF file.
+        path (str): The output path.
+        profile (BandProfile): The band profile.
+    """
+    with rasterio.open("", "w", **{**profile.gtiff(), "driver": "MEM"}) as staging:
+        for window, block in windows(values, profile):
+            staging.write(block, 1, window=window)
+        rasterio.shutil.copy(staging, path, **profile.cog())
+
+
+def windows(
+    values: NDArray[Any], profile: BandProfile
+) -> Iterator[Tuple[Window, NDArray[Any]]]:
+    """Splits values into output windows, applying the flip and remap.
+
+    Each block is a view of ``values``, so nothing is copied here.
+
+    Args:
+        values (NDArray[Any]): The two-dimensional array of values, as stored
+            in the NetCDF file.
+        profile (BandProfile): The band profile.
+
+    Yields:
+        Tuple[Window, NDArray[Any]]: The output window and its values.
+    """
+    for row, source_rows in _row_blocks(values.shape[0], profile):
+        yield from _block_windows(row, values[source_rows], profile)
+
+
+def write_streamed(
+    data: xarray.DataArray,
+    path: str,
+    profile: BandProfile,
+) -> None:
+    """Writes a single-band COG, reading the data one block of rows at a time.
+
+    Each block of ``BLOCKSIZE`` rows is read from ``data`` (usually a lazily
+    loaded NetCDF variable), flipped and remapped like `write`, and written to
+    an uncompressed GTiff, striped to match the blocks, in a temporary
+    directory next to ``path``. The COG driver then copies that file.
+    Peak memory depends on the block size and GDAL's block cache rather than
+    the grid size.
+
+    Args:
+        data (xarray.DataArray): The two-dimensional variable, as stored in the
+            NetCDF file.
+        path (str): The output path.
+        profile (BandProfile): The band profile.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    with TemporaryDirectory(dir=directory) as temporary_directory:
+        staging_path = os.path.join(temporary_directory, "staging.tif")
+        with rasterio.open(
+            staging_path, "w", **profile.gtiff(), blockysize=BLOCKSIZE
+        ) as staging:
+            for row, source_rows in _row_blocks(profile.height, profile):
+                block = data[source_rows].values
+                for window, values in _block_windows(row, block, profile):
+                    staging.write(values, 1, window=window)
+        with rasterio.open(staging_path) as staging:
+            rasterio.shutil.copy(staging, path, **profile.cog())
+
+
+def write_stacked(
+    bands: Sequence[Tuple[NDArray[Any], BandProfile, str]],
+    path: str,
+) -> None:
+    """Writes a multi-band COG.
+
+    The bands must share their grid, data type, and nodata value, since a
+    GeoTIFF has one of each. The first band's profile sets the compression and
+    overview options. Like `write`, the values are flipped and remapped while
+    they're staged in a MEM dataset.
+
+    Args:
+        bands (Sequence[Tuple[NDArray[Any], BandProfile, str]]): The values,
+            band profile, and description of each band, in band order.
+        path (str): The output path.
+    """
+    if not bands:
+        raise ValueError("At least one band is required")
+    profile = bands[0][1]
+    for _, band_profile, description in bands[1:]:
+        if _stack_key(band_profile) != _stack_key(profile):
+            raise ValueError(
+                f"Band {description} can't be stacked with {bands[0][2]}: bands "
+                "must have the same shape, transform, CRS, data type, and nodata"
+            )
+    with rasterio.open(
+        "", "w", **{**profile.gtiff(), "count": len(bands), "driver": "MEM"}
+    ) as staging:
+        for index, (values, band_profile, description) in enumerate(bands, start=1):
+            for window, block in windows(values, band_profile):
+                staging.write(block, index, window=window)
+            staging.set_band_description(index, description)
+        rasterio.shutil.copy(staging, path, **profile.cog())
+
+
+def promote(profiles: Sequence[BandProfile]) -> List[BandProfile]:
+    """Promotes band profiles to a common data type, so they can be stacked.
+
+    E.g. a float32 and a float64 variable are both written as float64.
+
+    Args:
+        profiles (Sequence[BandProfile]): The band profiles.
+
+    Returns:
+        List[BandProfile]: Copies of the profiles with the common data type.
+    """
+    data_type = DataType(
+        str(numpy.result_type(*(profile.data_type for profile in profiles)))
+    )
+    return [dataclasses.replace(profile, data_type=data_type) for profile in profiles]
+
+
+def band_asset(profile: BandProfile, href: str, band: int) -> Asset:
+    """Creates an asset for one band of a multi-band COG.
+
+    The asset's ``raster:bands`` describes that band only, and its (one-based)
+    index in the COG is stored in ``noaa_cdr:band``.
+
+    Args:
+        profile (BandProfile): The band's profile.
+        href (str): The href of the multi-band COG.
+        band (int): The one-based band index.
+
+    Returns:
+        Asset: The asset.
+    """
+    asset = profile.cog_asset(href)
+    asset.extra_fields[BAND_ATTRIBUTE_NAME] = band
+    return asset
+
+
+def write_all(
+    jobs: Iterable[Tuple[NDArray[Any], str, BandProfile]],
+    workers: int = 1,
+    queue_depth: Optional[int] = None,
+) -> None:
+    """Writes many single-band COGs, optionally in a process pool.
+
+    ``jobs`` is consumed lazily by this process while the pool encodes earlier
+    jobs, so a generator that reads and decodes values on demand overlaps its
+    I/O with COG compression. At most ``queue_depth`` jobs are in flight at any
+    time, which caps the number of arrays held in memory.
+
+    Args:
+        jobs (Iterable[Tuple[NDArray[Any], str, BandProfile]]): The values,
+            output path, and band profile of each COG.
+        workers (int): The number of worker processes. Defaults to 1, which
+            writes in this process without a pool.
+        queue_depth (Optional[int]): The maximum number of jobs that have been
+            read but not yet written. Defaults to twice the number of workers.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if queue_depth is None:
+        queue_depth = 2 * workers
+    elif queue_depth < 1:
+        raise ValueError(f"queue_depth must be at least 1, got {queue_depth}")
+    if workers == 1:
+        for values, path, profile in jobs:
+            write(values, path, profile)
+        return
+    pending: Deque["Future[None]"] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for values, path, profile in jobs:
+            while len(pending) >= queue_depth:
+                pending.popleft().result()
+            pending.append(executor.submit(write, values, path, profile))
+        while pending:
+            pending.popleft().result()
+
+
+def _row_blocks(height: int, profile: BandProfile) -> Iterator[Tuple[int, slice]]:
+    # Yields the first output row of each block and the rows of the input that
+    # it's read from, which come from the other end of the input when flipping.
+    for row in range(0, height, BLOCKSIZE):
+        rows = min(BLOCKSIZE, height - row)
+        if profile.needs_vertical_flip:
+            yield row, slice(height - row - rows, height - row)
+        else:
+            yield row, slice(row, row + rows)
+
+
+def _block_windows(
+    row: int, block: NDArray[Any], profile: BandProfile
+) -> Iterator[Tuple[Window, NDArray[Any]]]:
+    rows, width = block.shape
+    if profile.needs_vertical_flip:
+        block = block[::-1]
+    if profile.needs_longitude_remap:
+        # Same shift as numpy.roll(values, width / 2, 1): the western half of
+        # the output comes from the eastern half of the input.
+        shift = int(width / 2)
+        yield Window(shift, row, width - shift, rows), block[:, : width - shift]
+        yield Window(0, row, shift, rows), block[:, width - shift :]
+    else:
+        yield Window(0, row, width, rows), block
+
+
+def _stack_key(profile: BandProfile) -> Tuple[Hashable, ...]:
+    if math.isnan(profile.nodata):
+        nodata: Any = "nan"
+    else:
+        nodata = profile.nodata
+    return (
+        tuple(profile.shape),
+        tuple(profile.transform),
+        profile.crs,
+        profile.data_type,
+        nodata,
+    )
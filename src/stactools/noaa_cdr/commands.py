@@ -1,11 +1,14 @@
 import logging
+from typing import Optional
 
 import click_logging
 from click import Command, Group
 
+from . import cache
 from .ocean_heat_content.commands import (
     create_command as create_ocean_heat_content_command,
 )
+from .options import cache_options
 from .sea_ice_concentration.commands import (
     create_command as create_sea_ice_concentration_command,
 )
@@ -28,8 +31,10 @@ def create_noaa_cdr_command(cli: Group) -> Command:
         short_help=("Commands for working with NOAA Climate Data Records (CDR)"),
     )
     @click_logging.simple_verbosity_option(logger)  # type: ignore
-    def noaa_cdr() -> None:
-        pass
+    @cache_options
+    def noaa_cdr(cache_dir: Optional[str], cache_size: Optional[int]) -> None:
+        if cache_dir:
+            cache.configure(cache_dir, cache_size)
 
     create_ocean_heat_content_command(noaa_cdr)
     create_sea_ice_concentration_command(noaa_cdr)
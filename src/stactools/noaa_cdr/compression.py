@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+CODECS = ["deflate", "zstd", "lzw", "none"]
+LEVELS = {"deflate": (1, 9), "zstd": (1, 22)}
+PREDICTOR_SUFFIX = "-predictor"
+
+
+@dataclass(frozen=True)
+class Compression:
+    """A named compression profile for COGs.
+
+    Profiles are named ``<codec>[-predictor][:<level>]``, e.g. ``deflate``,
+    ``deflate-predictor``, ``zstd:3``, ``zstd-predictor:19``, ``lzw``, or
+    ``none`` (uncompressed, for scratch runs). The predictor is chosen by GDAL
+    based on the data type (horizontal differencing for integers, floating
+    point prediction for floats).
+    """
+
+    codec: str
+    predictor: bool = False
+    level: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.codec not in CODECS:
+            raise ValueError(
+                f"Unknown compression codec: {self.codec} (expected one of {CODECS})"
+            )
+        if self.predictor and self.codec == "none":
+            raise ValueError("A predictor cannot be used without compression")
+        if self.level is not None:
+            if self.codec not in LEVELS:
+                raise ValueError(f"Compression codec {self.codec} has no levels")
+            low, high = LEVELS[self.codec]
+            if not low <= self.level <= high:
+                raise ValueError(
+                    f"Compression level for {self.codec} must be between "
+                    f"{low} and {high}, got {self.level}"
+                )
+
+    @classmethod
+    def parse(cls, name: str) -> "Compression":
+        """Parses a compression profile name.
+
+        Args:
+            name (str): The profile name, e.g. ``zstd-predictor:9``.
+        Returns:
+            Compression: The compression profile.
+        Raises:
+            ValueError: Raised if the name is not a valid profile.
+        """
+        codec, _, level = name.strip().lower().partition(":")
+        predictor = codec.endswith(PREDICTOR_SUFFIX)
+        if predictor:
+            codec = codec[: -len(PREDICTOR_SUFFIX)]
+        if level:
+            try:
+                parsed_level: Optional[int] = int(level)
+            except ValueError:
+                raise ValueError(f"Invalid compression level in profile: {name}")
+        else:
+            parsed_level = None
+        return cls(codec=codec, predictor=predictor, level=parsed_level)
+
+    def options(self) -> Dict[str, Any]:
+        """Returns the COG driver creation options for this profile."""
+        options: Dict[str, Any] = {"compress": self.codec}
+        if self.predictor:
+            options["predictor"] = "YES"
+        if self.level is not None:
+            options["level"] = self.level
+        return options
+
+    def __str__(self) -> str:
+        name = self.codec
+        if self.predictor:
+            name += PREDICTOR_SUFFIX
+        if self.level is not None:
+            name += f":{self.level}"
+        return name
+
+
+DEFAULT_COMPRESSION = Compression("deflate")
+
+# A representative set of profiles, e.g. for benchmarks. Any name accepted by
+# `Compression.parse` can be used.
+PROFILES: List[Compression] = [
+    Compression("deflate"),
+    Compression("deflate", predictor=True),
+    Compression("deflate", predictor=True, level=9),
+    Compression("zstd", level=1),
+    Compression("zstd", predictor=True, level=9),
+    Compression("zstd", predictor=True, level=19),
+    Compression("lzw"),
+    Compression("lzw", predictor=True),
+    Compression("none"),
+]
+
+
+def select_compression(
+    variable: str,
+    compression: Optional[Compression] = None,
+    variable_compression: Optional[Dict[str, Compression]] = None,
+) -> Compression:
+    """Selects the compression profile for a variable.
+
+    Args:
+        variable (str): The variable name.
+        compression (Optional[Compression]): The profile for all variables.
+            Defaults to `DEFAULT_COMPRESSION`.
+        variable_compression (Optional[Dict[str, Compression]]): Per-variable
+            profiles, which take precedence over ``compression``.
+    Returns:
+        Compression: The compression profile for this variable.
+    """
+    if variable_compression and variable in variable_compression:
+        return variable_compression[variable]
+    elif compression:
+        return compression
+    else:
+        return DEFAULT_COMPRESSION
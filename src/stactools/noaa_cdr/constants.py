@@ -34,3 +34,4 @@ NETCDF_ASSET_KEY = "netcdf"
 COMMON_KEYWORDS = ["Global", "Climate", "NOAA"]
 INTERVAL_ATTRIBUTE_NAME = "noaa_cdr:interval"
 MAX_DEPTH_ATTRIBUTE_NAME = "noaa_cdr:max_depth"
+BAND_ATTRIBUTE_NAME = "noaa_cdr:band"
@@ -0,0 +1,303 @@
+"""Concurrent, resumable downloads of NetCDF files over HTTP.
+
+All downloads share one `requests.Session`, so connections to the same host
+are pooled and reused. Each file is written to a ``.part`` file next to its
+destination, which is renamed into place once complete, so the destination
+never holds a truncated file.
+
+The ETag, Last-Modified, and Content-Length of each downloaded file are
+recorded in a hidden sidecar file (e.g. ``.heat_content.nc.json``). On a
+re-run, a file whose headers still match is skipped after one HEAD request,
+and an interrupted ``.part`` file of the same version is resumed with an HTTP
+Range request.
+"""
+
+import dataclasses
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_WORKERS = 4
+PARTIAL_SUFFIX = ".part"
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadStatus(str, Enum):
+    """What was done to bring a local file up to date."""
+
+    Downloaded = "downloaded"
+    Resumed = "resumed"
+    Unchanged = "unchanged"
+
+
+@dataclass(frozen=True)
+class Download:
+    """The result of downloading one file."""
+
+    href: str
+    path: str
+    status: DownloadStatus
+    bytes_transferred: int
+
+
+def create_session(workers: int = DEFAULT_WORKERS) -> requests.Session:
+    """Creates a session whose connection pool has room for ``workers``
+    concurrent downloads from the same host.
+
+    Args:
+        workers (int): The number of concurrent downloads.
+
+    Returns:
+        requests.Session: The session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def download(
+    hrefs: Sequence[str],
+    directory: str,
+    workers: int = DEFAULT_WORKERS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    session: Optional[requests.Session] = None,
+) -> Iterator[Download]:
+    """Downloads files into a directory, ``workers`` at a time.
+
+    Args:
+        hrefs (Sequence[str]): The HTTP(S) hrefs of the files.
+        directory (str): The directory in which to store the files, under
+            their base names.
+        workers (int): The number of concurrent downloads.
+        chunk_size (int): The number of bytes read from the response and
+            written at a time.
+        session (Optional[requests.Session]): The session to use. Defaults
+            to one created by `create_session`.
+
+    Yields:
+        Download: The result of each download, in order of completion.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    os.makedirs(directory, exist_ok=True)
+    if session is None:
+        session = create_session(workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                download_file,
+                href,
+                os.path.join(directory, os.path.basename(href)),
+                chunk_size=chunk_size,
+                session=session,
+            )
+            for href in hrefs
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def download_file(
+    href: str,
+    path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    session: Optional[requests.Session] = None,
+) -> Download:
+    """Downloads one file, unless the local copy is up to date.
+
+    Args:
+        href (str): The HTTP(S) href of the file.
+        path (str): The local path.
+        chunk_size (int): The number of bytes read from the response and
+            written at a time.
+        session (Optional[requests.Session]): The session to use.
+
+    Returns:
+        Download: The result.
+    """
+    if session is None:
+        session = create_session(1)
+    response = session.head(href, allow_redirects=True)
+    response.raise_for_status()
+    validators = _validators(response.headers)
+    recorded = _read_validators(path)
+    if os.path.exists(path) and _is_current(path, validators, recorded):
+        if recorded != validators:
+            _write_validators(path, validators)
+        logger.info(f"{path} is up to date, skipping")
+        return Download(href, path, DownloadStatus.Unchanged, 0)
+
+    partial_path = path + PARTIAL_SUFFIX
+    headers: Dict[str, str] = dict()
+    offset = 0
+    if (
+        os.path.exists(partial_path)
+        and recorded == dataclasses.replace(validators, complete=False)
+        and validators.if_range() is not None
+    ):
+        offset = os.path.getsize(partial_path)
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = str(validators.if_range())
+    _write_validators(path, dataclasses.replace(validators, complete=False))
+
+    if offset and offset == validators.content_length:
+        # The last download was complete, but stopped before the rename. A
+        # Range request from the end would fail with 416.
+        status = DownloadStatus.Resumed
+        bytes_transferred = 0
+    else:
+        with session.get(href, headers=headers, stream=True) as response:
+            response.raise_for_status()
+            if offset and response.status_code == 206:
+                content_range = response.headers.get("Content-Range", "")
+                if not content_range.startswith(f"bytes {offset}-"):
+                    raise OSError(
+                        f"Requested {href} from byte {offset}, got {content_range}"
+                    )
+                status = DownloadStatus.Resumed
+                mode = "ab"
+            else:
+                status = DownloadStatus.Downloaded
+                mode = "wb"
+            bytes_transferred = 0
+            with open(partial_path, mode) as file:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    file.write(chunk)
+                    bytes_transferred += len(chunk)
+
+    size = os.path.getsize(partial_path)
+    if validators.content_length is not None and size != validators.content_length:
+        raise OSError(
+            f"Downloaded {size} bytes from {href}, expected "
+            f"{validators.content_length}"
+        )
+    os.replace(partial_path, path)
+    _write_validators(path, validators)
+    logger.info(f"{status.value} {href} to {path} ({bytes_transferred} bytes)")
+    return Download(href, path, status, bytes_transferred)
+
+
+@dataclass(frozen=True)
+class _Validators:
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_length: Optional[int] = None
+    complete: bool = True
+
+    def if_range(self) -> Optional[str]:
+        # If-Range only accepts strong ETags.
+        if self.etag is not None and not self.etag.startswith("W/"):
+            return self.etag
+        else:
+            return self.last_modified
+
+
+def _validators(headers: Any) -> _Validators:
+    content_length = headers.get("Content-Length")
+    return _Validators(
+        etag=headers.get("ETag"),
+        last_modified=headers.get("Last-Modified"),
+        content_length=None if content_length is None else int(content_length),
+    )
+
+
+def _is_current(
+    path: str, validators: _Validators, recorded: Optional[_Validators]
+) -> bool:
+    if (
+        validators.content_length is not None
+        and os.path.getsize(path) != validators.content_length
+    ):
+        return False
+    elif recorded is None:
+        # Files downloaded without a sidecar are trusted if their size matches.
+        return validators.content_length is not None
+    elif not recorded.complete:
+        return False
+    elif validators.etag is not None or recorded.etag is not None:
+        return validators.etag == recorded.etag
+    elif validators.last_modified is not None or recorded.last_modified is not None:
+        return validators.last_modified == recorded.last_modified
+    else:
+        return False
+
+
+def sidecar_path(path: str) -> str:
+    """Returns the path of the hidden sidecar file that records what version
+    of a remote file a local file holds.
+
+    Args:
+        path (str): The path of the local file.
+
+    Returns:
+        str: The path of the sidecar file, e.g. ``.heat_content.nc.json``
+        next to ``heat_content.nc``.
+    """
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.json")
+
+
+def read_sidecar(path: str) -> Optional[Dict[str, Any]]:
+    """Reads the sidecar file of a local file.
+
+    Args:
+        path (str): The path of the local file.
+
+    Returns:
+        Optional[Dict[str, Any]]: The recorded values, or None if there's no
+        readable sidecar file.
+    """
+    try:
+        with open(sidecar_path(path)) as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if isinstance(data, dict):
+        return data
+    else:
+        return None
+
+
+def write_sidecar(path: str, data: Dict[str, Any]) -> None:
+    """Writes the sidecar file of a local file, atomically replacing the
+    existing one.
+
+    Args:
+        path (str): The path of the local file.
+        data (Dict[str, Any]): The values to record.
+    """
+    path = sidecar_path(path)
+    temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temporary_path, "w") as file:
+            json.dump(data, file)
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+def _read_validators(path: str) -> Optional[_Validators]:
+    data = read_sidecar(path)
+    if data is None:
+        return None
+    try:
+        return _Validators(**data)
+    except TypeError:
+        return None
+
+
+def _write_validators(path: str, validators: _Validators) -> None:
+    write_sidecar(path, dataclasses.asdict(validators))
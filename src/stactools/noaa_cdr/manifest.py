@@ -0,0 +1,288 @@
+"""A persistent record of the COGs created from NetCDF files.
+
+Each entry describes the inputs of one COG: its source file (href and a
+fingerprint of its modification time, size, or ETag), variable, time index,
+band profile, and a hash of the values read from the source. The hash, size,
+and modification time of the COG itself are recorded after it's written, and
+the COG is only re-hashed if its size or modification time changed.
+
+On a re-run, a COG whose entry matches is skipped. The check is done in two
+steps: if the source fingerprint is unchanged the COG is skipped without
+reading any values, otherwise the values are read and hashed, which catches
+NetCDF files that grow in place (e.g. ocean heat content) where only the new
+time steps need to be written.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+import numpy
+from numpy.typing import NDArray
+
+from .cache import source_fingerprint
+from .profile import BandProfile
+
+VERSION = 1
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """The inputs, and the output hash, of one COG."""
+
+    source: str
+    source_fingerprint: Dict[str, Any]
+    variable: str
+    time_index: Optional[int]
+    profile_hash: str
+    values_hash: Optional[str] = None
+    output_hash: Optional[str] = None
+    output_size: Optional[int] = None
+    output_mtime_ns: Optional[int] = None
+
+    def with_values(self, values: Sequence[NDArray[Any]]) -> "ManifestEntry":
+        """Returns a copy of this entry with the hash of the given values.
+
+        Args:
+            values (Sequence[NDArray[Any]]): The values of each band, as
+                stored in the NetCDF file.
+
+        Returns:
+            ManifestEntry: The entry, with its values hash set.
+        """
+        return dataclasses.replace(self, values_hash=values_hash(values))
+
+
+class Manifest:
+    """A JSON file of `ManifestEntry`, keyed by COG path.
+
+    COG paths are stored relative to the manifest, so a manifest and its COGs
+    can be moved together.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Opens a manifest, or creates an empty one if the file doesn't exist.
+
+        Args:
+            path (str): The path of the manifest file.
+        """
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = dict()
+        self._fingerprints: Dict[str, Dict[str, Any]] = dict()
+        if os.path.exists(path):
+            with open(path) as file:
+                data = json.load(file)
+            if data.get("version") != VERSION:
+                raise ValueError(
+                    f"Unsupported manifest version in {path}: {data.get('version')}"
+                )
+            for key, entry in data["entries"].items():
+                self.entries[key] = ManifestEntry(**entry)
+
+    def entry(
+        self,
+        source: str,
+        variable: str,
+        time_index: Optional[int],
+        profiles: Sequence[BandProfile],
+        read_href: Optional[str] = None,
+    ) -> ManifestEntry:
+        """Creates an entry, without a values hash, for a COG.
+
+        The source fingerprint is looked up once per source for the lifetime
+        of this manifest.
+
+        Args:
+            source (str): The href of the NetCDF file.
+            variable (str): The variable, or comma-separated variables for a
+                COG with a band per variable.
+            time_index (Optional[int]): The time index, or None for a COG
+                without a time dimension or with a band per time step. The
+                time index of each band is part of its profile.
+            profiles (Sequence[BandProfile]): The profile of each band.
+            read_href (Optional[str]): The href used to read the source, e.g.
+                a signed URL, if it's different from ``source``.
+
+        Returns:
+            ManifestEntry: The entry.
+        """
+        if source not in self._fingerprints:
+            self._fingerprints[source] = source_fingerprint(read_href or source)
+        return ManifestEntry(
+            source=source,
+            source_fingerprint=self._fingerprints[source],
+            variable=variable,
+            time_index=time_index,
+            profile_hash=profile_hash(profiles),
+        )
+
+    def is_current(self, output: str, entry: ManifestEntry) -> bool:
+        """Returns True if the COG at ``output`` was created from ``entry``'s
+        inputs and hasn't changed since.
+
+        If ``entry`` has no values hash, the source fingerprint has to match.
+        Otherwise the values hash has to match, and the source fingerprint is
+        ignored.
+
+        Args:
+            output (str): The COG path.
+            entry (ManifestEntry): The inputs of the COG.
+
+        Returns:
+            bool: True if the COG can be skipped.
+        """
+        recorded = self.entries.get(self._key(output))
+        if recorded is None or recorded.output_hash is None:
+            return False
+        if (
+            recorded.source != entry.source
+            or recorded.variable != entry.variable
+            or recorded.time_index != entry.time_index
+            or recorded.profile_hash != entry.profile_hash
+        ):
+            return False
+        if entry.values_hash is None:
+            if recorded.source_fingerprint != entry.source_fingerprint:
+                return False
+        elif recorded.values_hash != entry.values_hash:
+            return False
+        return self._output_hash(output) == recorded.output_hash
+
+    def record(self, output: str, entry: ManifestEntry) -> None:
+        """Records the COG at ``output``, hashing it unless it's unchanged
+        since it was last recorded.
+
+        If ``entry`` has no values hash, a previously recorded one is kept
+        only if it was recorded for the same inputs, including the source
+        fingerprint.
+
+        Args:
+            output (str): The COG path.
+            entry (ManifestEntry): The inputs of the COG.
+        """
+        key = self._key(output)
+        recorded = self.entries.get(key)
+        if (
+            entry.values_hash is None
+            and recorded is not None
+            and recorded.source == entry.source
+            and recorded.source_fingerprint == entry.source_fingerprint
+            and recorded.variable == entry.variable
+            and recorded.time_index == entry.time_index
+            and recorded.profile_hash == entry.profile_hash
+        ):
+            entry = dataclasses.replace(entry, values_hash=recorded.values_hash)
+        output_hash = self._output_hash(output)
+        stat = os.stat(output)
+        self.entries[key] = dataclasses.replace(
+            entry,
+            output_hash=output_hash,
+            output_size=stat.st_size,
+            output_mtime_ns=stat.st_mtime_ns,
+        )
+
+    def save(self) -> None:
+        """Writes the manifest, atomically replacing the existing file."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(
+                {
+                    "version": VERSION,
+                    "entries": dict(
+                        (key, dataclasses.asdict(entry))
+                        for key, entry in sorted(self.entries.items())
+                    ),
+                },
+                file,
+                indent=2,
+            )
+        os.replace(temporary_path, self.path)
+
+    def _output_hash(self, output: str) -> Optional[str]:
+        # The recorded hash if the output's size and modification time match
+        # the recorded ones, otherwise a new hash, or None if it doesn't exist.
+        try:
+            stat = os.stat(output)
+        except FileNotFoundError:
+            return None
+        recorded = self.entries.get(self._key(output))
+        if (
+            recorded is not None
+            and recorded.output_size == stat.st_size
+            and recorded.output_mtime_ns == stat.st_mtime_ns
+        ):
+            return recorded.output_hash
+        return file_hash(output)
+
+    def _key(self, output: str) -> str:
+        return os.path.relpath(
+            os.path.abspath(output), os.path.dirname(os.path.abspath(self.path))
+        )
+
+
+def profile_hash(profiles: Sequence[BandProfile]) -> str:
+    """Returns a hash of everything in band profiles that affects a COG.
+
+    This includes each band's time index, so a COG with a band per time step
+    is rewritten when a different set of steps is selected.
+
+    Args:
+        profiles (Sequence[BandProfile]): The profile of each band.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    for profile in profiles:
+        gtiff = profile.gtiff()
+        gtiff["crs"] = gtiff["crs"].to_wkt()
+        gtiff["transform"] = list(gtiff["transform"])
+        gtiff["nodata"] = str(gtiff["nodata"])
+        description = {
+            "gtiff": gtiff,
+            "cog": profile.cog(),
+            "raster_band": profile.raster_band().to_dict(),
+            "needs_vertical_flip": profile.needs_vertical_flip,
+            "needs_longitude_remap": profile.needs_longitude_remap,
+            "time_index": profile.time_index,
+        }
+        digest.update(json.dumps(description, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def values_hash(values: Sequence[NDArray[Any]]) -> str:
+    """Returns a hash of arrays, including their shapes and data types.
+
+    Args:
+        values (Sequence[NDArray[Any]]): The arrays.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    for array in values:
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(numpy.ascontiguousarray(array).data)
+    return digest.hexdigest()
+
+
+def file_hash(path: str) -> str:
+    """Returns the SHA-256 hex digest of a local file.
+
+    Args:
+        path (str): The file path.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,17 +1,20 @@
 import datetime
 import os.path
 from dataclasses import dataclass
-from typing import Any, Dict, Hashable, List, Optional
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
 
-import fsspec
-import numpy
 import xarray
+from numpy.typing import NDArray
 from pystac import Asset
 from stactools.core.io import ReadHrefModifier
 
-from .. import cog, dataset, time
+from .. import cog, dataset
+from ..cache import open_href
+from ..cog import Layout
+from ..compression import Compression, select_compression
+from ..manifest import Manifest, ManifestEntry
 from ..profile import BandProfile
-from ..time import TimeResolution
+from ..time import TimeAxis, TimeResolution
 from .constants import BASE_TIME
 
 
@@ -26,9 +29,13 @@ class Cog:
     end_datetime: datetime.datetime
     datetime: datetime.datetime
     attributes: Dict[Hashable, Any]
+    band: Optional[int] = None
 
     def asset(self) -> Asset:
-        return self.profile.cog_asset(self.href)
+        if self.band is None:
+            return self.profile.cog_asset(self.href)
+        else:
+            return cog.band_asset(self.profile, self.href, self.band)
 
     def time_interval_as_str(self) -> str:
         """Returns this COG's time interval as a string."""
@@ -36,17 +43,11 @@ class Cog:
 
     def item_id(self) -> str:
         """Returns the item id."""
-        return f"ocean-heat-content-{self.time_interval_as_str()}-{self.max_depth()}m"
+        return _item_id(self.time_interval_as_str(), self.attributes)
 
     def asset_key(self) -> str:
         """Returns this COG's asset key."""
-        parts = []
-        for part in self.attributes["id"].split("_"):
-            if part == "anomaly":
-                break
-            else:
-                parts.append(part)
-        return "_".join(parts)
+        return _asset_key(self.attributes)
 
     def interval(self) -> str:
         """Returns this cog's interval, e.g. "yearly"."""
@@ -63,7 +64,75 @@ def cogify(
     latest_only: bool = False,
     read_href_modifier: Optional[ReadHrefModifier] = None,
     cog_hrefs: Optional[List[str]] = None,
+    workers: int = 1,
+    queue_depth: Optional[int] = None,
+    compression: Optional[Compression] = None,
+    variable_compression: Optional[Dict[str, Compression]] = None,
+    packed: bool = False,
+    layout: Layout = Layout.Single,
+    manifest: Optional[Manifest] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    item_directories: bool = False,
 ) -> List[Cog]:
+    """Creates one COG per time slice in an Ocean Heat Content NetCDF file.
+
+    Time slices are read and decoded in this process, ahead of the COG
+    encoding, which happens in a pool of ``workers`` processes.
+
+    Args:
+        href (str): The href of the NetCDF file.
+        outdir (Optional[str]): The output directory. Defaults to the
+            directory of the NetCDF file.
+        latest_only (bool): Only create a COG for the most recent time slice.
+        read_href_modifier (Optional[ReadHrefModifier]): A function to modify
+            the href before reading.
+        cog_hrefs (Optional[List[str]]): Existing COGs. A COG with a matching
+            file name is not re-created.
+        workers (int): The number of processes used to encode COGs. Defaults
+            to 1, which reads and writes in this process.
+        queue_depth (Optional[int]): The maximum number of decoded time slices
+            waiting to be written. Defaults to twice the number of workers.
+        compression (Optional[Compression]): The compression profile. Defaults
+            to deflate.
+        variable_compression (Optional[Dict[str, Compression]]): Compression
+            profiles keyed by asset key (e.g. ``heat_content``), overriding
+            ``compression``.
+        packed (bool): Write the values as stored in the NetCDF file (e.g.
+            packed integers) instead of decoding them to floats. The scale,
+            offset, and fill value are recorded in the raster bands.
+        layout (Layout): With ``Layout.Time``, write one COG for the file with
+            a band per time slice, and set each `Cog`'s ``band``. This can't be
+            combined with ``cog_hrefs`` or more than one worker. The files
+            have one variable, so ``Layout.Variables`` isn't supported.
+        manifest (Optional[Manifest]): If provided, COGs that the manifest
+            shows are up to date aren't re-written, and the written COGs are
+            recorded in it. Time slices are only read if the NetCDF file has
+            changed, and then only re-written if their values have changed.
+        since (Optional[datetime.datetime]): Only create COGs for the time
+            slices that end at or after this datetime.
+        until (Optional[datetime.datetime]): Only create COGs for the time
+            slices that start at or before this datetime.
+        item_directories (bool): Write each COG into its item's directory
+            under ``outdir`` (see `item_directory`), which is where
+            `pystac.Collection.normalize_hrefs` puts the item with
+            `stac.item_layout_strategy`, instead of into ``outdir`` itself.
+            Time-stacked COGs are shared by several items, so they're still
+            written into ``outdir``.
+
+    Returns:
+        List[Cog]: The COGs, in time order.
+    """
+    if layout == Layout.Variables:
+        raise ValueError(
+            "Ocean heat content files have one variable, so they can't be "
+            "stacked by variable"
+        )
+    elif layout == Layout.Time and (cog_hrefs or workers > 1):
+        raise ValueError(
+            "Time-stacked COGs can't be used with existing COG hrefs or more "
+            "than one worker"
+        )
     if outdir is None:
         outdir = os.path.dirname(href)
     cogs = list()
@@ -75,33 +144,61 @@ def cogify(
         cog_file_names = dict((os.path.basename(h), h) for h in cog_hrefs)
     else:
         cog_file_names = dict()
-    with fsspec.open(maybe_modified_href) as file:
-        with xarray.open_dataset(file, decode_times=False) as ds:
+    with open_href(maybe_modified_href, key=href) as file:
+        with xarray.open_dataset(
+            file, decode_times=False, mask_and_scale=not packed
+        ) as ds:
             time_resolution = TimeResolution.from_value(ds.time_coverage_resolution)
             variable = dataset.data_variable_name(ds)
-            num_records = len(ds[variable].time)
-            for i, month_offset in enumerate(ds[variable].time):
-                if latest_only and i < (num_records - 1):
-                    continue
-                dt = time.add_months_to_datetime(BASE_TIME, month_offset)
-                start_datetime, end_datetime = time_resolution.datetime_bounds(dt)
-                suffix = time_resolution.as_str(dt)
-                file_name = (
-                    f"{os.path.splitext(os.path.basename(href))[0]}_{suffix}.tif"
-                )
-                profile = BandProfile.build(
-                    ds, variable, lambda d: d.isel(time=i).squeeze()
-                )
-                if file_name in cog_file_names:
+            file_stem = os.path.splitext(os.path.basename(href))[0]
+            to_write: List[Tuple[int, str, BandProfile, str]] = list()
+            entries: Dict[str, ManifestEntry] = dict()
+            template = BandProfile.template(
+                ds,
+                variable,
+                compression=select_compression(
+                    _asset_key(ds.attrs), compression, variable_compression
+                ),
+            )
+            axis = TimeAxis.from_months(
+                BASE_TIME, ds[variable].time.values, time_resolution
+            )
+            indices = axis.select(since, until)
+            if latest_only:
+                indices = indices[-1:]
+            suffixes = time_resolution.as_str_array(axis.datetimes[indices])
+            for i, suffix in zip(indices, suffixes):
+                dt = axis.datetimes[i].item().replace(tzinfo=BASE_TIME.tzinfo)
+                start_datetime = axis.start_datetimes[i].item()
+                end_datetime = axis.end_datetimes[i].item()
+                suffix = str(suffix)
+                file_name = f"{file_stem}_{suffix}.tif"
+                profile = template.time_step(i)
+                band = None
+                if layout == Layout.Time:
+                    cog_href = os.path.join(outdir, f"{file_stem}.tif")
+                    band = len(to_write) + 1
+                    to_write.append((i, cog_href, profile, suffix))
+                elif file_name in cog_file_names:
                     cog_href = cog_file_names[file_name]
                 else:
-                    cog_href = os.path.join(outdir, file_name)
-                    values = numpy.flipud(ds[variable].isel(time=i).values.squeeze())
-                    cog.write(
-                        values,
-                        cog_href,
-                        profile,
-                    )
+                    if item_directories:
+                        cog_directory = item_directory(
+                            outdir, _item_id(suffix, ds.attrs)
+                        )
+                        os.makedirs(cog_directory, exist_ok=True)
+                    else:
+                        cog_directory = outdir
+                    cog_href = os.path.join(cog_directory, file_name)
+                    if manifest:
+                        entry = manifest.entry(
+                            href, variable, i, [profile], maybe_modified_href
+                        )
+                        if not manifest.is_current(cog_href, entry):
+                            entries[cog_href] = entry
+                            to_write.append((i, cog_href, profile, suffix))
+                    else:
+                        to_write.append((i, cog_href, profile, suffix))
                 cogs.append(
                     Cog(
                         href=cog_href,
@@ -111,6 +208,92 @@ def cogify(
                         start_datetime=start_datetime,
                         end_datetime=end_datetime,
                         attributes=ds.attrs,
+                        band=band,
                     )
                 )
+
+            def prepared() -> Iterator[Tuple[NDArray[Any], str, BandProfile]]:
+                for i, cog_href, profile, _ in to_write:
+                    values = ds[variable].isel(time=i).values.squeeze()
+                    if manifest:
+                        entry = entries[cog_href].with_values([values])
+                        entries[cog_href] = entry
+                        if manifest.is_current(cog_href, entry):
+                            continue
+                    yield values, cog_href, profile
+
+            if layout == Layout.Time:
+                if to_write:
+                    _write_time_stack(
+                        ds[variable],
+                        to_write,
+                        manifest,
+                        entries,
+                        href,
+                        maybe_modified_href,
+                    )
+            else:
+                cog.write_all(prepared(), workers=workers, queue_depth=queue_depth)
+    if manifest:
+        for cog_href, entry in entries.items():
+            manifest.record(cog_href, entry)
+        manifest.save()
     return cogs
+
+
+def _write_time_stack(
+    data: xarray.DataArray,
+    to_write: List[Tuple[int, str, BandProfile, str]],
+    manifest: Optional[Manifest],
+    entries: Dict[str, ManifestEntry],
+    href: str,
+    read_href: str,
+) -> None:
+    cog_href = to_write[0][1]
+    profiles = [profile for _, _, profile, _ in to_write]
+    if manifest:
+        entry = manifest.entry(href, str(data.name), None, profiles, read_href)
+        if manifest.is_current(cog_href, entry):
+            return
+    values = [data.isel(time=i).values.squeeze() for i, _, _, _ in to_write]
+    if manifest:
+        entry = entry.with_values(values)
+        entries[cog_href] = entry
+        if manifest.is_current(cog_href, entry):
+            return
+    cog.write_stacked(
+        [
+            (band_values, profile, suffix)
+            for band_values, (_, _, profile, suffix) in zip(values, to_write)
+        ],
+        cog_href,
+    )
+
+
+def item_directory(outdir: str, item_id: str) -> str:
+    """Returns the directory of an item, and of its COGs with
+    ``item_directories``, under a root directory.
+
+    Args:
+        outdir (str): The root directory.
+        item_id (str): The item id.
+
+    Returns:
+        str: The item's directory.
+    """
+    return os.path.join(outdir, item_id)
+
+
+def _item_id(time_interval: str, attributes: Dict[Hashable, Any]) -> str:
+    max_depth = int(attributes["geospatial_vertical_max"])
+    return f"ocean-heat-content-{time_interval}-{max_depth}m"
+
+
+def _asset_key(attributes: Dict[Hashable, Any]) -> str:
+    parts = []
+    for part in attributes["id"].split("_"):
+        if part == "anomaly":
+            break
+        else:
+            parts.append(part)
+    return "_".join(parts)
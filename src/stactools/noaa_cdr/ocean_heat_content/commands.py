@@ -1,16 +1,28 @@
+import datetime
 import os.path
 from tempfile import TemporaryDirectory
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import click
-import pystac.utils
-import requests
 import stactools.core.copy
 import tqdm
 from click import Command, Group, Path
-from pystac import CatalogType, ItemCollection
+from pystac import CatalogType
 
-from . import cog, stac
+from .. import download
+from ..cog import Layout
+from ..compression import Compression
+from ..manifest import Manifest
+from ..options import (
+    compression_options,
+    layout_option,
+    manifest_option,
+    ndjson_option,
+    packed_option,
+    time_range_options,
+)
+from ..stac import save_items
+from . import cog, iter_noaa_hrefs, stac
 
 
 def create_command(noaa_cdr: Group) -> Command:
@@ -48,11 +60,41 @@ def create_command(noaa_cdr: Group) -> Command:
         help="Read NetCDFs from this local directory instead of from NOAA's HTTP "
         "servers (only used if --create-items is True)",
     )
+    @click.option(
+        "-w",
+        "--workers",
+        type=click.IntRange(min=1),
+        default=1,
+        show_default=True,
+        help="The number of NetCDF files processed concurrently (only used if "
+        "--create-items is True)",
+    )
+    @click.option(
+        "--in-place",
+        is_flag=True,
+        default=False,
+        show_default=True,
+        help="Write the COGs directly into their items' directories instead of "
+        "into a temporary directory from which they are moved (only used if "
+        "--create-items is True)",
+    )
+    @compression_options
+    @packed_option
+    @layout_option(Layout.Single, Layout.Time)
+    @time_range_options
     def create_collection_command(
         destination: str,
         create_items: bool,
         latest_only: bool,
         local_directory: Optional[str],
+        compression: Optional[Compression],
+        variable_compression: Dict[str, Compression],
+        packed: bool,
+        layout: Layout,
+        since: Optional[datetime.datetime],
+        until: Optional[datetime.datetime],
+        workers: int,
+        in_place: bool,
     ) -> None:
         """Creates a STAC Collection for the Ocean Heat Content CDR.
 
@@ -66,14 +108,60 @@ def create_command(noaa_cdr: Group) -> Command:
             local_directory (Optional[str]): Read netcdf files from this local
                 directory instead of from NOAA's servers. Only used if
                 --create-items is true.
+            compression (Optional[Compression]): The COG compression profile.
+                Only used if --create-items is true.
+            variable_compression (Dict[str, Compression]): COG compression
+                profiles keyed by asset key, e.g. heat_content. Only used if
+                --create-items is true.
+            packed (bool): Write the NetCDF's stored values instead of decoded
+                floats. Only used if --create-items is true.
+            layout (Layout): The COG layout. Only used if --create-items is
+                true.
+            since (Optional[datetime.datetime]): Only create items for time
+                slices that end at or after this datetime. Only used if
+                --create-items is true.
+            until (Optional[datetime.datetime]): Only create items for time
+                slices that start at or before this datetime. Only used if
+                --create-items is true.
+            workers (int): The number of NetCDF files processed concurrently.
+                Only used if --create-items is true.
+            in_place (bool): Write the COGs directly into the directories of
+                their items, instead of moving them there from a temporary
+                directory. Only used if --create-items is true.
         """
-        if create_items:
+        if create_items and in_place:
+            root = os.path.dirname(os.path.abspath(destination))
+            collection = stac.create_collection(
+                catalog_type=CatalogType.SELF_CONTAINED,
+                cog_directory=root,
+                latest_only=latest_only,
+                local_directory=local_directory,
+                compression=compression,
+                variable_compression=variable_compression,
+                packed=packed,
+                layout=layout,
+                since=since,
+                until=until,
+                workers=workers,
+                item_directories=True,
+            )
+            # The same layout that item_directories writes the COGs in.
+            collection.normalize_hrefs(root, strategy=stac.item_layout_strategy())
+            collection.make_all_asset_hrefs_relative()
+        elif create_items:
             with TemporaryDirectory() as temporary_directory:
                 collection = stac.create_collection(
                     catalog_type=CatalogType.SELF_CONTAINED,
                     cog_directory=temporary_directory,
                     latest_only=latest_only,
                     local_directory=local_directory,
+                    compression=compression,
+                    variable_compression=variable_compression,
+                    packed=packed,
+                    layout=layout,
+                    since=since,
+                    until=until,
+                    workers=workers,
                 )
                 collection.normalize_hrefs(os.path.dirname(destination))
                 stactools.core.copy.move_all_assets(
@@ -96,8 +184,33 @@ def create_command(noaa_cdr: Group) -> Command:
     @click.option(
         "-c", "--cog-directory", help="The directory in which to store the COGs"
     )
+    @click.option(
+        "-w",
+        "--workers",
+        type=click.IntRange(min=1),
+        default=1,
+        show_default=True,
+        help="The number of NetCDF files processed concurrently",
+    )
+    @compression_options
+    @packed_option
+    @layout_option(Layout.Single, Layout.Time)
+    @manifest_option
+    @time_range_options
+    @ndjson_option
     def create_items_command(
-        source: List[str], destination: str, cog_directory: Optional[str]
+        source: List[str],
+        destination: str,
+        cog_directory: Optional[str],
+        compression: Optional[Compression],
+        variable_compression: Dict[str, Compression],
+        packed: bool,
+        layout: Layout,
+        manifest: Optional[Manifest],
+        since: Optional[datetime.datetime],
+        until: Optional[datetime.datetime],
+        workers: int,
+        ndjson: bool,
     ) -> None:
         """Creates a STAC ItemCollection for the provided NetCDFs.
 
@@ -108,46 +221,80 @@ def create_command(noaa_cdr: Group) -> Command:
             cog_directory (str): The folder that will hold the COGs. If not
                 provided, the COGs will be stored in the same directory as the item
                 collection.
+            compression (Optional[Compression]): The COG compression profile.
+            variable_compression (Dict[str, Compression]): COG compression
+                profiles keyed by asset key, e.g. heat_content.
+            packed (bool): Write the NetCDF's stored values instead of decoded
+                floats.
+            layout (Layout): The COG layout.
+            manifest (Optional[Manifest]): The manifest of previously created
+                COGs.
+            since (Optional[datetime.datetime]): Only create items for time
+                slices that end at or after this datetime.
+            until (Optional[datetime.datetime]): Only create items for time
+                slices that start at or before this datetime.
+            workers (int): The number of NetCDF files processed concurrently.
+                Can't be used with --manifest.
+            ndjson (bool): Write each item as a line of newline-delimited
+                JSON as soon as it is created.
         """
+        if workers > 1 and manifest:
+            raise click.UsageError("--manifest can't be used with --workers")
         if not cog_directory:
             cog_directory = os.path.dirname(destination)
         os.makedirs(cog_directory, exist_ok=True)
-        items = stac.create_items(source, cog_directory)
-        for item in items:
-            for key, asset in item.assets.items():
-                asset.href = pystac.utils.make_relative_href(asset.href, destination)
-                item.assets[key] = asset
-        item_collection = ItemCollection(items)
-        item_collection.save_object(destination)
+        items = stac.iter_items(
+            list(source),
+            cog_directory,
+            compression=compression,
+            variable_compression=variable_compression,
+            packed=packed,
+            layout=layout,
+            manifest=manifest,
+            since=since,
+            until=until,
+            workers=workers,
+        )
+        save_items(items, destination, ndjson=ndjson)
 
     @ocean_heat_content.command(
         "download", short_help="Download data from NOAA's HTTP server"
     )
     @click.argument("destination")
-    def download_command(destination: str) -> None:
+    @click.option(
+        "-w",
+        "--workers",
+        type=click.IntRange(min=1),
+        default=download.DEFAULT_WORKERS,
+        show_default=True,
+        help="The number of files downloaded concurrently",
+    )
+    @click.option(
+        "--chunk-size",
+        type=click.IntRange(min=1),
+        default=download.DEFAULT_CHUNK_SIZE,
+        show_default=True,
+        help="The number of bytes read and written at a time",
+    )
+    def download_command(destination: str, workers: int, chunk_size: int) -> None:
         """Downloads data from NOAA's HTTP server.
 
+        Files that are already downloaded and unchanged on the server are
+        skipped, and interrupted downloads are resumed.
+
         \b
         Args:
-            name (str): The name of the CDR. Use `stac noaa-cdr list` to print
-                a list of available CDRs.
             destination (str): The directory in which to store the CDR data.
+            workers (int): The number of files downloaded concurrently.
+            chunk_size (int): The number of bytes read and written at a time.
         """
-        os.makedirs(destination, exist_ok=True)
-        for href in stactools.noaa_cdr.ocean_heat_content.iter_noaa_hrefs():
-            path = os.path.join(destination, os.path.basename(href))
-            if os.path.exists(path):
-                print(f"File already downloaded, skipping: {path}")
-            response = requests.get(href, stream=True)
-            with tqdm.wrapattr(
-                open(path, "wb"),
-                "write",
-                miniters=1,
-                desc=href.split("/")[-1],
-                total=int(response.headers.get("content-length", 0)),
-            ) as fout:
-                for chunk in response.iter_content(chunk_size=4096):
-                    fout.write(chunk)
+        hrefs = list(iter_noaa_hrefs())
+        results = download.download(
+            hrefs, destination, workers=workers, chunk_size=chunk_size
+        )
+        for result in tqdm.tqdm(results, total=len(hrefs), unit="file"):
+            if result.status == download.DownloadStatus.Unchanged:
+                tqdm.tqdm.write(f"File already downloaded, skipping: {result.path}")
 
     @ocean_heat_content.command(
         "cogify",
@@ -155,7 +302,39 @@ def create_command(noaa_cdr: Group) -> Command:
     )
     @click.argument("infile", type=Path(exists=True))
     @click.option("-o", "--outdir", help="The output directory")
-    def cogify_command(infile: str, outdir: Optional[Path]) -> None:
+    @click.option(
+        "-w",
+        "--workers",
+        type=click.IntRange(min=1),
+        default=1,
+        show_default=True,
+        help="The number of processes used to encode COGs",
+    )
+    @click.option(
+        "-q",
+        "--queue-depth",
+        type=click.IntRange(min=1),
+        help="The maximum number of decoded time slices waiting to be written "
+        "(defaults to twice the number of workers)",
+    )
+    @compression_options
+    @packed_option
+    @layout_option(Layout.Single, Layout.Time)
+    @manifest_option
+    @time_range_options
+    def cogify_command(
+        infile: str,
+        outdir: Optional[Path],
+        workers: int,
+        queue_depth: Optional[int],
+        compression: Optional[Compression],
+        variable_compression: Dict[str, Compression],
+        packed: bool,
+        layout: Layout,
+        manifest: Optional[Manifest],
+        since: Optional[datetime.datetime],
+        until: Optional[datetime.datetime],
+    ) -> None:
         """Creates a Cloud-Optimized GeoTIFF (COG) from a CDR NetCDF file.
 
         The COG will have the same file name but with a .tif extension.
@@ -166,10 +345,40 @@ def create_command(noaa_cdr: Group) -> Command:
             outdir (click.Path, optional): The output directory. If not
                 provided, the tif will be created in the same directory as the
                 NetCDF.
+            workers (int): The number of processes used to encode COGs.
+            queue_depth (int, optional): The maximum number of decoded time
+                slices waiting to be written.
+            compression (Optional[Compression]): The COG compression profile.
+            variable_compression (Dict[str, Compression]): COG compression
+                profiles keyed by asset key, e.g. heat_content.
+            packed (bool): Write the NetCDF's stored values instead of decoded
+                floats.
+            layout (Layout): The COG layout.
+            manifest (Optional[Manifest]): The manifest of previously created
+                COGs.
+            since (Optional[datetime.datetime]): Only create COGs for time
+                slices that end at or after this datetime.
+            until (Optional[datetime.datetime]): Only create COGs for time
+                slices that start at or before this datetime.
         """
         if outdir:
             os.makedirs(str(outdir), exist_ok=True)
-        cogs = cog.cogify(infile, None if outdir is None else str(outdir))
-        print(f"Wrote {len(cogs)} COGs to {os.path.dirname(cogs[0].asset().href)}")
+        cogs = cog.cogify(
+            infile,
+            None if outdir is None else str(outdir),
+            workers=workers,
+            queue_depth=queue_depth,
+            compression=compression,
+            variable_compression=variable_compression,
+            packed=packed,
+            layout=layout,
+            manifest=manifest,
+            since=since,
+            until=until,
+        )
+        if cogs:
+            print(f"Wrote {len(cogs)} COGs to {os.path.dirname(cogs[0].asset().href)}")
+        else:
+            print("No time slices were selected")
 
     return ocean_heat_content
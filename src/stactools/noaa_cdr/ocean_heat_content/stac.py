@@ -1,18 +1,29 @@
+import collections
+import datetime
+import functools
 import logging
 import os.path
-from typing import Iterator, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import Dict, Iterator, List, Optional, Tuple
 
-import fsspec
 import pystac.utils
-import xarray
 from pystac import Asset, CatalogType, Collection, Item
 from pystac.extensions.item_assets import AssetDefinition, ItemAssetsExtension
 from pystac.extensions.projection import ProjectionExtension
 from pystac.extensions.raster import RasterExtension
 from pystac.extensions.scientific import ScientificExtension
+from pystac.layout import (
+    BestPracticesLayoutStrategy,
+    CustomLayoutStrategy,
+    HrefLayoutStrategy,
+)
 from stactools.core.io import ReadHrefModifier
 
-from .. import stac
+from .. import attributes, stac
+from ..attributes import DatasetAttributes
+from ..cog import Layout
+from ..compression import Compression
 from ..constants import (
     DEFAULT_CATALOG_TYPE,
     GLOBAL_BBOX,
@@ -22,6 +33,7 @@ from ..constants import (
     MAX_DEPTH_ATTRIBUTE_NAME,
     PROVIDERS,
 )
+from ..manifest import Manifest
 from ..time import TimeResolution
 from . import cog, iter_noaa_hrefs
 from .cog import Cog
@@ -48,6 +60,14 @@ def create_collection(
     cog_directory: Optional[str] = None,
     latest_only: bool = False,
     local_directory: Optional[str] = None,
+    compression: Optional[Compression] = None,
+    variable_compression: Optional[Dict[str, Compression]] = None,
+    packed: bool = False,
+    layout: Layout = Layout.Single,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    workers: int = 1,
+    item_directories: bool = False,
 ) -> Collection:
     """Creates a STAC Collection for the provided CDR.
 
@@ -62,6 +82,30 @@ def create_collection(
         local_directory (Optional[str]): Read netcdf files from this local
             directory instead of from NOAA's servers. Only used if
             cog_directory is not None.
+        compression (Optional[Compression]): The compression profile for the
+            COGs. Only used if cog_directory is not None.
+        variable_compression (Optional[Dict[str, Compression]]): Compression
+            profiles keyed by asset key, overriding ``compression``. Only used
+            if cog_directory is not None.
+        packed (bool): Write the NetCDF's stored (e.g. packed integer) values
+            to the COGs instead of decoded floats. Only used if cog_directory
+            is not None.
+        layout (Layout): The COG layout, ``Layout.Time`` for one COG per
+            NetCDF file with a band per time slice. Only used if cog_directory
+            is not None.
+        since (Optional[datetime.datetime]): Only create items for the time
+            slices that end at or after this datetime. Only used if
+            cog_directory is not None.
+        until (Optional[datetime.datetime]): Only create items for the time
+            slices that start at or before this datetime. Only used if
+            cog_directory is not None.
+        workers (int): The number of NetCDF files processed concurrently, in a
+            pool of processes. Only used if cog_directory is not None.
+        item_directories (bool): Write each COG into its item's directory
+            under cog_directory, so that after
+            ``collection.normalize_hrefs(cog_directory, item_layout_strategy())``
+            the COGs are already next to their items and don't need to be
+            moved. Only used if cog_directory is not None.
 
     Returns:
         Collection: STAC Collection object
@@ -110,7 +154,19 @@ def create_collection(
         hrefs = []
         if local_directory:
             hrefs = list(_local_hrefs(local_directory))
-        items = create_items(hrefs, cog_directory, latest_only=latest_only)
+        items = create_items(
+            hrefs,
+            cog_directory,
+            latest_only=latest_only,
+            compression=compression,
+            variable_compression=variable_compression,
+            packed=packed,
+            layout=layout,
+            since=since,
+            until=until,
+            workers=workers,
+            item_directories=item_directories,
+        )
         asset_definitions = dict()
         for item in items:
             for key, asset in item.assets.items():
@@ -154,49 +210,168 @@ def create_items(
     cog_hrefs: Optional[List[str]] = None,
     latest_only: bool = False,
     read_href_modifier: Optional[ReadHrefModifier] = None,
+    compression: Optional[Compression] = None,
+    variable_compression: Optional[Dict[str, Compression]] = None,
+    packed: bool = False,
+    layout: Layout = Layout.Single,
+    manifest: Optional[Manifest] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    workers: int = 1,
+    item_directories: bool = False,
 ) -> List[Item]:
     """Creates items from the netcdf files located at hrefs.
 
     If HREFs is an empty list, all NOAA hrefs (see `iter_noaa_hrefs`) will be used.
+    Only the time slices that overlap ``since`` and ``until``, if provided,
+    are read. With ``item_directories``, each COG is written into a
+    subdirectory of ``directory`` named after its item (see `cog.cogify`).
+    See `iter_items` for the order of the items and the use of more than one
+    worker.
     """
-
-    if not hrefs:
-        hrefs = list(iter_noaa_hrefs())
-    items: List[Item] = []
-    for i, href in enumerate(hrefs):
-        logger.info(f"Creating COGs for {href} ({i + 1} / {len(hrefs)})")
-        cogs = cog.cogify(
-            href,
+    return list(
+        iter_items(
+            hrefs,
             directory,
             cog_hrefs=cog_hrefs,
             latest_only=latest_only,
             read_href_modifier=read_href_modifier,
+            compression=compression,
+            variable_compression=variable_compression,
+            packed=packed,
+            layout=layout,
+            manifest=manifest,
+            since=since,
+            until=until,
+            workers=workers,
+            item_directories=item_directories,
+        )
+    )
+
+
+def iter_items(
+    hrefs: List[str],
+    directory: str,
+    cog_hrefs: Optional[List[str]] = None,
+    latest_only: bool = False,
+    read_href_modifier: Optional[ReadHrefModifier] = None,
+    compression: Optional[Compression] = None,
+    variable_compression: Optional[Dict[str, Compression]] = None,
+    packed: bool = False,
+    layout: Layout = Layout.Single,
+    manifest: Optional[Manifest] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    workers: int = 1,
+    item_directories: bool = False,
+) -> Iterator[Item]:
+    """Creates items from the netcdf files located at hrefs, yielding each
+    item as soon as all of its COGs are written.
+
+    An item gets its assets from every file with the same depth and period
+    (the ``geospatial_vertical_max`` and ``time_coverage_resolution``
+    attributes, from which item ids are built), e.g.
+    ``heat_content_anomaly_0-2000_yearly.nc`` and
+    ``mean_halosteric_sea_level_anomaly_0-2000_yearly.nc``. The items are
+    yielded in the order they're created from ``hrefs``, each as soon as the
+    last file of its depth and period, and every item before it, is done.
+    Knowing which file is the last of its group takes one pass over the
+    attributes of all files before the first COG is written. For remote
+    files that's one small ranged read per file, ``workers`` at a time (see
+    `attributes.read_many`).
+
+    With more than one worker, the files are cogified concurrently in a
+    process pool, and their COGs are merged into items in the same order, so
+    the items are the same as with one worker. A ``read_href_modifier`` must
+    then be picklable, and a manifest can't be used, since each worker would
+    write its own copy.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    elif workers > 1 and manifest:
+        raise ValueError("A manifest can't be used with more than one worker")
+    if not hrefs:
+        hrefs = list(iter_noaa_hrefs())
+    groups = [
+        _item_group(dataset_attributes)
+        for dataset_attributes in attributes.read_many(
+            hrefs, workers=workers, read_href_modifier=read_href_modifier
         )
-        items = _update_items(items, cogs)
-    return items
+    ]
+    cogify = functools.partial(
+        cog.cogify,
+        outdir=directory,
+        cog_hrefs=cog_hrefs,
+        latest_only=latest_only,
+        read_href_modifier=read_href_modifier,
+        compression=compression,
+        variable_compression=variable_compression,
+        packed=packed,
+        layout=layout,
+        manifest=manifest,
+        since=since,
+        until=until,
+        item_directories=item_directories,
+    )
+    remaining = collections.Counter(groups)
+    items: Dict[str, Item] = dict()
+    item_groups: Dict[str, Tuple[int, str]] = dict()
+    with ExitStack() as stack:
+        if workers == 1:
+            results: Iterator[List[Cog]] = map(cogify, hrefs)
+        else:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            results = executor.map(cogify, hrefs)
+        for i, (href, group, cogs) in enumerate(zip(hrefs, groups, results)):
+            logger.info(f"Created COGs for {href} ({i + 1} / {len(hrefs)})")
+            _update_items(items, cogs)
+            for c in cogs:
+                item_groups[c.item_id()] = group
+            remaining[group] -= 1
+            while items:
+                id = next(iter(items))
+                if remaining[item_groups[id]]:
+                    break
+                yield items.pop(id)
 
 
 def create_netcdf_item(
     href: str,
     read_href_modifier: Optional[ReadHrefModifier] = None,
 ) -> Item:
-    item = stac.create_item(
-        href=href, decode_times=False, read_href_modifier=read_href_modifier
-    )
-    if read_href_modifier:
-        href = read_href_modifier(href)
-    with fsspec.open(href) as file:
-        with xarray.open_dataset(file, decode_times=False) as dataset:
-            max_depth = int(dataset.attrs["geospatial_vertical_max"])
+    dataset_attributes = attributes.read(href, read_href_modifier)
+    item = stac.create_item(href=href, dataset_attributes=dataset_attributes)
+    max_depth = int(dataset_attributes.attrs["geospatial_vertical_max"])
     item.properties[MAX_DEPTH_ATTRIBUTE_NAME] = max_depth
     return item
 
 
-def _update_items(items: List[Item], cogs: List[Cog]) -> List[Item]:
-    items_as_dict = dict((item.id, item) for item in items)
+def item_layout_strategy() -> HrefLayoutStrategy:
+    """Returns the layout strategy that puts each item into the directory its
+    COGs are written to with ``item_directories`` (see `cog.item_directory`).
+
+    Returns:
+        HrefLayoutStrategy: The strategy, for `pystac.Collection.normalize_hrefs`.
+    """
+    return CustomLayoutStrategy(
+        item_func=_item_href, fallback_strategy=BestPracticesLayoutStrategy()
+    )
+
+
+def _item_href(item: Item, parent_dir: str) -> str:
+    return os.path.join(cog.item_directory(parent_dir, item.id), f"{item.id}.json")
+
+
+def _update_items(items: Dict[str, Item], cogs: List[Cog]) -> None:
+    """Adds the COGs' assets to the items, keyed by item id, in place.
+
+    Items that don't exist yet are created, and are inserted after all
+    existing items.
+    """
     for c in cogs:
         id = c.item_id()
-        if id not in items_as_dict:
+        item = items.get(id)
+        if item is None:
             item = Item(
                 id=id,
                 geometry=GLOBAL_GEOMETRY,
@@ -213,8 +388,7 @@ def _update_items(items: List[Item], cogs: List[Cog]) -> List[Item]:
             projection.epsg = EPSG
             projection.shape = c.profile.shape
             projection.transform = list(TRANSFORM)[0:6]
-            items_as_dict[id] = item
-        item = items_as_dict[id]
+            items[id] = item
         title = c.attributes["title"].split(" : ")[0]
         min_depth = int(c.attributes["geospatial_vertical_min"])
         max_depth = int(c.attributes["geospatial_vertical_max"])
@@ -224,8 +398,18 @@ def _update_items(items: List[Item], cogs: List[Cog]) -> List[Item]:
         # The asset has the raster extension, but we need to make sure the item
         # has the schema url.
         _ = RasterExtension.ext(asset, add_if_missing=True)
-        items_as_dict[id] = item
-    return list(items_as_dict.values())
+
+
+def _item_group(dataset_attributes: DatasetAttributes) -> Tuple[int, str]:
+    # The depth and period, which (with the time step) make up the ids of the
+    # items that a file's COGs belong to.
+    time_resolution = TimeResolution.from_value(
+        dataset_attributes.time_coverage_resolution
+    )
+    return (
+        int(dataset_attributes.geospatial_vertical_max),
+        time_resolution.to_interval(),
+    )
 
 
 def _local_hrefs(directory: str) -> Iterator[str]:
@@ -0,0 +1,169 @@
+"""Command line options shared by several CDRs."""
+
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+import click
+
+from . import cache
+from .cog import Layout
+from .compression import Compression
+from .manifest import Manifest
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def compression_options(function: F) -> F:
+    """Adds ``--compression`` and ``--variable-compression`` to a command.
+
+    The command receives ``compression`` as an optional `Compression` and
+    ``variable_compression`` as a dictionary of variable names to
+    `Compression`.
+    """
+    function = click.option(
+        "--variable-compression",
+        multiple=True,
+        metavar="VARIABLE=PROFILE",
+        callback=_parse_variable_compression,
+        help="The compression profile for one variable, overriding "
+        "--compression. Can be used multiple times.",
+    )(function)
+    function = click.option(
+        "--compression",
+        metavar="PROFILE",
+        callback=_parse_compression,
+        help="The COG compression profile, as <codec>[-predictor][:<level>], "
+        "where codec is one of deflate, zstd, lzw, or none (defaults to deflate)",
+    )(function)
+    return function
+
+
+def packed_option(function: F) -> F:
+    """Adds ``--packed`` to a command, passed as the ``packed`` boolean."""
+    return click.option(
+        "--packed",
+        is_flag=True,
+        default=False,
+        show_default=True,
+        help="Write the values as stored in the NetCDF (e.g. packed integers) "
+        "instead of decoding them to floats",
+    )(function)
+
+
+def manifest_option(function: F) -> F:
+    """Adds ``--manifest`` to a command, passed as the optional ``manifest``
+    `Manifest`."""
+    return click.option(
+        "--manifest",
+        metavar="PATH",
+        callback=lambda context, parameter, value: Manifest(value) if value else None,
+        help="A JSON manifest of previously created COGs. Unchanged COGs are "
+        "skipped, and new ones are recorded.",
+    )(function)
+
+
+def ndjson_option(function: F) -> F:
+    """Adds ``--ndjson`` to a command, passed as the ``ndjson`` boolean."""
+    return click.option(
+        "--ndjson",
+        is_flag=True,
+        default=False,
+        show_default=True,
+        help="Write each item to the destination as a line of newline-delimited "
+        "JSON as soon as it is created, instead of one item collection",
+    )(function)
+
+
+def time_range_options(function: F) -> F:
+    """Adds ``--since`` and ``--until`` to a command, passed as the optional
+    ``since`` and ``until`` datetimes."""
+    function = click.option(
+        "--until",
+        type=click.DateTime(),
+        help="Only use time steps that overlap this datetime or earlier "
+        "(inclusive, UTC)",
+    )(function)
+    function = click.option(
+        "--since",
+        type=click.DateTime(),
+        help="Only use time steps that overlap this datetime or later (inclusive, UTC)",
+    )(function)
+    return function
+
+
+def cache_options(function: F) -> F:
+    """Adds ``--cache-dir`` and ``--cache-size`` to a command, passed as the
+    optional ``cache_dir`` string and the optional ``cache_size`` in bytes."""
+    function = click.option(
+        "--cache-size",
+        metavar="SIZE",
+        callback=_parse_size,
+        help="The maximum size of the --cache-dir, in bytes or with a K, M, G, "
+        "or T suffix (defaults to 20G). The least recently used files are "
+        "evicted first.",
+    )(function)
+    function = click.option(
+        "--cache-dir",
+        type=click.Path(file_okay=False),
+        help="Cache remote NetCDF files in this local directory, so that they "
+        "are only downloaded once",
+    )(function)
+    return function
+
+
+def layout_option(*layouts: Layout) -> Callable[[F], F]:
+    """Adds ``--layout`` to a command, passed as the ``layout`` `Layout`.
+
+    Args:
+        layouts (Layout): The layouts supported by the command.
+    """
+
+    def decorator(function: F) -> F:
+        return click.option(
+            "--layout",
+            type=click.Choice([layout.value for layout in layouts]),
+            default=Layout.Single.value,
+            show_default=True,
+            callback=lambda context, parameter, value: Layout(value),
+            help="The COG layout: single (one single-band COG per variable and "
+            "time step), time (a band per time step), or variables (a band per "
+            "variable)",
+        )(function)
+
+    return decorator
+
+
+def _parse_compression(
+    context: click.Context, parameter: click.Parameter, value: Optional[str]
+) -> Optional[Compression]:
+    if value is None:
+        return None
+    try:
+        return Compression.parse(value)
+    except ValueError as error:
+        raise click.BadParameter(str(error))
+
+
+def _parse_size(
+    context: click.Context, parameter: click.Parameter, value: Optional[str]
+) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return cache.parse_size(value)
+    except ValueError as error:
+        raise click.BadParameter(str(error))
+
+
+def _parse_variable_compression(
+    context: click.Context, parameter: click.Parameter, values: Tuple[str, ...]
+) -> Dict[str, Compression]:
+    variable_compression = dict()
+    for value in values:
+        variable, separator, name = value.partition("=")
+        if not separator:
+            raise click.BadParameter(f"Expected VARIABLE=PROFILE, got {value}")
+        try:
+            variable_compression[variable] = Compression.parse(name)
+        except ValueError as error:
+            raise click.BadParameter(str(error))
+    return variable_compression
@@ -1,6 +1,8 @@
+import dataclasses
+import functools
 import math
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Hashable, List, Optional
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Union
 
 import numpy
 import shapely.geometry
@@ -11,7 +13,12 @@ from pystac.extensions.raster import DataType, NoDataStrings, RasterBand
 from rasterio import Affine
 from xarray import DataArray, Dataset
 
+from .attributes import DatasetAttributes
+from .compression import DEFAULT_COMPRESSION, Compression
+
 UNITLESS = ["unitless", "1"]
+BLOCKSIZE = 512
+CRS_CACHE_SIZE = 32
 
 
 @dataclass
@@ -31,7 +38,7 @@ class DatasetProfile:
     needs_vertical_flip: bool
 
     @classmethod
-    def build(cls, dataset: Dataset) -> "DatasetProfile":
+    def build(cls, dataset: Union[Dataset, DatasetAttributes]) -> "DatasetProfile":
         xmin = float(dataset.geospatial_lon_min)
         xmax = float(dataset.geospatial_lon_max)
         needs_longitude_remap = False
@@ -48,8 +55,7 @@ class DatasetProfile:
             # We can't use the spatial reference attribute, which is WKT,
             # because it doesn't parse valid for sea ice.
             epsg = None
-            crs = CRS(dataset.projection.proj4text)
-            wkt2 = crs.to_wkt(WktVersion.WKT2_2019)
+            crs, wkt2 = cached_crs(dataset.projection.proj4text)
             shape = [
                 int(dataset.projection.parent_grid_cell_row_subset_end),
                 int(dataset.projection.parent_grid_cell_column_subset_end),
@@ -60,7 +66,7 @@ class DatasetProfile:
             needs_vertical_flip = False
         else:
             epsg = 4326
-            crs = CRS("EPSG:4326")
+            crs, _ = cached_crs("EPSG:4326")
             wkt2 = None
             shape = [int(dataset.sizes["lat"]), int(dataset.sizes["lon"])]
             transform = Affine(
@@ -111,6 +117,8 @@ class BandProfile:
     title: str
     dataset_profile: DatasetProfile
     variable: str
+    compression: Compression = DEFAULT_COMPRESSION
+    time_index: Optional[int] = None
 
     @classmethod
     def build(
@@ -118,8 +126,29 @@ class BandProfile:
         dataset: Dataset,
         variable: str,
         modifier: Optional[Callable[[DataArray], DataArray]] = None,
+        compression: Optional[Compression] = None,
+        dataset_profile: Optional[DatasetProfile] = None,
     ) -> "BandProfile":
-        dataset_profile = DatasetProfile.build(dataset)
+        """Builds the profile of one variable in a dataset.
+
+        Args:
+            dataset (Dataset): The dataset.
+            variable (str): The variable name.
+            modifier (Optional[Callable[[DataArray], DataArray]]): A function
+                applied to the squeezed variable, e.g. to select a time slice.
+            compression (Optional[Compression]): The COG compression profile.
+                Defaults to deflate.
+            dataset_profile (Optional[DatasetProfile]): The profile of
+                ``dataset``. Building it parses the dataset's CRS, so callers
+                building several band profiles from the same open dataset
+                should build it once with `DatasetProfile.build` and pass it
+                here. Defaults to building it from ``dataset``.
+
+        Returns:
+            BandProfile: The band profile.
+        """
+        if dataset_profile is None:
+            dataset_profile = DatasetProfile.build(dataset)
         data_array = dataset[variable].squeeze()
         if modifier:
             data_array = modifier(data_array)
@@ -132,7 +161,14 @@ class BandProfile:
                 f"{data_array.dtype}"
             )
         if data_type.startswith("float"):
-            nodata: Any = numpy.nan
+            # The fill value is only in the attributes if xarray has not masked
+            # it, in which case the raw values still contain it.
+            if "_FillValue" in data_array.attrs and not numpy.isnan(
+                data_array._FillValue
+            ):
+                nodata: Any = float(data_array._FillValue)
+            else:
+                nodata = numpy.nan
         else:
             nodata = int(data_array._FillValue)
         if "scale_factor" in data_array.attrs:
@@ -162,8 +198,54 @@ class BandProfile:
             title=title,
             dataset_profile=dataset_profile,
             variable=variable,
+            compression=compression or DEFAULT_COMPRESSION,
         )
 
+    @classmethod
+    def template(
+        cls,
+        dataset: Dataset,
+        variable: str,
+        compression: Optional[Compression] = None,
+        dataset_profile: Optional[DatasetProfile] = None,
+    ) -> "BandProfile":
+        """Builds the profile shared by every time step of a variable.
+
+        Slicing a variable by time doesn't change its data type, attributes,
+        or grid, so the profile is built once, from the first time step, and
+        each step's profile is derived from it with `time_step`.
+
+        Args:
+            dataset (Dataset): The dataset.
+            variable (str): The variable name, which must have a ``time``
+                dimension.
+            compression (Optional[Compression]): The COG compression profile.
+                Defaults to deflate.
+            dataset_profile (Optional[DatasetProfile]): The profile of
+                ``dataset``. Defaults to building it from ``dataset``.
+
+        Returns:
+            BandProfile: The template profile, without a time index.
+        """
+        return cls.build(
+            dataset,
+            variable,
+            lambda d: d.isel(time=0).squeeze(),
+            compression=compression,
+            dataset_profile=dataset_profile,
+        )
+
+    def time_step(self, index: int) -> "BandProfile":
+        """Returns the profile of one time step of a template's variable.
+
+        Args:
+            index (int): The time index.
+
+        Returns:
+            BandProfile: A copy of this profile with its time index set.
+        """
+        return dataclasses.replace(self, time_index=index)
+
     def cog_asset(self, href: str) -> Asset:
         asset = Asset(
             title=self.title, href=href, media_type=MediaType.COG, roles=["data"]
@@ -197,7 +279,47 @@ class BandProfile:
         return band
 
     def cog(self) -> Dict[str, Any]:
-        return {"compress": "deflate", "blocksize": 512, "driver": "COG"}
+        options = {
+            **self.compression.options(),
+            "blocksize": BLOCKSIZE,
+            "driver": "COG",
+        }
+        overview_resampling = self.overview_resampling()
+        if overview_resampling:
+            options["overview_resampling"] = overview_resampling
+        overview_count = self.overview_count()
+        if overview_count == 0:
+            options["overviews"] = "NONE"
+        elif overview_count is not None:
+            options["overview_count"] = overview_count
+        return options
+
+    def overview_resampling(self) -> Optional[str]:
+        """Returns the resampling method used to build overviews.
+
+        Subclasses should return "nearest" (or "mode") for categorical
+        variables, such as classes and bitfields, which can't be averaged.
+
+        Returns:
+            Optional[str]: The GDAL resampling method, or None for the COG
+                driver's default (cubic).
+        """
+        return None
+
+    def overview_count(self) -> Optional[int]:
+        """Returns the number of overview levels to build.
+
+        Grids that fit in one block (e.g. sea ice concentration's) get no
+        overviews, since a reader can fetch the whole grid in one request.
+
+        Returns:
+            Optional[int]: The number of levels, 0 to skip overviews, or None to
+                let the COG driver halve the grid until it fits in one block.
+        """
+        if self.width <= BLOCKSIZE and self.height <= BLOCKSIZE:
+            return 0
+        else:
+            return None
 
     @property
     def shape(self) -> List[int]:
@@ -220,6 +342,27 @@ class BandProfile:
         return self.dataset_profile.needs_vertical_flip
 
 
+@functools.lru_cache(maxsize=CRS_CACHE_SIZE)
+def cached_crs(definition: str) -> Tuple[CRS, str]:
+    """Returns a CRS and its WKT2, parsing and serializing each definition
+    only once per process.
+
+    The CDRs use a handful of CRSs (EPSG:4326 and the sea ice polar
+    stereographic grids), so batch runs over many files hit this cache for
+    almost every dataset. Use ``cached_crs.cache_info()`` for its hit and miss
+    counts. The returned CRS is shared, and shouldn't be modified.
+
+    Args:
+        definition (str): A PROJ string, or an authority code such as
+            ``EPSG:4326``.
+
+    Returns:
+        Tuple[CRS, str]: The CRS and its WKT2 (2019) string.
+    """
+    crs = CRS(definition)
+    return crs, crs.to_wkt(WktVersion.WKT2_2019)
+
+
 def _parse_resolution(value: Any) -> float:
     if isinstance(value, str):
         # Assume that the first part is a number and the rest are units,
@@ -0,0 +1,181 @@
+"""Reads of remote files over HTTP, a few small byte ranges at a time.
+
+A NetCDF4 file's attributes live in its HDF5 metadata: the superblock at the
+start of the file, and the object headers and heaps it points to, which are
+usually near the start too. h5py reads these with many small reads.
+`RangeFile` serves them from a small cache of fixed-size blocks, fetching
+each missing run of blocks with one HTTP Range request. Reading a file's
+attributes then transfers kilobytes, instead of the whole file.
+"""
+
+import io
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from fsspec.utils import get_protocol
+
+from .download import create_session
+
+DEFAULT_BLOCK_SIZE = 16 * 1024
+DEFAULT_MAX_BLOCKS = 64
+
+logger = logging.getLogger(__name__)
+
+# One session per process, since pooled connections can't be shared with
+# forked worker processes.
+_sessions: Dict[int, requests.Session] = dict()
+
+
+class RangeFile(io.RawIOBase):
+    """A read-only, seekable file over HTTP, read with Range requests through
+    a least-recently-used cache of blocks."""
+
+    def __init__(
+        self,
+        href: str,
+        session: Optional[requests.Session] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        max_blocks: int = DEFAULT_MAX_BLOCKS,
+    ) -> None:
+        """Opens a remote file, reading its first block.
+
+        Args:
+            href (str): The HTTP(S) href of the file. Its server must support
+                Range requests.
+            session (Optional[requests.Session]): The session to use.
+                Defaults to one per process.
+            block_size (int): The number of bytes fetched for each block. A
+                read that misses the cache fetches at least one block, which
+                serves the small reads that follow it.
+            max_blocks (int): The number of blocks to keep in the cache.
+        """
+        super().__init__()
+        if block_size < 1 or max_blocks < 1:
+            raise ValueError("block_size and max_blocks must be at least 1")
+        self.href = href
+        self.session = session or default_session()
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.bytes_transferred = 0
+        self.request_count = 0
+        self._blocks: "OrderedDict[int, bytes]" = OrderedDict()
+        self._position = 0
+        self._size: Optional[int] = None
+        self._fetch(0, 0)
+
+    @property
+    def size(self) -> int:
+        """The size of the file, in bytes."""
+        assert self._size is not None
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position: {position}")
+        self._position = position
+        return position
+
+    def tell(self) -> int:
+        return self._position
+
+    def readinto(self, buffer: Any) -> int:
+        view = memoryview(buffer).cast("B")
+        end = min(self._position + len(view), self.size)
+        if end <= self._position:
+            return 0
+        first = self._position // self.block_size
+        last = (end - 1) // self.block_size
+        self._fetch(first, last)
+        written = 0
+        for index in range(first, last + 1):
+            block = self._blocks[index]
+            self._blocks.move_to_end(index)
+            start = max(self._position - index * self.block_size, 0)
+            stop = min(end - index * self.block_size, len(block))
+            view[written : written + stop - start] = block[start:stop]
+            written += stop - start
+        self._position = end
+        while len(self._blocks) > max(self.max_blocks, last - first + 1):
+            self._blocks.popitem(last=False)
+        return written
+
+    def close(self) -> None:
+        if not self.closed:
+            logger.debug(
+                f"Read {self.bytes_transferred} bytes of {self.href} in "
+                f"{self.request_count} requests"
+            )
+            self._blocks.clear()
+        super().close()
+
+    def _fetch(self, first: int, last: int) -> None:
+        # Fetches each run of missing blocks between first and last with one
+        # request.
+        for start, stop in _runs(
+            [i for i in range(first, last + 1) if i not in self._blocks]
+        ):
+            data = self._get(start * self.block_size, (stop + 1) * self.block_size - 1)
+            for index in range(start, stop + 1):
+                offset = (index - start) * self.block_size
+                self._blocks[index] = data[offset : offset + self.block_size]
+
+    def _get(self, start: int, end: int) -> bytes:
+        with self.session.get(
+            self.href, headers={"Range": f"bytes={start}-{end}"}, stream=True
+        ) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise OSError(f"{self.href} doesn't support Range requests")
+            content_range = response.headers.get("Content-Range", "")
+            range_, _, size = content_range.partition("/")
+            if not range_.startswith(f"bytes {start}-") or not size.isdigit():
+                raise OSError(
+                    f"Requested bytes {start}-{end} of {self.href}, got "
+                    f"{content_range}"
+                )
+            data = response.content
+        self._size = int(size)
+        self.bytes_transferred += len(data)
+        self.request_count += 1
+        return data
+
+
+def default_session() -> requests.Session:
+    """Returns this process's session for remote reads."""
+    pid = os.getpid()
+    if pid not in _sessions:
+        _sessions[pid] = create_session()
+    return _sessions[pid]
+
+
+def is_http(href: str) -> bool:
+    """Returns True if an href is an HTTP(S) URL."""
+    return get_protocol(href) in ("http", "https")
+
+
+def _runs(indices: List[int]) -> List[Tuple[int, int]]:
+    # (first, last) of each run of consecutive indices.
+    runs: List[Tuple[int, int]] = list()
+    for index in indices:
+        if runs and runs[-1][1] == index - 1:
+            runs[-1] = (runs[-1][0], index)
+        else:
+            runs.append((index, index))
+    return runs
@@ -1,9 +1,12 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from pystac import Asset
 
 from .. import cog
+from ..compression import Compression
+from ..manifest import Manifest
 from ..profile import BandProfile
+from ..session import DatasetSession
 from .constants import SPATIAL_RESOLUTION
 
 VARIABLES_WITH_CLASSES = [
@@ -15,8 +18,27 @@ VARIABLES_WITH_CLASSES = [
 VARIABLES_WITH_BITFIELDS = ["qa_of_cdr_seaice_conc", "spatial_interpolation_flag"]
 
 
-def cogify(href: str, directory: str) -> Dict[str, Asset]:
-    return cog.cogify(href, directory, SeaIceConcentrationBandProfile)
+def cogify(
+    href: str,
+    directory: str,
+    workers: int = 1,
+    compression: Optional[Compression] = None,
+    variable_compression: Optional[Dict[str, Compression]] = None,
+    streaming: bool = False,
+    manifest: Optional[Manifest] = None,
+    session: Optional[DatasetSession] = None,
+) -> Dict[str, Asset]:
+    return cog.cogify(
+        href,
+        directory,
+        SeaIceConcentrationBandProfile,
+        workers=workers,
+        compression=compression,
+        variable_compression=variable_compression,
+        streaming=streaming,
+        manifest=manifest,
+        session=session,
+    )
 
 
 class SeaIceConcentrationBandProfile(BandProfile):
@@ -29,6 +51,15 @@ class SeaIceConcentrationBandProfile(BandProfile):
             asset.extra_fields["classification:bitfields"] = self.bitfield()
         return asset
 
+    def overview_resampling(self) -> Optional[str]:
+        if (
+            self.variable in VARIABLES_WITH_CLASSES
+            or self.variable in VARIABLES_WITH_BITFIELDS
+        ):
+            return "nearest"
+        else:
+            return None
+
     def classes(self) -> List[Dict[str, Any]]:
         if "flag_values" in self.attrs:
             values = self.attrs["flag_values"]
@@ -1,4 +1,5 @@
 import os.path
+from typing import Dict, Optional
 
 from pystac import Collection, Item
 from pystac.extensions.item_assets import AssetDefinition, ItemAssetsExtension
@@ -6,11 +7,14 @@ from pystac.extensions.raster import RasterExtension
 from pystac.extensions.scientific import ScientificExtension
 
 from .. import stac
+from ..compression import Compression
 from ..constants import (
     CLASSIFICATION_EXTENSION_SCHEMA,
     DEFAULT_CATALOG_TYPE,
     NETCDF_ASSET_KEY,
 )
+from ..manifest import Manifest
+from ..session import DatasetSession
 from . import cog
 from .constants import (
     CITATION,
@@ -27,15 +31,35 @@ from .constants import (
 )
 
 
-def create_item(href: str) -> Item:
+def create_item(href: str, session: Optional[DatasetSession] = None) -> Item:
     # We have to manually override the id because the `id` attribute in the
     # netcdf is set to the DOI.
-    return stac.create_item(href, id=os.path.splitext(os.path.basename(href))[0])
+    return stac.create_item(
+        href, id=os.path.splitext(os.path.basename(href))[0], session=session
+    )
 
 
-def add_cogs(item: Item, directory: str) -> Item:
+def add_cogs(
+    item: Item,
+    directory: str,
+    workers: int = 1,
+    compression: Optional[Compression] = None,
+    variable_compression: Optional[Dict[str, Compression]] = None,
+    streaming: bool = False,
+    manifest: Optional[Manifest] = None,
+    session: Optional[DatasetSession] = None,
+) -> Item:
     netcdf_asset = item.assets[NETCDF_ASSET_KEY]
-    assets = cog.cogify(netcdf_asset.href, directory)
+    assets = cog.cogify(
+        netcdf_asset.href,
+        directory,
+        workers=workers,
+        compression=compression,
+        variable_compression=variable_compression,
+        streaming=streaming,
+        manifest=manifest,
+        session=session,
+    )
     for key, asset in assets.items():
         item.add_asset(key, asset)
     item.stac_extensions.append(CLASSIFICATION_EXTENSION_SCHEMA)
@@ -1,4 +1,5 @@
 import os
+from typing import Dict, Optional
 
 import click
 import pystac.utils
@@ -6,6 +7,10 @@ import stactools.noaa_cdr.stac
 from click import Command, Group
 from pystac import CatalogType
 
+from ..compression import Compression
+from ..manifest import Manifest
+from ..options import compression_options, manifest_option
+from ..session import DatasetSession
 from . import stac
 
 
@@ -50,12 +55,52 @@ def create_command(noaa_cdr: Group) -> Command:
         default=False,
         show_default=True,
     )
-    def create_item(source: str, destination: str, cogs: bool) -> None:
-        item = stac.create_item(source)
+    @click.option(
+        "-w",
+        "--workers",
+        type=click.IntRange(min=1),
+        default=1,
+        show_default=True,
+        help="The number of processes used to encode COGs (only used with --cogs)",
+    )
+    @click.option(
+        "--streaming/--no-streaming",
+        default=False,
+        show_default=True,
+        help="Read and write COGs one block of rows at a time to bound memory use "
+        "(only used with --cogs, can't be used with --workers)",
+    )
+    @compression_options
+    @manifest_option
+    def create_item(
+        source: str,
+        destination: str,
+        cogs: bool,
+        workers: int,
+        streaming: bool,
+        compression: Optional[Compression],
+        variable_compression: Dict[str, Compression],
+        manifest: Optional[Manifest],
+    ) -> None:
+        if cogs and streaming and workers > 1:
+            raise click.UsageError("--streaming can't be used with --workers")
         if cogs:
             directory = os.path.dirname(destination)
             os.makedirs(directory, exist_ok=True)
-            stactools.noaa_cdr.stac.add_cogs(item, directory)
+            with DatasetSession(source) as session:
+                item = stac.create_item(source, session=session)
+                stactools.noaa_cdr.stac.add_cogs(
+                    item,
+                    directory,
+                    workers=workers,
+                    compression=compression,
+                    variable_compression=variable_compression,
+                    streaming=streaming,
+                    manifest=manifest,
+                    session=session,
+                )
+        else:
+            item = stac.create_item(source)
         for key, asset in item.assets.items():
             asset.href = pystac.utils.make_relative_href(asset.href, destination)
             item.assets[key] = asset
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pystac import CatalogType, Collection, Item
 from pystac.extensions.item_assets import AssetDefinition, ItemAssetsExtension
 from pystac.extensions.raster import RasterExtension
@@ -5,6 +7,7 @@ from pystac.extensions.scientific import ScientificExtension
 
 from .. import stac
 from ..constants import DEFAULT_CATALOG_TYPE, LICENSE, PROVIDERS
+from ..session import DatasetSession
 from .constants import (
     CITATION,
     DESCRIPTION,
@@ -48,5 +51,5 @@ def create_collection(catalog_type: CatalogType = DEFAULT_CATALOG_TYPE) -> Colle
     return collection
 
 
-def create_item(href: str) -> Item:
-    return stac.create_item(href)
+def create_item(href: str, session: Optional[DatasetSession] = None) -> Item:
+    return stac.create_item(href, session=session)
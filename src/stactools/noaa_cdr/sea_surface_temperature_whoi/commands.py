@@ -1,10 +1,22 @@
+import datetime
 from pathlib import Path
+from typing import Dict, Optional
 
 import click
-import pystac.utils
 from click import Command, Group
-from pystac import ItemCollection
+from stactools.noaa_cdr.cog import Layout
+from stactools.noaa_cdr.compression import Compression
+from stactools.noaa_cdr.manifest import Manifest
+from stactools.noaa_cdr.options import (
+    compression_options,
+    layout_option,
+    manifest_option,
+    ndjson_option,
+    packed_option,
+    time_range_options,
+)
 from stactools.noaa_cdr.sea_surface_temperature_whoi import stac
+from stactools.noaa_cdr.stac import save_items
 
 
 def create_command(noaa_cdr: Group) -> Command:
@@ -20,14 +32,38 @@ def create_command(noaa_cdr: Group) -> Command:
     )
     @click.argument("source")
     @click.argument("destination")
-    def create_cog_items(source: str, destination: str) -> None:
-        items = stac.create_cog_items(source, str(Path(destination).parent))
-        for item in items:
-            for key, asset in item.assets.items():
-                asset.href = pystac.utils.make_relative_href(asset.href, destination)
-                item.assets[key] = asset
-        item_collection = ItemCollection(items)
-        item_collection.save_object(dest_href=destination)
+    @compression_options
+    @packed_option
+    @layout_option(Layout.Single, Layout.Time, Layout.Variables)
+    @manifest_option
+    @time_range_options
+    @ndjson_option
+    def create_cog_items(
+        source: str,
+        destination: str,
+        compression: Optional[Compression],
+        variable_compression: Dict[str, Compression],
+        packed: bool,
+        layout: Layout,
+        manifest: Optional[Manifest],
+        since: Optional[datetime.datetime],
+        until: Optional[datetime.datetime],
+        ndjson: bool,
+    ) -> None:
+        if packed and layout == Layout.Variables:
+            raise click.UsageError("--packed can't be used with --layout variables")
+        items = stac.iter_cog_items(
+            source,
+            str(Path(destination).parent),
+            compression=compression,
+            variable_compression=variable_compression,
+            packed=packed,
+            layout=layout,
+            manifest=manifest,
+            since=since,
+            until=until,
+        )
+        save_items(items, destination, ndjson=ndjson)
 
     @sea_surface_temperature_whoi.command(
         "create-collection", short_help="Create a STAC collection"
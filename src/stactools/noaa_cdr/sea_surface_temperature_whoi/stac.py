@@ -1,18 +1,20 @@
+import datetime
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 
-import dateutil.relativedelta
-import fsspec
-import numpy
 import xarray
 from pystac import Collection, Item
 from pystac.extensions.item_assets import AssetDefinition, ItemAssetsExtension
 from pystac.extensions.raster import RasterExtension
 from pystac.extensions.scientific import ScientificExtension
-from stactools.noaa_cdr.profile import BandProfile
+from stactools.noaa_cdr.profile import BandProfile, DatasetProfile
 
 from .. import cog, dataset, stac, time
+from ..cache import open_href
+from ..cog import Layout
+from ..compression import Compression, select_compression
 from ..constants import DEFAULT_CATALOG_TYPE, LICENSE, PROVIDERS
+from ..manifest import Manifest
 from .constants import (
     CITATION,
     DESCRIPTION,
@@ -29,44 +31,223 @@ from .constants import (
 TIME_WINDOW_HALF_WIDTH_IN_MINUTES = int(3 * 60 / 2)
 
 
-def create_cog_items(href: str, directory: str) -> List[Item]:
+def create_cog_items(
+    href: str,
+    directory: str,
+    compression: Optional[Compression] = None,
+    variable_compression: Optional[Dict[str, Compression]] = None,
+    packed: bool = False,
+    layout: Layout = Layout.Single,
+    manifest: Optional[Manifest] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+) -> List[Item]:
+    """Creates one item, with one COG per variable, for each time step.
+
+    See `iter_cog_items` for the arguments.
+
+    Returns:
+        List[Item]: The items, in time order.
+    """
+    return list(
+        iter_cog_items(
+            href,
+            directory,
+            compression=compression,
+            variable_compression=variable_compression,
+            packed=packed,
+            layout=layout,
+            manifest=manifest,
+            since=since,
+            until=until,
+        )
+    )
+
+
+def iter_cog_items(
+    href: str,
+    directory: str,
+    compression: Optional[Compression] = None,
+    variable_compression: Optional[Dict[str, Compression]] = None,
+    packed: bool = False,
+    layout: Layout = Layout.Single,
+    manifest: Optional[Manifest] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+) -> Iterator[Item]:
+    """Creates one item, with one COG per variable, for each time step,
+    yielding each item as soon as its COGs are written.
+
+    With ``Layout.Time``, the items share COGs that are written after the
+    last time step is read, so all items are yielded at the end.
+
+    Args:
+        href (str): The href of the NetCDF file.
+        directory (str): The directory in which to write the COGs.
+        compression (Optional[Compression]): The compression profile for all
+            variables. Defaults to deflate.
+        variable_compression (Optional[Dict[str, Compression]]): Compression
+            profiles for specific variables, overriding ``compression``.
+        packed (bool): Write the values as stored in the NetCDF file (e.g.
+            packed integers) instead of decoding them to floats. The scale,
+            offset, and fill value are recorded in the raster bands.
+        layout (Layout): The COG layout. ``Layout.Time`` writes one COG per
+            variable with a band per time step, and ``Layout.Variables`` one
+            COG per time step with a band per variable, promoted to a common
+            data type. Stacked variables must share a nodata value, which
+            isn't the case for packed values. Assets reference their band
+            with ``noaa_cdr:band``.
+        manifest (Optional[Manifest]): If provided, COGs that the manifest
+            shows are up to date aren't re-written, and the written COGs are
+            recorded in it.
+        since (Optional[datetime.datetime]): Only create items for the time
+            steps whose window ends at or after this datetime.
+        until (Optional[datetime.datetime]): Only create items for the time
+            steps whose window starts at or before this datetime. With
+            ``Layout.Time``, the COGs only have bands for the selected steps.
+
+    Yields:
+        Item: The items, in time order.
+    """
+    if packed and layout == Layout.Variables:
+        raise ValueError(
+            "Packed variables can't be stacked with Layout.Variables, since "
+            "they don't share a nodata value"
+        )
     base_item = stac.create_item(href)
     del base_item.assets["netcdf"]
     items = list()
-    with fsspec.open(href) as file:
-        with xarray.open_dataset(file) as ds:
-            variables = dataset.data_variable_names(ds)
-            profiles = dict()
-            for variable in variables:
-                profiles[variable] = BandProfile.build(
-                    ds, variable, lambda d: d.isel(time=0).squeeze()
-                )
-            for i, dt in enumerate(
-                time.datetime64_to_datetime(dt) for dt in ds.time.values
-            ):
-                item = base_item.clone()
-                item.id = f"{item.id}-{i}"
-                item.common_metadata.start_datetime = (
-                    dt
-                    - dateutil.relativedelta.relativedelta(
-                        minutes=TIME_WINDOW_HALF_WIDTH_IN_MINUTES
+    try:
+        with open_href(href) as file:
+            with xarray.open_dataset(file, mask_and_scale=not packed) as ds:
+                variables = dataset.data_variable_names(ds)
+                profiles = dict()
+                dataset_profile = DatasetProfile.build(ds)
+                for variable in variables:
+                    profiles[variable] = BandProfile.template(
+                        ds,
+                        variable,
+                        compression=select_compression(
+                            variable, compression, variable_compression
+                        ),
+                        dataset_profile=dataset_profile,
                     )
-                )
-                item.common_metadata.end_datetime = (
-                    dt
-                    + dateutil.relativedelta.relativedelta(
-                        minutes=TIME_WINDOW_HALF_WIDTH_IN_MINUTES
+                if layout == Layout.Variables:
+                    profiles = dict(
+                        zip(variables, cog.promote([profiles[v] for v in variables]))
                     )
+                axis = time.TimeAxis.from_datetime64(
+                    ds.time.values,
+                    datetime.timedelta(minutes=TIME_WINDOW_HALF_WIDTH_IN_MINUTES),
                 )
-                for variable in variables:
-                    values = numpy.flipud(ds[variable].isel(time=i).values.squeeze())
-                    values = numpy.roll(values, int(profiles[variable].width / 2), 1)
-                    path = Path(directory) / f"{item.id}-{variable}.tif"
-                    cog.write(values, str(path), profiles[variable])
-                    item.assets[variable] = profiles[variable].cog_asset(str(path))
-                items.append(item)
-
-    return items
+                indices = axis.select(since, until)
+                datetimes, start_datetimes, end_datetimes = axis.to_datetimes(indices)
+                for position, i in enumerate(indices):
+                    item = base_item.clone()
+                    item.id = f"{item.id}-{i}"
+                    item.common_metadata.start_datetime = start_datetimes[position]
+                    item.common_metadata.end_datetime = end_datetimes[position]
+                    if layout == Layout.Variables:
+                        path = Path(directory) / f"{item.id}.tif"
+                        _write_cog(
+                            ds,
+                            href,
+                            str(path),
+                            [(variable, i, variable) for variable in variables],
+                            profiles,
+                            manifest,
+                        )
+                        for band, variable in enumerate(variables, start=1):
+                            item.assets[variable] = cog.band_asset(
+                                profiles[variable], str(path), band
+                            )
+                    elif layout == Layout.Time:
+                        for variable in variables:
+                            path = Path(directory) / f"{base_item.id}-{variable}.tif"
+                            item.assets[variable] = cog.band_asset(
+                                profiles[variable], str(path), position + 1
+                            )
+                    else:
+                        for variable in variables:
+                            path = Path(directory) / f"{item.id}-{variable}.tif"
+                            _write_cog(
+                                ds,
+                                href,
+                                str(path),
+                                [(variable, i, variable)],
+                                profiles,
+                                manifest,
+                                stacked=False,
+                            )
+                            item.assets[variable] = profiles[variable].cog_asset(
+                                str(path)
+                            )
+                    if layout == Layout.Time:
+                        items.append(item)
+                    else:
+                        yield item
+                if layout == Layout.Time and indices:
+                    for variable in variables:
+                        path = Path(directory) / f"{base_item.id}-{variable}.tif"
+                        _write_cog(
+                            ds,
+                            href,
+                            str(path),
+                            [
+                                (variable, i, dt.isoformat())
+                                for i, dt in zip(indices, datetimes)
+                            ],
+                            profiles,
+                            manifest,
+                        )
+                    yield from items
+    finally:
+        if manifest:
+            manifest.save()
+
+
+def _write_cog(
+    ds: xarray.Dataset,
+    href: str,
+    path: str,
+    bands: List[Tuple[str, int, str]],
+    profiles: Dict[str, BandProfile],
+    manifest: Optional[Manifest],
+    stacked: bool = True,
+) -> None:
+    # Each band is a (variable, time index, description) triple.
+    band_profiles = [profiles[variable].time_step(i) for variable, i, _ in bands]
+    if manifest:
+        variables = ",".join(dict.fromkeys(variable for variable, _, _ in bands))
+        time_indices = set(i for _, i, _ in bands)
+        entry = manifest.entry(
+            href,
+            variables,
+            time_indices.pop() if len(time_indices) == 1 else None,
+            band_profiles,
+        )
+        if manifest.is_current(path, entry):
+            return
+    values = [ds[variable].isel(time=i).values.squeeze() for variable, i, _ in bands]
+    if manifest:
+        entry = entry.with_values(values)
+        if manifest.is_current(path, entry):
+            manifest.record(path, entry)
+            return
+    if stacked:
+        cog.write_stacked(
+            [
+                (band_values, profile, description)
+                for band_values, profile, (_, _, description) in zip(
+                    values, band_profiles, bands
+                )
+            ],
+            path,
+        )
+    else:
+        cog.write(values[0], path, band_profiles[0])
+    if manifest:
+        manifest.record(path, entry)
 
 
 def create_collection() -> Collection:
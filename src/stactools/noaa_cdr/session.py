@@ -0,0 +1,81 @@
+"""One open NetCDF file, shared by the steps that build an item.
+
+Building a fully-populated item reads the same NetCDF file several times: for
+the item's metadata (`stac.create_item`), for its COGs (`cog.cogify`), and for
+CDR-specific properties. For remote files each open costs a round trip for the
+HDF5 metadata, so a `DatasetSession` opens the file once, and builds its
+`DatasetProfile` once, for all of them.
+"""
+
+import functools
+from contextlib import ExitStack
+from types import TracebackType
+from typing import Optional, Type
+
+import xarray
+from stactools.core.io import ReadHrefModifier
+from xarray import Dataset
+
+from .cache import open_href
+from .profile import DatasetProfile
+
+
+class DatasetSession:
+    """An open NetCDF file and its `DatasetProfile`.
+
+    The dataset is opened without decoding times or masking and scaling
+    values, which is how COGs are read. Item metadata only uses attributes,
+    which aren't affected.
+
+    Use it as a context manager::
+
+        with DatasetSession(href) as session:
+            item = stac.create_item(href, session=session)
+            stac.add_cogs(item, directory, session=session)
+    """
+
+    def __init__(
+        self, href: str, read_href_modifier: Optional[ReadHrefModifier] = None
+    ) -> None:
+        """Creates a session for a NetCDF file, without opening it.
+
+        Args:
+            href (str): The href of the NetCDF file.
+            read_href_modifier (Optional[ReadHrefModifier]): A function to
+                modify the href before reading.
+        """
+        self.href = href
+        if read_href_modifier:
+            self.read_href = read_href_modifier(href)
+        else:
+            self.read_href = href
+        self._stack = ExitStack()
+        self._dataset: Optional[Dataset] = None
+
+    def __enter__(self) -> "DatasetSession":
+        file = self._stack.enter_context(open_href(self.read_href, key=self.href))
+        self._dataset = self._stack.enter_context(
+            xarray.open_dataset(file, decode_times=False, mask_and_scale=False)
+        )
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._dataset = None
+        self._stack.close()
+
+    @property
+    def dataset(self) -> Dataset:
+        """The open dataset."""
+        if self._dataset is None:
+            raise ValueError(f"The session for {self.href} isn't open")
+        return self._dataset
+
+    @functools.cached_property
+    def profile(self) -> DatasetProfile:
+        """The dataset's profile, built on first use."""
+        return DatasetProfile.build(self.dataset)
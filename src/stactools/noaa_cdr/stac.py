@@ -1,102 +1,197 @@
 import os.path
-from typing import Optional
+import warnings
+from typing import Dict, Iterable, Optional, Union
 
 import dateutil.parser
 import fsspec
+import orjson
 import pystac.utils
 import xarray
-from pystac import Asset, Item
+from pystac import Asset, Item, ItemCollection
 from pystac.extensions.projection import ProjectionExtension
 from stactools.core.io import ReadHrefModifier
 
-from . import cog
+from . import attributes, cog
+from .attributes import DatasetAttributes
+from .compression import Compression
 from .constants import (
     INTERVAL_ATTRIBUTE_NAME,
     NETCDF_ASSET_KEY,
     PROCESSING_EXTENSION_SCHEMA,
 )
+from .manifest import Manifest
 from .profile import DatasetProfile
+from .session import DatasetSession
 from .time import TimeDuration, TimeResolution
 
 
 def create_item(
     href: str,
     id: Optional[str] = None,
-    decode_times: bool = True,
+    decode_times: Optional[bool] = None,
     read_href_modifier: Optional[ReadHrefModifier] = None,
+    session: Optional[DatasetSession] = None,
+    dataset_attributes: Optional[DatasetAttributes] = None,
 ) -> Item:
-    if read_href_modifier:
-        read_href = read_href_modifier(href)
-    else:
-        read_href = href
-    with fsspec.open(read_href) as file:
-        with xarray.open_dataset(file, decode_times=decode_times) as ds:
-            if id is None:
-                if "id" in ds.attrs:
-                    id = os.path.splitext(ds.id)[0]
-                else:
-                    id = os.path.splitext(os.path.basename(href))[0]
-            profile = DatasetProfile.build(ds)
-            if "time_coverage_start" in ds.attrs:
-                if "time_coverage_end" in ds.attrs:
-                    properties = {
-                        "start_datetime": ds.time_coverage_start,
-                        "end_datetime": ds.time_coverage_end,
-                    }
-                elif "time_coverage_duration" in ds.attrs:
-                    time_duration = TimeDuration.parse(ds.time_coverage_duration)
-                    start_datetime = dateutil.parser.parse(ds.time_coverage_start)
-                    end_datetime = time_duration.end_datetime(start_datetime)
-                    properties = {
-                        "start_datetime": pystac.utils.datetime_to_str(start_datetime),
-                        "end_datetime": pystac.utils.datetime_to_str(end_datetime),
-                    }
-            if "time_coverage_resolution" in ds.attrs:
-                time_resolution = TimeResolution.from_value(ds.time_coverage_resolution)
-                interval = time_resolution.to_interval()
-            else:
-                interval = None
-            item = Item(
-                id=id,
-                geometry=profile.geometry,
-                bbox=profile.bbox,
-                datetime=None,
-                properties=properties,
-            )
-            if interval:
-                item.properties[INTERVAL_ATTRIBUTE_NAME] = interval
-            item.stac_extensions.append(PROCESSING_EXTENSION_SCHEMA)
-            item.properties["processing:level"] = f"L{ds.processing_level[-1]}"
-            asset = Asset(
-                href=href,
-                title=f"{ds.title} NetCDF",
-                description=ds.summary,
-                media_type="application/x-netcdf",
-                roles=["data"],
-            )
-            asset.common_metadata.created = dateutil.parser.parse(ds.date_created)
-            asset.common_metadata.platform = ds.platform
-            asset.common_metadata.instruments = [ds.sensor]
-            if "date_modified" in ds.attrs:
-                asset.common_metadata.updated = dateutil.parser.parse(ds.date_modified)
-            item.assets[NETCDF_ASSET_KEY] = asset
-
-            projection = ProjectionExtension.ext(item, add_if_missing=True)
-            projection.epsg = profile.epsg
-            if profile.wkt2:
-                projection.wkt2 = profile.wkt2
-            projection.shape = profile.shape
-            projection.transform = list(profile.transform)[0:6]
+    """Creates an item, with a NetCDF asset, from a NetCDF file's attributes.
 
-    return item
+    Without a session, only the file's attributes and dimension sizes are
+    read, with `attributes.read`, instead of opening it as a dataset.
+
+    Args:
+        href (str): The href of the NetCDF file.
+        id (Optional[str]): The item id. Defaults to the file's ``id``
+            attribute, or its file name, without extension.
+        decode_times (Optional[bool]): Deprecated and ignored, since times are
+            read from attributes, which aren't decoded. Passing it warns.
+        read_href_modifier (Optional[ReadHrefModifier]): A function to modify
+            the href before reading. Not used with a session.
+        session (Optional[DatasetSession]): An open session for the file, to
+            share with e.g. `add_cogs` instead of opening the file again.
+        dataset_attributes (Optional[DatasetAttributes]): The file's
+            attributes, if they've already been read.
+
+    Returns:
+        Item: The item.
+    """
+    if decode_times is not None:
+        warnings.warn(
+            "The decode_times argument of create_item is ignored, since item "
+            "metadata is read from attributes, which aren't decoded",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+    if session:
+        return _create_item(href, id, session.dataset, session.profile)
+    if dataset_attributes is None:
+        dataset_attributes = attributes.read(href, read_href_modifier)
+    return _create_item(
+        href, id, dataset_attributes, DatasetProfile.build(dataset_attributes)
+    )
 
 
-def add_cogs(item: Item, directory: str) -> Item:
+def add_cogs(
+    item: Item,
+    directory: str,
+    workers: int = 1,
+    compression: Optional[Compression] = None,
+    variable_compression: Optional[Dict[str, Compression]] = None,
+    streaming: bool = False,
+    manifest: Optional[Manifest] = None,
+    session: Optional[DatasetSession] = None,
+) -> Item:
     href = item.assets[NETCDF_ASSET_KEY].href
     assets = cog.cogify(
         href,
         directory,
+        workers=workers,
+        compression=compression,
+        variable_compression=variable_compression,
+        streaming=streaming,
+        manifest=manifest,
+        session=session,
     )
     for key, value in assets.items():
         item.add_asset(key, value)
     return item
+
+
+def save_items(items: Iterable[Item], destination: str, ndjson: bool = False) -> int:
+    """Saves items, with asset hrefs relative to the destination.
+
+    Args:
+        items (Iterable[Item]): The items, e.g. from a generator.
+        destination (str): The href of the output file.
+        ndjson (bool): Write one item per line as newline-delimited JSON, as
+            soon as each item is produced, instead of collecting all items
+            into one ItemCollection.
+
+    Returns:
+        int: The number of items saved.
+    """
+    count = 0
+    if ndjson:
+        with fsspec.open(destination, "wb") as file:
+            for item in items:
+                _make_asset_hrefs_relative(item, destination)
+                file.write(orjson.dumps(item.to_dict()) + b"\n")
+                file.flush()
+                count += 1
+    else:
+        item_list = list()
+        for item in items:
+            _make_asset_hrefs_relative(item, destination)
+            item_list.append(item)
+        ItemCollection(item_list).save_object(dest_href=destination)
+        count = len(item_list)
+    return count
+
+
+def _create_item(
+    href: str,
+    id: Optional[str],
+    ds: Union[xarray.Dataset, DatasetAttributes],
+    profile: DatasetProfile,
+) -> Item:
+    if id is None:
+        if "id" in ds.attrs:
+            id = os.path.splitext(ds.id)[0]
+        else:
+            id = os.path.splitext(os.path.basename(href))[0]
+    if "time_coverage_start" in ds.attrs:
+        if "time_coverage_end" in ds.attrs:
+            properties = {
+                "start_datetime": ds.time_coverage_start,
+                "end_datetime": ds.time_coverage_end,
+            }
+        elif "time_coverage_duration" in ds.attrs:
+            time_duration = TimeDuration.parse(ds.time_coverage_duration)
+            start_datetime = dateutil.parser.parse(ds.time_coverage_start)
+            end_datetime = time_duration.end_datetime(start_datetime)
+            properties = {
+                "start_datetime": pystac.utils.datetime_to_str(start_datetime),
+                "end_datetime": pystac.utils.datetime_to_str(end_datetime),
+            }
+    if "time_coverage_resolution" in ds.attrs:
+        time_resolution = TimeResolution.from_value(ds.time_coverage_resolution)
+        interval = time_resolution.to_interval()
+    else:
+        interval = None
+    item = Item(
+        id=id,
+        geometry=profile.geometry,
+        bbox=profile.bbox,
+        datetime=None,
+        properties=properties,
+    )
+    if interval:
+        item.properties[INTERVAL_ATTRIBUTE_NAME] = interval
+    item.stac_extensions.append(PROCESSING_EXTENSION_SCHEMA)
+    item.properties["processing:level"] = f"L{ds.processing_level[-1]}"
+    asset = Asset(
+        href=href,
+        title=f"{ds.title} NetCDF",
+        description=ds.summary,
+        media_type="application/x-netcdf",
+        roles=["data"],
+    )
+    asset.common_metadata.created = dateutil.parser.parse(ds.date_created)
+    asset.common_metadata.platform = ds.platform
+    asset.common_metadata.instruments = [ds.sensor]
+    if "date_modified" in ds.attrs:
+        asset.common_metadata.updated = dateutil.parser.parse(ds.date_modified)
+    item.assets[NETCDF_ASSET_KEY] = asset
+
+    projection = ProjectionExtension.ext(item, add_if_missing=True)
+    projection.epsg = profile.epsg
+    if profile.wkt2:
+        projection.wkt2 = profile.wkt2
+    projection.shape = profile.shape
+    projection.transform = list(profile.transform)[0:6]
+
+    return item
+
+
+def _make_asset_hrefs_relative(item: Item, destination: str) -> None:
+    for asset in item.assets.values():
+        asset.href = pystac.utils.make_relative_href(asset.href, destination)
@@ -2,11 +2,14 @@ import datetime
 import math
 from dataclasses import dataclass
 from enum import Enum
-from typing import Tuple
+from typing import Any, Iterable, List, Optional, Sequence, Set, Tuple
 
 import dateutil.relativedelta
 import numpy
 from dateutil.tz import tzutc
+from numpy.typing import ArrayLike, NDArray
+
+ONE_SECOND = numpy.timedelta64(1, "s")
 
 
 def add_months_to_datetime(
@@ -38,6 +41,52 @@ def add_months_to_datetime(
         return time
 
 
+def add_months_to_datetimes(
+    base_time: datetime.datetime, months: ArrayLike
+) -> NDArray[Any]:
+    """Adds (possibly fractional) numbers of months to a datetime, for a whole
+    array of offsets at once.
+
+    This is the vectorized form of `add_months_to_datetime`, with identical
+    results: whole months are added with the day clamped to the end of the
+    month, and the fraction is taken of the length of the following month
+    and truncated to whole seconds. The base time is treated as UTC.
+
+    Args:
+        base_time (datetime.datetime): The start datetime, which must be naive
+            or in UTC, and have no microseconds.
+        months (ArrayLike): The numbers of months to advance, e.g. the ``time``
+            coordinate of an ocean heat content NetCDF file.
+    Returns:
+        NDArray[Any]: The new datetimes, as naive
+            ``datetime64[s]`` values in UTC.
+    """
+    if base_time.utcoffset():
+        raise ValueError(f"Base time must be naive or in UTC: {base_time}")
+    if base_time.microsecond:
+        raise ValueError(f"Base time can't have microseconds: {base_time}")
+    fractional_months, integer_months = numpy.modf(
+        numpy.asarray(months, dtype="float64")
+    )
+    base_month = numpy.datetime64(base_time.replace(tzinfo=None), "M")
+    month = base_month + integer_months.astype("timedelta64[M]")
+    time_of_day = numpy.timedelta64(
+        base_time.hour * 3600 + base_time.minute * 60 + base_time.second, "s"
+    )
+    day = numpy.minimum(base_time.day, _days_in_month(month))
+    time = _day_of_month(month, day) + time_of_day
+    next_month = month + 1
+    next_time = (
+        _day_of_month(next_month, numpy.minimum(day, _days_in_month(next_month)))
+        + time_of_day
+    )
+    seconds = (next_time - time) / ONE_SECOND
+    datetimes: NDArray[Any] = (
+        time + (seconds * fractional_months).astype("int64") * ONE_SECOND
+    )
+    return datetimes
+
+
 def datetime64_to_datetime(datetime64: numpy.datetime64) -> datetime.datetime:
     # https://stackoverflow.com/a/46921593/732529
     unix_epoch = numpy.datetime64(0, "s")
@@ -47,6 +96,22 @@ def datetime64_to_datetime(datetime64: numpy.datetime64) -> datetime.datetime:
     return dt.replace(tzinfo=tzutc())
 
 
+def datetime64_to_datetimes(datetimes: NDArray[Any]) -> List[datetime.datetime]:
+    """Converts an array of datetime64 values to timezone-aware datetimes.
+
+    This is the batched form of `datetime64_to_datetime`, with one cast of the
+    whole array to microseconds instead of a float division and
+    ``utcfromtimestamp`` per value.
+
+    Args:
+        datetimes (NDArray[Any]): The ``datetime64`` values, in UTC.
+    Returns:
+        List[datetime.datetime]: The datetimes, in UTC.
+    """
+    tz = tzutc()
+    return [dt.replace(tzinfo=tz) for dt in datetimes.astype("datetime64[us]").tolist()]
+
+
 class TimeResolution(str, Enum):
     """Used to parse ``time_coverage_resolution`` in NetCDF files.
     We _could_ use a real datetime package, e.g. pandas's Timedelta, but since
@@ -137,6 +202,38 @@ class TimeResolution(str, Enum):
         else:
             raise NotImplementedError
 
+    def datetime_bounds_array(
+        self, datetimes: NDArray[Any]
+    ) -> Tuple[NDArray[Any], NDArray[Any]]:
+        """Returns the start and end datetimes of each datetime in an array.
+
+        This is the vectorized form of `datetime_bounds`, with identical
+        results.
+
+        Args:
+            datetimes (NDArray[Any]): The reference datetimes.
+        Returns
+            Tuple[NDArray[Any], NDArray[Any]]: The
+                start and end datetimes, as ``datetime64[s]``.
+        """
+        months = datetimes.astype("datetime64[M]")
+        years = datetimes.astype("datetime64[Y]").astype("datetime64[M]")
+        if self is TimeResolution.Monthly:
+            start = months
+            end = months + 1
+        elif self is TimeResolution.Seasonal:
+            start = years + (months - years).astype("int64") // 3 * 3
+            end = start + 3
+        elif self is TimeResolution.Yearly:
+            start = years
+            end = years + 12
+        elif self is TimeResolution.Pentadal:
+            start = years - 24
+            end = years + 36
+        else:
+            raise NotImplementedError
+        return start.astype("datetime64[s]"), end.astype("datetime64[s]") - ONE_SECOND
+
     def as_str(self, dt: datetime.datetime) -> str:
         """Returns the given time interval as a string.
 
@@ -164,6 +261,42 @@ class TimeResolution(str, Enum):
         else:
             raise NotImplementedError
 
+    def as_str_array(self, datetimes: NDArray[Any]) -> NDArray[Any]:
+        """Returns the time interval of each datetime in an array as a string.
+
+        This is the vectorized form of `as_str`, with identical results.
+
+        Args:
+            datetimes (NDArray[Any]): The center times of the
+                intervals.
+        Returns:
+            NDArray[Any]: The time intervals, as an array of strings.
+        """
+        years = datetimes.astype("datetime64[Y]").astype("int64") + 1970
+        months = datetimes.astype("datetime64[M]").astype("int64") % 12 + 1
+        if self is TimeResolution.Monthly:
+            return _join(numpy.char.mod("%d-", years), numpy.char.mod("%02d", months))
+        elif self is TimeResolution.Seasonal:
+            return _join(
+                numpy.char.mod("%d-Q", years), numpy.char.mod("%d", (months + 2) // 3)
+            )
+        elif self is TimeResolution.Yearly:
+            return numpy.char.mod("%d", years)
+        elif self is TimeResolution.Pentadal:
+            return _join(
+                numpy.char.mod("%d-", years - 2), numpy.char.mod("%d", years + 2)
+            )
+        elif self is TimeResolution.Daily:
+            days = (
+                datetimes.astype("datetime64[D]") - datetimes.astype("datetime64[M]")
+            ).astype("int64") + 1
+            return _join(
+                _join(numpy.char.mod("%d-", years), numpy.char.mod("%02d-", months)),
+                numpy.char.mod("%02d", days),
+            )
+        else:
+            raise NotImplementedError
+
     def to_interval(self) -> str:
         """Returns this time resolution as a slug-like string.
 
@@ -188,6 +321,151 @@ class TimeResolution(str, Enum):
             raise NotImplementedError
 
 
+@dataclass
+class TimeAxis:
+    """The datetime and bounds of each step of a dataset's time dimension.
+
+    Built once per dataset, from its time coordinate, so steps can be selected
+    by date without decoding or reading the others. The steps must be in time
+    order with non-overlapping bounds, which allows binary searches.
+
+    Datetimes are naive ``datetime64`` values in UTC. Datetimes passed to the
+    selection methods are converted to UTC, or treated as UTC if they're naive.
+    """
+
+    datetimes: NDArray[Any]
+    start_datetimes: NDArray[Any]
+    end_datetimes: NDArray[Any]
+
+    @classmethod
+    def from_months(
+        cls,
+        base_time: datetime.datetime,
+        months: ArrayLike,
+        time_resolution: TimeResolution,
+    ) -> "TimeAxis":
+        """Builds the axis of a time coordinate in months since a base time,
+        e.g. ocean heat content's.
+
+        Args:
+            base_time (datetime.datetime): The base time of the coordinate.
+            months (ArrayLike): The (possibly fractional) months since
+                ``base_time``.
+            time_resolution (TimeResolution): The resolution, which sets each
+                step's bounds.
+        Returns:
+            TimeAxis: The time axis.
+        """
+        datetimes = add_months_to_datetimes(base_time, months)
+        start_datetimes, end_datetimes = time_resolution.datetime_bounds_array(
+            datetimes
+        )
+        return TimeAxis(datetimes, start_datetimes, end_datetimes)
+
+    @classmethod
+    def from_datetime64(
+        cls, datetimes: NDArray[Any], half_width: datetime.timedelta
+    ) -> "TimeAxis":
+        """Builds the axis of a decoded time coordinate, with windows of
+        constant width centered on each step, e.g. WHOI's three-hourly steps.
+
+        Args:
+            datetimes (NDArray[Any]): The time coordinate, as ``datetime64``.
+            half_width (datetime.timedelta): Half the width of each step's
+                window.
+        Returns:
+            TimeAxis: The time axis.
+        """
+        delta = numpy.timedelta64(half_width)
+        return TimeAxis(datetimes, datetimes - delta, datetimes + delta)
+
+    def __len__(self) -> int:
+        return len(self.datetimes)
+
+    def select(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+    ) -> range:
+        """Returns the indices of the steps whose bounds overlap a date range.
+
+        Args:
+            start (Optional[datetime.datetime]): The start of the range,
+                inclusive. Defaults to the start of the axis.
+            end (Optional[datetime.datetime]): The end of the range, inclusive.
+                Defaults to the end of the axis.
+        Returns:
+            range: The selected indices.
+        """
+        if start is None:
+            first = 0
+        else:
+            first = int(
+                numpy.searchsorted(self.end_datetimes, _to_datetime64(start), "left")
+            )
+        if end is None:
+            stop = len(self)
+        else:
+            stop = int(
+                numpy.searchsorted(self.start_datetimes, _to_datetime64(end), "right")
+            )
+        return range(first, max(first, stop))
+
+    def to_datetimes(
+        self, indices: Optional[Sequence[int]] = None
+    ) -> Tuple[
+        List[datetime.datetime], List[datetime.datetime], List[datetime.datetime]
+    ]:
+        """Returns the datetime and bounds of steps as timezone-aware datetimes.
+
+        Args:
+            indices (Optional[Sequence[int]]): The steps, e.g. from `select`.
+                Defaults to all steps.
+        Returns:
+            Tuple[List[datetime.datetime], List[datetime.datetime],
+                List[datetime.datetime]]: The datetimes, start datetimes, and
+                end datetimes, in UTC.
+        """
+        if indices is None:
+            indices = range(len(self))
+        selection = numpy.asarray(indices, dtype="int64")
+        return (
+            datetime64_to_datetimes(self.datetimes[selection]),
+            datetime64_to_datetimes(self.start_datetimes[selection]),
+            datetime64_to_datetimes(self.end_datetimes[selection]),
+        )
+
+    def last(self, count: int) -> range:
+        """Returns the indices of the last steps.
+
+        Args:
+            count (int): The number of steps.
+        Returns:
+            range: The selected indices.
+        """
+        return range(max(len(self) - count, 0), len(self))
+
+    def select_intervals(
+        self,
+        intervals: Iterable[
+            Tuple[Optional[datetime.datetime], Optional[datetime.datetime]]
+        ],
+    ) -> List[int]:
+        """Returns the indices of the steps that overlap any of the date ranges.
+
+        Args:
+            intervals (Iterable[Tuple[Optional[datetime.datetime],
+                Optional[datetime.datetime]]]): The (start, end) date ranges,
+                as for `select`.
+        Returns:
+            List[int]: The selected indices, sorted and without duplicates.
+        """
+        indices: Set[int] = set()
+        for start, end in intervals:
+            indices.update(self.select(start, end))
+        return sorted(indices)
+
+
 @dataclass
 class TimeDuration:
     """Used to parse ``time_coverage_duration`` in NetCDF files.
@@ -224,3 +502,28 @@ def _month_to_season(month: int) -> str:
         return "Q3"
     else:
         return "Q4"
+
+
+def _to_datetime64(dt: datetime.datetime) -> numpy.datetime64:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return numpy.datetime64(dt)
+
+
+def _days_in_month(months: NDArray[Any]) -> NDArray[Any]:
+    days: NDArray[Any] = (
+        (months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")
+    ).astype("int64")
+    return days
+
+
+def _day_of_month(months: NDArray[Any], days: NDArray[Any]) -> NDArray[Any]:
+    datetimes: NDArray[Any] = (months.astype("datetime64[D]") + (days - 1)).astype(
+        "datetime64[s]"
+    )
+    return datetimes
+
+
+def _join(left: NDArray[Any], right: NDArray[Any]) -> NDArray[Any]:
+    joined: NDArray[Any] = numpy.char.add(left, right)
+    return joined
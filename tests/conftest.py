@@ -1,4 +1,7 @@
-from typing import Any
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import pytest
 from pytest import Config, Parser
@@ -28,3 +31,83 @@ def pytest_collection_modifyitems(config: Config, items: Any) -> None:
     for item in items:
         if "external_data" in item.keywords:
             item.add_marker(skip_network_access)
+
+
+class HttpServer:
+    """A local stand-in for NOAA's HTTP servers, serving files from memory.
+
+    Supports HEAD requests, ETag and Last-Modified headers, and single Range
+    requests (with If-Range), and records every request it serves.
+    """
+
+    def __init__(self) -> None:
+        self.files: Dict[str, bytes] = dict()
+        self.requests: List[Tuple[str, str, Optional[str]]] = list()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+
+    def url(self, name: str) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/{name}"
+
+    def etag(self, name: str) -> str:
+        return '"' + hashlib.sha256(self.files[name]).hexdigest()[:16] + '"'
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _handler(server: HttpServer) -> Any:
+    class Handler(BaseHTTPRequestHandler):
+        def do_HEAD(self) -> None:
+            self._respond(body=False)
+
+        def do_GET(self) -> None:
+            self._respond(body=True)
+
+        def _respond(self, body: bool) -> None:
+            name = self.path.lstrip("/")
+            server.requests.append((self.command, name, self.headers.get("Range")))
+            if name not in server.files:
+                self.send_error(404)
+                return
+            data = server.files[name]
+            etag = server.etag(name)
+            start, end = 0, len(data)
+            status = 200
+            range_header = self.headers.get("Range")
+            if_range = self.headers.get("If-Range")
+            if range_header and (if_range is None or if_range == etag):
+                first, _, last = range_header.partition("=")[2].partition("-")
+                start = int(first)
+                end = min(int(last) + 1, len(data)) if last else len(data)
+                status = 206
+            self.send_response(status)
+            self.send_header("Content-Length", str(end - start))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", "Thu, 01 Jun 2023 00:00:00 GMT")
+            self.send_header("Accept-Ranges", "bytes")
+            if status == 206:
+                self.send_header(
+                    "Content-Range", f"bytes {start}-{end - 1}/{len(data)}"
+                )
+            self.end_headers()
+            if body:
+                self.wfile.write(data[start:end])
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def http_server() -> Iterator[HttpServer]:
+    server = HttpServer()
+    server.start()
+    yield server
+    server.stop()
@@ -1,7 +1,9 @@
+import json
+import os.path
 from pathlib import Path
 
 import pytest
-from pystac import Collection, ItemCollection
+from pystac import Collection, Item, ItemCollection
 
 from tests import run_command, test_data
 
@@ -45,3 +47,67 @@ def test_cogify(tmp_path: Path) -> None:
     path = test_data.get_external_data("heat_content_anomaly_0-2000_yearly.nc")
     result = run_command(f"noaa-cdr ocean-heat-content cogify {path} -o {tmp_path}")
     assert result.exit_code == 0
+
+
+@pytest.mark.external_data
+def test_cogify_workers(tmp_path: Path) -> None:
+    path = test_data.get_external_data("heat_content_anomaly_0-2000_yearly.nc")
+    result = run_command(
+        f"noaa-cdr ocean-heat-content cogify {path} -o {tmp_path} "
+        "--workers 2 --queue-depth 4"
+    )
+    assert result.exit_code == 0
+    assert len(list(tmp_path.glob("*.tif"))) >= 17
+
+
+@pytest.mark.external_data
+def test_cogify_since_until(tmp_path: Path) -> None:
+    path = test_data.get_external_data("heat_content_anomaly_0-2000_yearly.nc")
+    result = run_command(
+        f"noaa-cdr ocean-heat-content cogify {path} -o {tmp_path} "
+        "--since 2010-06-01 --until 2011-01-01"
+    )
+    assert result.exit_code == 0, result.output
+    assert sorted(p.name for p in tmp_path.glob("*.tif")) == [
+        "heat_content_anomaly_0-2000_yearly_2010.tif",
+        "heat_content_anomaly_0-2000_yearly_2011.tif",
+    ]
+
+
+@pytest.mark.external_data
+def test_create_items_workers(tmp_path: Path) -> None:
+    destination = tmp_path / "item-collection.json"
+    infiles = " ".join(
+        test_data.get_external_data(name)
+        for name in [
+            "heat_content_anomaly_0-2000_yearly.nc",
+            "mean_halosteric_sea_level_anomaly_0-2000_yearly.nc",
+        ]
+    )
+    result = run_command(
+        f"noaa-cdr ocean-heat-content create-items {infiles} {destination} "
+        "--workers 2"
+    )
+    assert result.exit_code == 0, "\n{}".format(result.output)
+    item_collection = ItemCollection.from_file(str(destination))
+    assert len(item_collection) >= 17
+    for item in item_collection:
+        assert len(item.assets) == 2
+
+
+@pytest.mark.external_data
+def test_create_items_ndjson(tmp_path: Path) -> None:
+    destination = tmp_path / "items.ndjson"
+    infile = test_data.get_external_data("heat_content_anomaly_0-2000_yearly.nc")
+    result = run_command(
+        f"noaa-cdr ocean-heat-content create-items {infile} {destination} --ndjson"
+    )
+    assert result.exit_code == 0, "\n{}".format(result.output)
+    lines = destination.read_text().splitlines()
+    assert len(lines) >= 17
+    for line in lines:
+        item = Item.from_dict(json.loads(line))
+        for asset in item.assets.values():
+            assert not os.path.isabs(asset.href)
+            assert (tmp_path / asset.href).exists()
+        item.validate()
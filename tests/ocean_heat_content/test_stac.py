@@ -3,12 +3,20 @@ import os
 import shutil
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from typing import Any, Iterator, List
 
+import numpy
 import pytest
+import rasterio
+import xarray
 from dateutil.tz import tzutc
 from pystac.extensions.projection import ProjectionExtension
 from pystac.extensions.raster import RasterExtension
 from pystac.extensions.scientific import ScientificExtension
+from stactools.noaa_cdr import attributes
+from stactools.noaa_cdr.attributes import DatasetAttributes
+from stactools.noaa_cdr.cog import Layout
+from stactools.noaa_cdr.manifest import Manifest
 from stactools.noaa_cdr.ocean_heat_content import cog, stac
 
 from .. import test_data
@@ -120,6 +128,43 @@ def test_create_items_two_netcdfs_same_items(tmp_path: Path) -> None:
         item.validate()
 
 
+@pytest.mark.external_data
+def test_create_items_workers(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    paths = [
+        test_data.get_external_data("heat_content_anomaly_0-2000_yearly.nc"),
+        test_data.get_external_data(
+            "mean_halosteric_sea_level_anomaly_0-2000_yearly.nc"
+        ),
+        test_data.get_external_data("heat_content_anomaly_0-2000_pentad.nc"),
+    ]
+    (tmp_path / "serial").mkdir()
+    (tmp_path / "parallel").mkdir()
+    read_many_workers = list()
+    read_many = attributes.read_many
+
+    def spy_read_many(
+        hrefs: List[str], workers: int = 1, **kwargs: Any
+    ) -> Iterator[DatasetAttributes]:
+        read_many_workers.append(workers)
+        return read_many(hrefs, workers=workers, **kwargs)
+
+    monkeypatch.setattr(attributes, "read_many", spy_read_many)
+    serial = stac.create_items(paths, str(tmp_path / "serial"))
+    parallel = stac.create_items(paths, str(tmp_path / "parallel"), workers=3)
+    assert read_many_workers == [1, 3]
+    assert [item.id for item in parallel] == [item.id for item in serial]
+    for a, b in zip(parallel, serial):
+        for asset in a.assets.values():
+            asset.href = os.path.basename(asset.href)
+        for asset in b.assets.values():
+            asset.href = os.path.basename(asset.href)
+        assert a.to_dict() == b.to_dict()
+    with pytest.raises(ValueError):
+        stac.create_items(
+            paths, str(tmp_path), workers=2, manifest=Manifest(str(tmp_path / "m"))
+        )
+
+
 @pytest.mark.external_data
 def test_create_items_two_netcdfs_different_items() -> None:
     paths = [
@@ -144,6 +189,30 @@ def test_create_items_one_netcdf_latest_only(tmp_path: Path) -> None:
     items[0].validate()
 
 
+@pytest.mark.external_data
+def test_create_items_item_directories(tmp_path: Path) -> None:
+    paths = [
+        test_data.get_external_data("heat_content_anomaly_0-2000_yearly.nc"),
+        test_data.get_external_data(
+            "mean_halosteric_sea_level_anomaly_0-2000_yearly.nc"
+        ),
+    ]
+    items = stac.create_items(
+        paths, str(tmp_path), latest_only=True, item_directories=True
+    )
+    assert len(items) == 1
+    for asset in items[0].assets.values():
+        assert os.path.dirname(asset.href) == str(tmp_path / items[0].id)
+        assert os.path.exists(asset.href)
+
+    collection = stac.create_collection()
+    collection.add_items(items)
+    collection.normalize_hrefs(str(tmp_path), strategy=stac.item_layout_strategy())
+    for item in collection.get_items():
+        for asset in item.assets.values():
+            assert os.path.dirname(asset.href) == os.path.dirname(item.get_self_href())
+
+
 @pytest.mark.parametrize(
     "infile,num_cogs",
     [
@@ -170,6 +239,111 @@ def test_cogify(tmp_path: Path, infile: str, num_cogs: int) -> None:
         assert Path(c.asset().href).exists()
 
 
+@pytest.mark.external_data
+def test_cogify_workers(tmp_path: Path) -> None:
+    path = test_data.get_external_data("heat_content_anomaly_0-2000_yearly.nc")
+    (tmp_path / "serial").mkdir()
+    (tmp_path / "parallel").mkdir()
+    serial = cog.cogify(path, str(tmp_path / "serial"))
+    parallel = cog.cogify(path, str(tmp_path / "parallel"), workers=2, queue_depth=1)
+    assert [c.datetime for c in parallel] == [c.datetime for c in serial]
+    for a, b in zip(parallel, serial):
+        assert Path(a.href).name == Path(b.href).name
+        assert Path(a.href).read_bytes() == Path(b.href).read_bytes()
+
+
+@pytest.mark.external_data
+def test_cogify_packed(tmp_path: Path) -> None:
+    path = test_data.get_external_data(
+        "mean_halosteric_sea_level_anomaly_0-2000_yearly.nc"
+    )
+    cogs = cog.cogify(path, str(tmp_path), packed=True)
+    band = cogs[0].asset().to_dict()["raster:bands"][0]
+    assert band["data_type"] == "int16"
+    assert band["nodata"] == -32767
+    assert band["scale"] == 0.01
+    with rasterio.open(cogs[0].href) as dataset:
+        assert dataset.dtypes == ("int16",)
+        assert dataset.nodata == -32767
+
+
+@pytest.mark.external_data
+def test_cogify_time_layout(tmp_path: Path) -> None:
+    path = test_data.get_external_data("heat_content_anomaly_0-2000_yearly.nc")
+    (tmp_path / "single").mkdir()
+    (tmp_path / "stacked").mkdir()
+    single = cog.cogify(path, str(tmp_path / "single"))
+    stacked = cog.cogify(path, str(tmp_path / "stacked"), layout=Layout.Time)
+    assert [p.name for p in (tmp_path / "stacked").iterdir()] == [
+        "heat_content_anomaly_0-2000_yearly.tif"
+    ]
+    assert [c.band for c in stacked] == list(range(1, len(single) + 1))
+    with rasterio.open(stacked[0].href) as dataset:
+        assert dataset.descriptions[0] == single[0].time_interval_as_str()
+        for c, expected in zip(stacked, single):
+            assert c.asset().extra_fields["noaa_cdr:band"] == c.band
+            with rasterio.open(expected.href) as single_dataset:
+                numpy.testing.assert_array_equal(
+                    dataset.read(c.band), single_dataset.read(1)
+                )
+    with pytest.raises(ValueError):
+        cog.cogify(path, str(tmp_path), layout=Layout.Variables)
+
+
+@pytest.mark.external_data
+def test_cogify_manifest_new_time_steps(tmp_path: Path) -> None:
+    path = test_data.get_external_data("heat_content_anomaly_0-2000_yearly.nc")
+    source = tmp_path / "heat_content_anomaly_0-2000_yearly.nc"
+    with xarray.open_dataset(path, decode_times=False) as ds:
+        ds.isel(time=slice(0, -2)).to_netcdf(source)
+    (tmp_path / "cogs").mkdir()
+    manifest = Manifest(str(tmp_path / "manifest.json"))
+    first = cog.cogify(str(source), str(tmp_path / "cogs"), manifest=manifest)
+    written = dict((c.href, os.stat(c.href).st_mtime_ns) for c in first)
+
+    # The NetCDF grows in place, so only the new time steps are written.
+    shutil.copy(path, source)
+    second = cog.cogify(
+        str(source), str(tmp_path / "cogs"), manifest=Manifest(manifest.path)
+    )
+    assert len(second) == len(first) + 2
+    for c in second[:-2]:
+        assert os.stat(c.href).st_mtime_ns == written[c.href]
+    assert len(Manifest(manifest.path).entries) == len(second)
+
+
+@pytest.mark.external_data
+def test_cogify_manifest_time_stack_shifted_window(tmp_path: Path) -> None:
+    path = test_data.get_external_data("heat_content_anomaly_0-2000_yearly.nc")
+    (tmp_path / "single").mkdir()
+    (tmp_path / "stacked").mkdir()
+    single = cog.cogify(path, str(tmp_path / "single"))
+    manifest_path = str(tmp_path / "manifest.json")
+    cog.cogify(
+        path,
+        str(tmp_path / "stacked"),
+        layout=Layout.Time,
+        manifest=Manifest(manifest_path),
+        until=single[1].start_datetime,
+    )
+    # The same number of steps, so only the time indices tell them apart.
+    stacked = cog.cogify(
+        path,
+        str(tmp_path / "stacked"),
+        layout=Layout.Time,
+        manifest=Manifest(manifest_path),
+        since=single[2].end_datetime,
+        until=single[3].start_datetime,
+    )
+    assert len(stacked) == 2
+    with rasterio.open(stacked[0].href) as dataset:
+        for c, expected in zip(stacked, single[2:4]):
+            with rasterio.open(expected.href) as single_dataset:
+                numpy.testing.assert_array_equal(
+                    dataset.read(c.band), single_dataset.read(1)
+                )
+
+
 @pytest.mark.external_data
 def test_cogify_href(tmp_path: Path) -> None:
     href = (
@@ -245,3 +419,42 @@ def test_create_netcdf_item(
     assert item.properties["noaa_cdr:interval"] == interval
     assert item.properties["noaa_cdr:max_depth"] == max_depth
     item.validate()
+
+
+def test_iter_items_groups_by_depth_and_period(tmp_path: Path) -> None:
+    dataset_attributes = DatasetAttributes(
+        {
+            "geospatial_vertical_max": numpy.int64(2000),
+            "time_coverage_resolution": "P01Y",
+        },
+        {},
+        {},
+    )
+    assert stac._item_group(dataset_attributes) == (2000, "yearly")
+    with pytest.raises(ValueError):
+        next(stac.iter_items([], str(tmp_path), workers=0))
+
+
+@pytest.mark.external_data
+def test_iter_items_renamed_files(tmp_path: Path) -> None:
+    halosteric = tmp_path / "renamed.nc"
+    shutil.copy(
+        test_data.get_external_data(
+            "mean_halosteric_sea_level_anomaly_0-2000_yearly.nc"
+        ),
+        halosteric,
+    )
+    paths = [
+        test_data.get_external_data("heat_content_anomaly_0-2000_yearly.nc"),
+        test_data.get_external_data("heat_content_anomaly_0-2000_pentad.nc"),
+        str(halosteric),
+    ]
+    (tmp_path / "cogs").mkdir()
+    items = list(stac.iter_items(paths, str(tmp_path / "cogs")))
+    ids = [item.id for item in items]
+    assert len(ids) == len(set(ids))
+    intervals = [item.properties["noaa_cdr:interval"] for item in items]
+    assert intervals == sorted(intervals, key=["yearly", "pentadal"].index)
+    for item in items:
+        if item.properties["noaa_cdr:interval"] == "yearly":
+            assert len(item.assets) == 2
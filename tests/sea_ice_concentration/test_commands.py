@@ -1,8 +1,12 @@
 from pathlib import Path
+from typing import Any, Dict
 
+import pytest
+from click.testing import CliRunner
 from pystac import Collection, Item
+from stactools.noaa_cdr.profile import BandProfile
 
-from .. import run_command, test_data
+from .. import run_command, test_cli, test_data
 
 
 def test_create_item(tmp_path: Path) -> None:
@@ -25,6 +29,33 @@ def test_create_item_with_cogs(tmp_path: Path) -> None:
     item.validate()
 
 
+def test_create_item_with_cogs_overview_resampling(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    options: Dict[str, Dict[str, Any]] = dict()
+    band_profile_cog = BandProfile.cog
+
+    def cog(self: BandProfile) -> Dict[str, Any]:
+        options[self.variable] = band_profile_cog(self)
+        return options[self.variable]
+
+    monkeypatch.setattr(BandProfile, "cog", cog)
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    result = run_command(
+        f"noaa-cdr sea-ice-concentration create-item --cogs {path} {tmp_path}/out.json"
+    )
+    assert result.exit_code == 0, result.output
+    for variable in [
+        "temporal_interpolation_flag",
+        "qa_of_cdr_seaice_conc",
+        "spatial_interpolation_flag",
+    ]:
+        assert options[variable]["overview_resampling"] == "nearest"
+    assert "overview_resampling" not in options["melt_onset_day_cdr_seaice_conc"]
+    item = Item.from_file(str(tmp_path / "out.json"))
+    assert any("/classification/" in schema for schema in item.stac_extensions)
+
+
 def test_create_collection(tmp_path: Path) -> None:
     result = run_command(
         f"noaa-cdr sea-ice-concentration create-collection {tmp_path}/out.json"
@@ -32,3 +63,75 @@ def test_create_collection(tmp_path: Path) -> None:
     assert result.exit_code == 0, result.output
     collection = Collection.from_file(str(tmp_path / "out.json"))
     collection.validate()
+
+
+def test_create_item_with_cogs_workers(tmp_path: Path) -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    result = run_command(
+        "noaa-cdr sea-ice-concentration create-item --cogs --workers 2 "
+        f"{path} {tmp_path}/out.json"
+    )
+    assert result.exit_code == 0, result.output
+    item = Item.from_file(str(tmp_path / "out.json"))
+    assert len(list(tmp_path.glob("*.tif"))) == 8
+    assert "cdr_seaice_conc" in item.assets
+
+
+def test_create_item_with_cogs_compression(tmp_path: Path) -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    result = run_command(
+        "noaa-cdr sea-ice-concentration create-item --cogs --compression zstd:3 "
+        "--variable-compression cdr_seaice_conc=lzw-predictor "
+        f"{path} {tmp_path}/out.json"
+    )
+    assert result.exit_code == 0, result.output
+
+
+def test_create_item_invalid_compression(tmp_path: Path) -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    result = CliRunner().invoke(
+        test_cli,
+        [
+            "noaa-cdr",
+            "sea-ice-concentration",
+            "create-item",
+            "--cogs",
+            "--compression",
+            "jpeg",
+            path,
+            f"{tmp_path}/out.json",
+        ],
+    )
+    assert result.exit_code == 2
+    assert "Unknown compression codec" in result.output
+
+
+def test_create_item_with_cogs_streaming(tmp_path: Path) -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    result = run_command(
+        "noaa-cdr sea-ice-concentration create-item --cogs --streaming "
+        f"{path} {tmp_path}/out.json"
+    )
+    assert result.exit_code == 0, result.output
+    item = Item.from_file(str(tmp_path / "out.json"))
+    assert len(item.assets) == 9
+
+
+def test_create_item_streaming_with_workers(tmp_path: Path) -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    result = CliRunner().invoke(
+        test_cli,
+        [
+            "noaa-cdr",
+            "sea-ice-concentration",
+            "create-item",
+            "--cogs",
+            "--streaming",
+            "--workers",
+            "2",
+            path,
+            f"{tmp_path}/out.json",
+        ],
+    )
+    assert result.exit_code == 2
+    assert "--streaming" in result.output
@@ -1,8 +1,9 @@
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import pyproj
 import pytest
+import xarray
 from pystac.extensions.projection import ProjectionExtension
 from pystac.extensions.raster import RasterExtension
 from pystac.extensions.scientific import ScientificExtension
@@ -78,6 +79,21 @@ def test_cogify(tmp_path: Path) -> None:
         assert "classification:bitfields" in asset.extra_fields
 
 
+@pytest.mark.parametrize(
+    "variable,resampling",
+    [
+        ("temporal_interpolation_flag", "nearest"),
+        ("qa_of_cdr_seaice_conc", "nearest"),
+        ("melt_onset_day_cdr_seaice_conc", None),
+    ],
+)
+def test_overview_resampling(variable: str, resampling: Optional[str]) -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    with xarray.open_dataset(path) as dataset:
+        profile = cog.SeaIceConcentrationBandProfile.build(dataset, variable)
+    assert profile.cog().get("overview_resampling") == resampling
+
+
 def test_create_collection() -> None:
     collection = stac.create_collection()
     assert collection.id == "noaa-cdr-sea-ice-concentration"
@@ -1,7 +1,8 @@
+import json
 from pathlib import Path
 
 import pytest
-from pystac import Collection, ItemCollection
+from pystac import Collection, Item, ItemCollection
 
 from .. import run_command, test_data
 
@@ -28,3 +29,52 @@ def test_create_collection(tmp_path: Path) -> None:
     assert result.exit_code == 0, result.output
     collection = Collection.from_file(str(tmp_path / "out.json"))
     collection.validate()
+
+
+@pytest.mark.external_data
+def test_create_cog_items_since_until(tmp_path: Path) -> None:
+    path = test_data.get_external_data(
+        "SEAFLUX-OSB-CDR_V02R00_SST_D20210831_C20211223.nc"
+    )
+    result = run_command(
+        f"noaa-cdr sea-surface-temperature-whoi create-cog-items {path} "
+        f"{tmp_path}/out.json --since 2021-08-31T03:00:00 "
+        "--until 2021-08-31T06:00:00"
+    )
+    assert result.exit_code == 0, result.output
+    item_collection = ItemCollection.from_file(str(tmp_path / "out.json"))
+    assert [item.id for item in item_collection] == [
+        "SEAFLUX-OSB-CDR_V02R00_SST_D20210831_C20211223-1",
+        "SEAFLUX-OSB-CDR_V02R00_SST_D20210831_C20211223-2",
+    ]
+
+
+@pytest.mark.external_data
+def test_create_cog_items_ndjson(tmp_path: Path) -> None:
+    path = test_data.get_external_data(
+        "SEAFLUX-OSB-CDR_V02R00_SST_D20210831_C20211223.nc"
+    )
+    result = run_command(
+        f"noaa-cdr sea-surface-temperature-whoi create-cog-items {path} "
+        f"{tmp_path}/out.ndjson --ndjson --until 2021-08-31T06:00:00"
+    )
+    assert result.exit_code == 0, result.output
+    lines = (tmp_path / "out.ndjson").read_text().splitlines()
+    items = [Item.from_dict(json.loads(line)) for line in lines]
+    assert [item.id for item in items] == [
+        "SEAFLUX-OSB-CDR_V02R00_SST_D20210831_C20211223-0",
+        "SEAFLUX-OSB-CDR_V02R00_SST_D20210831_C20211223-1",
+        "SEAFLUX-OSB-CDR_V02R00_SST_D20210831_C20211223-2",
+    ]
+    for item in items:
+        item.validate()
+
+
+def test_create_cog_items_packed_variables(tmp_path: Path) -> None:
+    result = run_command(
+        "noaa-cdr sea-surface-temperature-whoi create-cog-items "
+        f"does-not-exist.nc {tmp_path}/items.json --packed --layout variables"
+    )
+    assert result.exit_code != 0
+    assert "--packed can't be used with --layout variables" in result.output
+    assert not list(tmp_path.iterdir())
@@ -1,8 +1,13 @@
+import datetime
 from pathlib import Path
 
+import numpy
 import pytest
+import rasterio
 from pystac.extensions.raster import RasterExtension
 from pystac.extensions.scientific import ScientificExtension
+from stactools.noaa_cdr.cog import Layout
+from stactools.noaa_cdr.manifest import Manifest
 from stactools.noaa_cdr.sea_surface_temperature_whoi import stac
 
 from .. import test_data
@@ -25,6 +30,92 @@ def test_create_cog_items(tmp_path: Path) -> None:
         item.validate()
 
 
+@pytest.mark.external_data
+def test_create_cog_items_packed(tmp_path: Path) -> None:
+    path = test_data.get_external_data(
+        "SEAFLUX-OSB-CDR_V02R00_SST_D20210831_C20211223.nc"
+    )
+    items = stac.create_cog_items(path, str(tmp_path), packed=True)
+    asset = items[0].assets["sea_surface_temperature"]
+    band = asset.to_dict()["raster:bands"][0]
+    assert band["data_type"] == "int16"
+    assert band["nodata"] == -32768
+    assert band["scale"] == 0.001
+    with rasterio.open(asset.href) as dataset:
+        assert dataset.dtypes == ("int16",)
+    band = items[0].assets["fill_missing_qc"].to_dict()["raster:bands"][0]
+    assert band["data_type"] == "int8"
+    assert band["nodata"] == -128
+
+
+@pytest.mark.external_data
+@pytest.mark.parametrize("layout,num_files", [(Layout.Time, 2), (Layout.Variables, 8)])
+def test_create_cog_items_layout(
+    tmp_path: Path, layout: Layout, num_files: int
+) -> None:
+    path = test_data.get_external_data(
+        "SEAFLUX-OSB-CDR_V02R00_SST_D20210831_C20211223.nc"
+    )
+    (tmp_path / "single").mkdir()
+    (tmp_path / "stacked").mkdir()
+    single = stac.create_cog_items(path, str(tmp_path / "single"))
+    stacked = stac.create_cog_items(path, str(tmp_path / "stacked"), layout=layout)
+    assert len(list((tmp_path / "stacked").iterdir())) == num_files
+    assert [item.id for item in stacked] == [item.id for item in single]
+    for stacked_item, single_item in zip(stacked, single):
+        stacked_item.validate()
+        for key, asset in stacked_item.assets.items():
+            with rasterio.open(asset.href) as a:
+                with rasterio.open(single_item.assets[key].href) as b:
+                    numpy.testing.assert_array_equal(
+                        a.read(asset.extra_fields["noaa_cdr:band"]), b.read(1)
+                    )
+
+
+@pytest.mark.external_data
+def test_create_cog_items_manifest_shifted_window(tmp_path: Path) -> None:
+    path = test_data.get_external_data(
+        "SEAFLUX-OSB-CDR_V02R00_SST_D20210831_C20211223.nc"
+    )
+    (tmp_path / "single").mkdir()
+    (tmp_path / "stacked").mkdir()
+    single = stac.create_cog_items(path, str(tmp_path / "single"))
+    manifest_path = str(tmp_path / "manifest.json")
+    stac.create_cog_items(
+        path,
+        str(tmp_path / "stacked"),
+        layout=Layout.Time,
+        manifest=Manifest(manifest_path),
+        until=datetime.datetime(2021, 8, 31, 3, tzinfo=datetime.timezone.utc),
+    )
+    # The same number of steps, so only the time indices tell them apart.
+    stacked = stac.create_cog_items(
+        path,
+        str(tmp_path / "stacked"),
+        layout=Layout.Time,
+        manifest=Manifest(manifest_path),
+        since=datetime.datetime(2021, 8, 31, 12, tzinfo=datetime.timezone.utc),
+        until=datetime.datetime(2021, 8, 31, 15, tzinfo=datetime.timezone.utc),
+    )
+    assert [item.id for item in stacked] == [item.id for item in single[4:6]]
+    for stacked_item, single_item in zip(stacked, single[4:6]):
+        for key, asset in stacked_item.assets.items():
+            with rasterio.open(asset.href) as a:
+                with rasterio.open(single_item.assets[key].href) as b:
+                    numpy.testing.assert_array_equal(
+                        a.read(asset.extra_fields["noaa_cdr:band"]), b.read(1)
+                    )
+
+
+def test_iter_cog_items_packed_variables(tmp_path: Path) -> None:
+    items = stac.iter_cog_items(
+        "does-not-exist.nc", str(tmp_path), packed=True, layout=Layout.Variables
+    )
+    with pytest.raises(ValueError):
+        next(items)
+    assert not list(tmp_path.iterdir())
+
+
 def test_create_collection() -> None:
     collection = stac.create_collection()
     assert collection.id == "noaa-cdr-sea-surface-temperature-whoi"
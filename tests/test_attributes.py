@@ -0,0 +1,72 @@
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+import xarray
+from stactools.noaa_cdr import attributes, stac
+from stactools.noaa_cdr.attributes import DatasetAttributes
+from stactools.noaa_cdr.profile import DatasetProfile
+
+from . import run_command, test_data
+
+
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        "seaice_conc_daily_nh_20211231_f17_v04r00.nc",
+        "seaice_conc_monthly_sh_202112_f17_v04r00.nc",
+    ],
+)
+def test_read(file_name: str) -> None:
+    path = test_data.get_path(f"data-files/{file_name}")
+    dataset_attributes = attributes.read(path)
+    with xarray.open_dataset(path, decode_times=False) as ds:
+        assert dataset_attributes.attrs.keys() == ds.attrs.keys()
+        for key, value in ds.attrs.items():
+            assert repr(dataset_attributes.attrs[key]) == repr(value)
+        assert dataset_attributes.title == ds.title
+        assert dataset_attributes.projection.attrs == ds.projection.attrs
+        assert dataset_attributes.projection.proj4text == ds.projection.proj4text
+        assert dataset_attributes.sizes == dict(ds.sizes)
+        assert DatasetProfile.build(dataset_attributes) == DatasetProfile.build(ds)
+
+
+def test_missing_attribute() -> None:
+    dataset_attributes = DatasetAttributes({"title": "a"}, {}, {})
+    assert "id" not in dataset_attributes.attrs
+    with pytest.raises(AttributeError):
+        dataset_attributes.id
+
+
+def test_create_item_without_dataset(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: List[Any] = list()
+    monkeypatch.setattr(
+        xarray, "open_dataset", lambda *args, **kwargs: calls.append(args)
+    )
+    path = test_data.get_path("data-files/seaice_conc_monthly_nh_202112_f17_v04r00.nc")
+    item = stac.create_item(path)
+    assert item.properties["start_datetime"] == "2021-12-01T00:00:00Z"
+    assert not calls
+
+
+def test_create_item_decode_times_deprecated() -> None:
+    path = test_data.get_path("data-files/seaice_conc_monthly_nh_202112_f17_v04r00.nc")
+    with pytest.deprecated_call():
+        item = stac.create_item(path, decode_times=False)
+    assert item.to_dict() == stac.create_item(path).to_dict()
+
+
+def test_create_item_command_without_dataset(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls: List[Any] = list()
+    monkeypatch.setattr(
+        xarray, "open_dataset", lambda *args, **kwargs: calls.append(args)
+    )
+    path = test_data.get_path("data-files/seaice_conc_monthly_nh_202112_f17_v04r00.nc")
+    result = run_command(
+        f"noaa-cdr sea-ice-concentration create-item {path} {tmp_path}/item.json"
+    )
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "item.json").exists()
+    assert not calls
@@ -0,0 +1,106 @@
+import os
+from pathlib import Path
+
+import pytest
+from stactools.noaa_cdr import cache, stac
+from stactools.noaa_cdr.cache import Cache
+from stactools.noaa_cdr.session import DatasetSession
+
+from . import run_command, test_data
+from .conftest import HttpServer
+
+
+def test_open(tmp_path: Path, http_server: HttpServer) -> None:
+    http_server.files["a.nc"] = b"a" * 100
+    c = Cache(str(tmp_path))
+    with c.open(http_server.url("a.nc")) as file:
+        assert file.read() == b"a" * 100
+    requests = len(http_server.requests)
+    assert requests > 0
+    with c.open(http_server.url("a.nc")) as file:
+        assert file.read() == b"a" * 100
+    assert [request[0] for request in http_server.requests[requests:]] == ["HEAD"]
+    assert c.size() == 100
+
+
+def test_open_changed(tmp_path: Path, http_server: HttpServer) -> None:
+    http_server.files["a.nc"] = b"old"
+    c = Cache(str(tmp_path))
+    with c.open(http_server.url("a.nc")) as file:
+        assert file.read() == b"old"
+    assert c.get(http_server.url("a.nc")) == c.path(http_server.url("a.nc"))
+    http_server.files["a.nc"] = b"new"
+    assert c.get(http_server.url("a.nc")) is None
+    with c.open(http_server.url("a.nc")) as file:
+        assert file.read() == b"new"
+    assert c.get(http_server.url("a.nc")) == c.path(http_server.url("a.nc"))
+    assert c.size() == 3
+
+
+def test_evicts_least_recently_used(tmp_path: Path, http_server: HttpServer) -> None:
+    for name in ["a.nc", "b.nc", "c.nc"]:
+        http_server.files[name] = b"x" * 1000
+    c = Cache(str(tmp_path), max_size=2500)
+    for name in ["a.nc", "b.nc"]:
+        with c.open(http_server.url(name)):
+            pass
+    os.utime(c.path(http_server.url("a.nc")), (0, 0))
+    os.utime(c.path(http_server.url("b.nc")), (1, 1))
+    with c.open(http_server.url("a.nc")):
+        pass
+    with c.open(http_server.url("c.nc")):
+        pass
+    assert os.path.exists(c.path(http_server.url("a.nc")))
+    assert not os.path.exists(c.path(http_server.url("b.nc")))
+    assert os.path.exists(c.path(http_server.url("c.nc")))
+    assert c.size() == 2000
+
+
+def test_open_href(
+    tmp_path: Path, http_server: HttpServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv(cache.CACHE_DIR_ENVIRONMENT_VARIABLE, "")
+    path = test_data.get_path("data-files/seaice_conc_monthly_nh_202112_f17_v04r00.nc")
+    with open(path, "rb") as file:
+        http_server.files["seaice.nc"] = file.read()
+    href = http_server.url("seaice.nc")
+    item = stac.create_item(href)
+
+    monkeypatch.setenv(cache.CACHE_DIR_ENVIRONMENT_VARIABLE, str(tmp_path))
+    # Attribute-only reads use Range requests instead of the cache, so the
+    # file is opened as a dataset.
+    with DatasetSession(href) as session:
+        assert stac.create_item(href, session=session).to_dict() == item.to_dict()
+    requests = len(http_server.requests)
+    with DatasetSession(href) as session:
+        assert stac.create_item(href, session=session).to_dict() == item.to_dict()
+    assert all(request[0] == "HEAD" for request in http_server.requests[requests:])
+    name = os.path.basename(Cache(str(tmp_path)).path(href))
+    assert sorted(os.listdir(tmp_path)) == [f".{name}.json", name]
+
+    with cache.open_href(path) as file:
+        assert file.read(4) == b"\x89HDF"
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_parse_size() -> None:
+    assert cache.parse_size("100") == 100
+    assert cache.parse_size("2K") == 2048
+    assert cache.parse_size("1.5GiB") == 1536 * 1024**2
+    with pytest.raises(ValueError):
+        cache.parse_size("lots")
+
+
+def test_cache_dir_option(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Setting, rather than deleting, makes sure that the variables are restored.
+    monkeypatch.setenv(cache.CACHE_DIR_ENVIRONMENT_VARIABLE, "")
+    monkeypatch.setenv(cache.CACHE_SIZE_ENVIRONMENT_VARIABLE, "")
+    result = run_command(
+        f"noaa-cdr --cache-dir {tmp_path} --cache-size 1G "
+        f"sea-surface-temperature-whoi create-collection {tmp_path}/out.json"
+    )
+    assert result.exit_code == 0, result.output
+    c = Cache.from_environment()
+    assert c is not None
+    assert c.directory == str(tmp_path)
+    assert c.max_size == 1024**3
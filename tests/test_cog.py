@@ -0,0 +1,136 @@
+from pathlib import Path
+from unittest.mock import Mock
+
+import numpy
+import pytest
+import rasterio
+import xarray
+from stactools.noaa_cdr import cog
+from stactools.noaa_cdr.compression import Compression
+from stactools.noaa_cdr.profile import BandProfile
+
+from . import test_data
+
+
+def test_write(tmp_path: Path) -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    with xarray.open_dataset(path, mask_and_scale=False) as ds:
+        profile = BandProfile.build(ds, "cdr_seaice_conc")
+        values = ds["cdr_seaice_conc"].values.squeeze()
+    cog_path = tmp_path / "cdr_seaice_conc.tif"
+    cog.write(values, str(cog_path), profile)
+    with rasterio.open(cog_path) as dataset:
+        assert dataset.driver == "GTiff"
+        assert dataset.tags(ns="IMAGE_STRUCTURE")["LAYOUT"] == "COG"
+        assert dataset.compression.value == "DEFLATE"
+        assert dataset.block_shapes == [(512, 512)]
+        assert dataset.crs == profile.crs
+        assert dataset.transform == profile.transform
+        assert dataset.nodata == profile.nodata
+        assert dataset.dtypes == (profile.data_type,)
+        numpy.testing.assert_array_equal(dataset.read(1), values)
+
+
+def test_cogify_workers(tmp_path: Path) -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    serial = cog.cogify(path, str(tmp_path / "serial"))
+    parallel = cog.cogify(path, str(tmp_path / "parallel"), workers=2)
+    assert list(parallel) == list(serial)
+    for key, asset in parallel.items():
+        assert asset.to_dict()["raster:bands"] == serial[key].to_dict()["raster:bands"]
+        with rasterio.open(asset.href) as a, rasterio.open(serial[key].href) as b:
+            numpy.testing.assert_array_equal(a.read(1), b.read(1))
+
+
+def test_cogify_compression(tmp_path: Path) -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    assets = cog.cogify(
+        path,
+        str(tmp_path),
+        compression=Compression.parse("zstd-predictor:9"),
+        variable_compression={"cdr_seaice_conc": Compression("none")},
+    )
+    with rasterio.open(assets["cdr_seaice_conc"].href) as dataset:
+        assert dataset.compression is None
+    with rasterio.open(assets["nsidc_bt_seaice_conc"].href) as dataset:
+        assert dataset.compression.value == "ZSTD"
+        assert dataset.tags(ns="IMAGE_STRUCTURE")["PREDICTOR"] == "2"
+
+
+@pytest.mark.parametrize("flip", [False, True])
+@pytest.mark.parametrize("remap", [False, True])
+def test_windows(flip: bool, remap: bool) -> None:
+    values = numpy.arange(1100 * 7).reshape(1100, 7)
+    profile = Mock(needs_vertical_flip=flip, needs_longitude_remap=remap)
+    expected = values
+    if flip:
+        expected = numpy.flipud(expected)
+    if remap:
+        expected = numpy.roll(expected, 3, 1)
+    actual = numpy.zeros_like(values)
+    for window, block in cog.windows(values, profile):
+        assert numpy.shares_memory(block, values)
+        actual[window.toslices()] = block
+    numpy.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.external_data
+def test_write_streamed(tmp_path: Path) -> None:
+    path = test_data.get_external_data("oisst-avhrr-v02r01.20220913.nc")
+    with xarray.open_dataset(path, mask_and_scale=False) as ds:
+        profile = BandProfile.build(ds, "sst")
+        assert profile.needs_vertical_flip and profile.needs_longitude_remap
+        cog.write(ds["sst"].values.squeeze(), str(tmp_path / "in-memory.tif"), profile)
+        cog.write_streamed(ds["sst"].squeeze(), str(tmp_path / "streamed.tif"), profile)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "in-memory.tif",
+        "streamed.tif",
+    ]
+    with rasterio.open(tmp_path / "streamed.tif") as dataset:
+        assert dataset.tags(ns="IMAGE_STRUCTURE")["LAYOUT"] == "COG"
+        with rasterio.open(tmp_path / "in-memory.tif") as expected:
+            assert dataset.profile == expected.profile
+            numpy.testing.assert_array_equal(dataset.read(1), expected.read(1))
+
+
+def test_cogify_streaming(tmp_path: Path) -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    streamed = cog.cogify(path, str(tmp_path / "streamed"), streaming=True)
+    in_memory = cog.cogify(path, str(tmp_path / "in-memory"))
+    assert list(streamed) == list(in_memory)
+    for key, asset in streamed.items():
+        with rasterio.open(asset.href) as a, rasterio.open(in_memory[key].href) as b:
+            numpy.testing.assert_array_equal(a.read(1), b.read(1))
+    with pytest.raises(ValueError):
+        cog.cogify(path, str(tmp_path), workers=2, streaming=True)
+
+
+def test_write_stacked(tmp_path: Path) -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    variables = ["cdr_seaice_conc", "nsidc_bt_seaice_conc"]
+    with xarray.open_dataset(path, mask_and_scale=False) as ds:
+        bands = [
+            (ds[v].values.squeeze(), BandProfile.build(ds, v), v) for v in variables
+        ]
+        stdev = BandProfile.build(ds, "stdev_of_cdr_seaice_conc")
+    cog_path = tmp_path / "stacked.tif"
+    cog.write_stacked(bands, str(cog_path))
+    with rasterio.open(cog_path) as dataset:
+        assert dataset.tags(ns="IMAGE_STRUCTURE")["LAYOUT"] == "COG"
+        assert dataset.count == 2
+        assert dataset.descriptions == tuple(variables)
+        for i, (values, _, _) in enumerate(bands, start=1):
+            numpy.testing.assert_array_equal(dataset.read(i), values)
+    with pytest.raises(ValueError):
+        cog.write_stacked([*bands, (bands[0][0], stdev, "stdev")], str(cog_path))
+
+
+def test_promote() -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    with xarray.open_dataset(path, mask_and_scale=False) as ds:
+        profiles = [
+            BandProfile.build(ds, "cdr_seaice_conc"),
+            BandProfile.build(ds, "stdev_of_cdr_seaice_conc"),
+        ]
+    assert [p.data_type for p in profiles] == ["uint8", "float32"]
+    assert [p.data_type for p in cog.promote(profiles)] == ["float32", "float32"]
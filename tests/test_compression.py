@@ -0,0 +1,49 @@
+import pytest
+from stactools.noaa_cdr.compression import (
+    DEFAULT_COMPRESSION,
+    Compression,
+    select_compression,
+)
+
+
+@pytest.mark.parametrize(
+    "name,expected",
+    [
+        ("deflate", Compression("deflate")),
+        ("deflate-predictor", Compression("deflate", predictor=True)),
+        ("zstd:3", Compression("zstd", level=3)),
+        ("ZSTD-predictor:19", Compression("zstd", predictor=True, level=19)),
+        ("lzw", Compression("lzw")),
+        ("none", Compression("none")),
+    ],
+)
+def test_parse(name: str, expected: Compression) -> None:
+    compression = Compression.parse(name)
+    assert compression == expected
+    assert Compression.parse(str(compression)) == compression
+
+
+@pytest.mark.parametrize(
+    "name", ["jpeg", "none-predictor", "lzw:3", "zstd:23", "deflate:fast"]
+)
+def test_parse_invalid(name: str) -> None:
+    with pytest.raises(ValueError):
+        Compression.parse(name)
+
+
+def test_options() -> None:
+    assert DEFAULT_COMPRESSION.options() == {"compress": "deflate"}
+    assert Compression.parse("zstd-predictor:9").options() == {
+        "compress": "zstd",
+        "predictor": "YES",
+        "level": 9,
+    }
+
+
+def test_select_compression() -> None:
+    zstd = Compression("zstd")
+    lzw = Compression("lzw")
+    assert select_compression("a") == DEFAULT_COMPRESSION
+    assert select_compression("a", zstd) == zstd
+    assert select_compression("a", zstd, {"a": lzw}) == lzw
+    assert select_compression("b", zstd, {"a": lzw}) == zstd
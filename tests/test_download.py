@@ -0,0 +1,104 @@
+import dataclasses
+import os
+from pathlib import Path
+
+import pytest
+from stactools.noaa_cdr import download
+from stactools.noaa_cdr.download import DownloadStatus
+
+from .conftest import HttpServer
+
+
+def test_download(tmp_path: Path, http_server: HttpServer) -> None:
+    http_server.files["a.nc"] = b"a" * 1000
+    http_server.files["b.nc"] = b"b" * 10
+    hrefs = [http_server.url("a.nc"), http_server.url("b.nc")]
+    results = list(download.download(hrefs, str(tmp_path), workers=2, chunk_size=64))
+    assert sorted(result.status for result in results) == [
+        DownloadStatus.Downloaded,
+        DownloadStatus.Downloaded,
+    ]
+    assert (tmp_path / "a.nc").read_bytes() == http_server.files["a.nc"]
+    assert (tmp_path / "b.nc").read_bytes() == http_server.files["b.nc"]
+    assert not (tmp_path / "a.nc.part").exists()
+
+    http_server.requests.clear()
+    results = list(download.download(hrefs, str(tmp_path), workers=2))
+    assert [result.status for result in results] == [DownloadStatus.Unchanged] * 2
+    assert sorted(method for method, _, _ in http_server.requests) == ["HEAD"] * 2
+
+    http_server.files["b.nc"] = b"c" * 20
+    result = download.download_file(http_server.url("b.nc"), str(tmp_path / "b.nc"))
+    assert result.status == DownloadStatus.Downloaded
+    assert (tmp_path / "b.nc").read_bytes() == http_server.files["b.nc"]
+
+
+def test_download_resumes(tmp_path: Path, http_server: HttpServer) -> None:
+    http_server.files["a.nc"] = bytes(range(256)) * 4
+    href = http_server.url("a.nc")
+    path = str(tmp_path / "a.nc")
+    download.download_file(href, path)
+    _interrupt(path, 300)
+
+    http_server.requests.clear()
+    result = download.download_file(href, path, chunk_size=100)
+    assert result.status == DownloadStatus.Resumed
+    assert result.bytes_transferred == 1024 - 300
+    assert http_server.requests[-1] == ("GET", "a.nc", "bytes=300-")
+    with open(path, "rb") as file:
+        assert file.read() == http_server.files["a.nc"]
+    assert not os.path.exists(path + ".part")
+
+
+def test_download_finishes_a_complete_part_file(
+    tmp_path: Path, http_server: HttpServer
+) -> None:
+    http_server.files["a.nc"] = b"a" * 1000
+    href = http_server.url("a.nc")
+    path = str(tmp_path / "a.nc")
+    download.download_file(href, path)
+    _interrupt(path, 1000)
+
+    http_server.requests.clear()
+    result = download.download_file(href, path)
+    assert result.status == DownloadStatus.Resumed
+    assert result.bytes_transferred == 0
+    assert [method for method, _, _ in http_server.requests] == ["HEAD"]
+    with open(path, "rb") as file:
+        assert file.read() == http_server.files["a.nc"]
+    assert not os.path.exists(path + ".part")
+    validators = download._read_validators(path)
+    assert validators and validators.complete
+
+
+def test_download_restarts_a_changed_file(
+    tmp_path: Path, http_server: HttpServer
+) -> None:
+    http_server.files["a.nc"] = b"a" * 1000
+    href = http_server.url("a.nc")
+    path = str(tmp_path / "a.nc")
+    download.download_file(href, path)
+    _interrupt(path, 300)
+
+    http_server.files["a.nc"] = b"b" * 1000
+    result = download.download_file(href, path)
+    assert result.status == DownloadStatus.Downloaded
+    with open(path, "rb") as file:
+        assert file.read() == http_server.files["a.nc"]
+
+
+def test_download_workers(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        list(download.download([], str(tmp_path), workers=0))
+
+
+def _interrupt(path: str, size: int) -> None:
+    # Leaves the state of a download that stopped after ``size`` bytes.
+    with open(path, "rb") as file:
+        data = file.read(size)
+    os.remove(path)
+    with open(path + ".part", "wb") as file:
+        file.write(data)
+    validators = download._read_validators(path)
+    assert validators
+    download._write_validators(path, dataclasses.replace(validators, complete=False))
@@ -0,0 +1,149 @@
+import dataclasses
+import os
+import shutil
+from pathlib import Path
+from typing import Dict
+
+import pytest
+import xarray
+from stactools.noaa_cdr import cog
+from stactools.noaa_cdr import manifest as manifest_module
+from stactools.noaa_cdr.manifest import Manifest
+from stactools.noaa_cdr.profile import BandProfile
+
+from . import test_data
+
+NETCDF = "data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc"
+
+
+def modification_times(directory: Path) -> Dict[str, int]:
+    return dict((p.name, p.stat().st_mtime_ns) for p in directory.glob("*.tif"))
+
+
+def test_entry(tmp_path: Path) -> None:
+    path = test_data.get_path(NETCDF)
+    with xarray.open_dataset(path, mask_and_scale=False) as ds:
+        profile = BandProfile.build(ds, "cdr_seaice_conc")
+        values = ds["cdr_seaice_conc"].values.squeeze()
+    manifest = Manifest(str(tmp_path / "manifest.json"))
+    entry = manifest.entry(path, "cdr_seaice_conc", None, [profile])
+    assert entry.source_fingerprint["size"] == os.path.getsize(path)
+    assert entry.values_hash is None
+    assert (
+        entry.with_values([values]).values_hash
+        == entry.with_values([values.copy()]).values_hash
+    )
+
+    cog_path = tmp_path / "cdr_seaice_conc.tif"
+    assert not manifest.is_current(str(cog_path), entry)
+    cog.write(values, str(cog_path), profile)
+    manifest.record(str(cog_path), entry.with_values([values]))
+    assert manifest.is_current(str(cog_path), entry)
+    assert manifest.is_current(str(cog_path), entry.with_values([values]))
+    assert not manifest.is_current(str(cog_path), entry.with_values([values + 1]))
+    assert not manifest.is_current(
+        str(cog_path), manifest.entry(path, "cdr_seaice_conc", 0, [profile])
+    )
+
+    manifest.save()
+    reopened = Manifest(str(tmp_path / "manifest.json"))
+    assert reopened.entries == manifest.entries
+    assert list(reopened.entries) == ["cdr_seaice_conc.tif"]
+    assert reopened.is_current(str(cog_path), entry)
+
+    cog_path.write_bytes(b"not a cog")
+    assert not reopened.is_current(str(cog_path), entry)
+
+
+def test_is_current_only_hashes_changed_outputs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = test_data.get_path(NETCDF)
+    with xarray.open_dataset(path, mask_and_scale=False) as ds:
+        profile = BandProfile.build(ds, "cdr_seaice_conc")
+        values = ds["cdr_seaice_conc"].values.squeeze()
+    manifest = Manifest(str(tmp_path / "manifest.json"))
+    entry = manifest.entry(path, "cdr_seaice_conc", None, [profile])
+    cog_path = tmp_path / "cdr_seaice_conc.tif"
+    cog.write(values, str(cog_path), profile)
+    manifest.record(str(cog_path), entry.with_values([values]))
+    recorded = manifest.entries["cdr_seaice_conc.tif"]
+    assert recorded.output_size == cog_path.stat().st_size
+    assert recorded.output_mtime_ns == cog_path.stat().st_mtime_ns
+
+    hashed = list()
+    file_hash = manifest_module.file_hash
+
+    def counting_file_hash(path: str) -> str:
+        hashed.append(path)
+        return file_hash(path)
+
+    monkeypatch.setattr(manifest_module, "file_hash", counting_file_hash)
+    assert manifest.is_current(str(cog_path), entry)
+    assert manifest.is_current(str(cog_path), entry.with_values([values]))
+    manifest.record(str(cog_path), entry)
+    assert not hashed
+
+    os.utime(cog_path, ns=(0, 0))
+    assert manifest.is_current(str(cog_path), entry)
+    assert hashed == [str(cog_path)]
+
+
+def test_record_drops_values_hash_of_changed_source(tmp_path: Path) -> None:
+    path = test_data.get_path(NETCDF)
+    with xarray.open_dataset(path, mask_and_scale=False) as ds:
+        profile = BandProfile.build(ds, "cdr_seaice_conc")
+        values = ds["cdr_seaice_conc"].values.squeeze()
+    manifest = Manifest(str(tmp_path / "manifest.json"))
+    entry = manifest.entry(path, "cdr_seaice_conc", None, [profile])
+    cog_path = tmp_path / "cdr_seaice_conc.tif"
+    cog.write(values, str(cog_path), profile)
+    manifest.record(str(cog_path), entry.with_values([values]))
+
+    # A streaming write, without a values hash, from the same source.
+    manifest.record(str(cog_path), entry)
+    assert manifest.entries["cdr_seaice_conc.tif"].values_hash is not None
+
+    # A streaming write from a changed source.
+    changed = dataclasses.replace(entry, source_fingerprint={"size": 0})
+    cog.write(values + 1, str(cog_path), profile)
+    manifest.record(str(cog_path), changed)
+    assert manifest.entries["cdr_seaice_conc.tif"].values_hash is None
+    assert not manifest.is_current(str(cog_path), entry.with_values([values]))
+
+
+def test_unsupported_version(tmp_path: Path) -> None:
+    path = tmp_path / "manifest.json"
+    path.write_text('{"version": 0, "entries": {}}')
+    with pytest.raises(ValueError):
+        Manifest(str(path))
+
+
+def test_cogify(tmp_path: Path) -> None:
+    path = str(tmp_path / "source.nc")
+    shutil.copy(test_data.get_path(NETCDF), path)
+    directory = tmp_path / "cogs"
+    manifest = Manifest(str(tmp_path / "manifest.json"))
+    cog.cogify(path, str(directory), manifest=manifest)
+    assert len(Manifest(str(tmp_path / "manifest.json")).entries) == 8
+    written = modification_times(directory)
+
+    # Unchanged source: nothing is read or written.
+    cog.cogify(path, str(directory), manifest=Manifest(manifest.path))
+    assert modification_times(directory) == written
+
+    # Touched source with the same values: nothing is written.
+    os.utime(path, ns=(0, 0))
+    cog.cogify(path, str(directory), manifest=Manifest(manifest.path))
+    assert modification_times(directory) == written
+    assert Manifest(manifest.path).entries[
+        "cogs/source-cdr_seaice_conc.tif"
+    ].source_fingerprint["mtime"] == pytest.approx(0)
+
+    # A removed COG is the only one written.
+    (directory / "source-cdr_seaice_conc.tif").unlink()
+    cog.cogify(path, str(directory), manifest=Manifest(manifest.path))
+    rewritten = modification_times(directory)
+    assert set(name for name in rewritten if rewritten[name] != written.get(name)) == {
+        "source-cdr_seaice_conc.tif"
+    }
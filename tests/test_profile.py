@@ -1,5 +1,11 @@
+import dataclasses
+from typing import Optional
+
+import numpy
+import pytest
 import xarray
-from stactools.noaa_cdr.profile import BandProfile
+from pyproj.enums import WktVersion
+from stactools.noaa_cdr.profile import BandProfile, DatasetProfile, cached_crs
 
 from . import test_data
 
@@ -19,3 +25,72 @@ def test_title() -> None:
         "NOAA/NSIDC Climate Data Record of Passive Microwave Daily Northern "
         "Hemisphere Sea Ice Concentration"
     )
+
+
+def test_dataset_profile() -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    with xarray.open_dataset(path) as dataset:
+        dataset_profile = DatasetProfile.build(dataset)
+        band_profile = BandProfile.build(
+            dataset, "cdr_seaice_conc", dataset_profile=dataset_profile
+        )
+        assert band_profile.dataset_profile is dataset_profile
+        assert band_profile == BandProfile.build(dataset, "cdr_seaice_conc")
+
+
+@pytest.mark.external_data
+def test_template() -> None:
+    path = test_data.get_external_data("heat_content_anomaly_0-2000_yearly.nc")
+    with xarray.open_dataset(path, decode_times=False) as dataset:
+        template = BandProfile.template(dataset, "h18_hc")
+        for i in range(len(dataset.time)):
+            profile = BandProfile.build(
+                dataset, "h18_hc", lambda d: d.isel(time=i).squeeze()
+            )
+            assert template.time_step(i) == dataclasses.replace(profile, time_index=i)
+    assert template.time_index is None
+
+
+def test_float_nodata() -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    with xarray.open_dataset(path, mask_and_scale=False) as dataset:
+        band_profile = BandProfile.build(dataset, "stdev_of_cdr_seaice_conc")
+    assert band_profile.nodata == -1.0
+    with xarray.open_dataset(path) as dataset:
+        band_profile = BandProfile.build(dataset, "stdev_of_cdr_seaice_conc")
+    assert numpy.isnan(band_profile.nodata)
+
+
+def test_cog_overviews() -> None:
+    class Profile(BandProfile):
+        def overview_resampling(self) -> Optional[str]:
+            return "nearest"
+
+        def overview_count(self) -> Optional[int]:
+            return self.width // 1000
+
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    with xarray.open_dataset(path) as dataset:
+        band_profile = BandProfile.build(dataset, "cdr_seaice_conc")
+        profile = Profile.build(dataset, "cdr_seaice_conc")
+    assert "overview_resampling" not in band_profile.cog()
+    assert band_profile.cog()["overviews"] == "NONE"
+    band_profile.height = 1024
+    assert "overviews" not in band_profile.cog()
+    assert "overview_count" not in band_profile.cog()
+    assert profile.cog()["overview_resampling"] == "nearest"
+    assert profile.cog()["overviews"] == "NONE"
+    profile.width = 2048
+    assert profile.cog()["overview_count"] == 2
+
+
+def test_cached_crs() -> None:
+    path = test_data.get_path("data-files/seaice_conc_daily_nh_20211231_f17_v04r00.nc")
+    cached_crs.cache_clear()
+    with xarray.open_dataset(path) as dataset:
+        first = DatasetProfile.build(dataset)
+        second = DatasetProfile.build(dataset)
+    assert cached_crs.cache_info().misses == 1
+    assert cached_crs.cache_info().hits == 1
+    assert second.crs is first.crs
+    assert first.wkt2 == first.crs.to_wkt(WktVersion.WKT2_2019)
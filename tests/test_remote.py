@@ -0,0 +1,132 @@
+import os
+from pathlib import Path
+
+import pytest
+from stactools.noaa_cdr import attributes, cache, remote, stac
+from stactools.noaa_cdr.cache import Cache
+from stactools.noaa_cdr.remote import RangeFile
+
+from . import test_data
+from .conftest import HttpServer
+
+FILE_NAMES = [
+    "seaice_conc_daily_nh_20211231_f17_v04r00.nc",
+    "seaice_conc_monthly_sh_202112_f17_v04r00.nc",
+]
+
+
+@pytest.fixture
+def no_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(cache.CACHE_DIR_ENVIRONMENT_VARIABLE, "")
+
+
+def serve(http_server: HttpServer, file_name: str) -> str:
+    with open(test_data.get_path(f"data-files/{file_name}"), "rb") as file:
+        http_server.files[file_name] = file.read()
+    return http_server.url(file_name)
+
+
+def test_range_file(http_server: HttpServer) -> None:
+    data = bytes(range(256)) * 40
+    http_server.files["a.nc"] = data
+    with RangeFile(http_server.url("a.nc"), block_size=1000, max_blocks=2) as file:
+        assert file.size == len(data)
+        assert file.read(10) == data[:10]
+        assert file.request_count == 1
+        file.seek(990)
+        assert file.read(20) == data[990:1010]
+        assert file.request_count == 2
+        file.seek(-5, os.SEEK_END)
+        assert file.read(100) == data[-5:]
+        assert file.read(100) == b""
+        file.seek(2500)
+        assert file.read(3000) == data[2500:5500]
+        assert file.tell() == 5500
+        requests = file.request_count
+        file.seek(5000)
+        assert file.read(10) == data[5000:5010]
+        assert file.request_count == requests
+        file.seek(0)
+        assert file.read() == data
+    assert http_server.requests[0] == ("GET", "a.nc", "bytes=0-999")
+
+
+def test_range_file_evicts_least_recently_used(http_server: HttpServer) -> None:
+    http_server.files["a.nc"] = b"a" * 1000
+    with RangeFile(http_server.url("a.nc"), block_size=100, max_blocks=2) as file:
+        file.seek(100)
+        file.read(1)
+        file.seek(0)
+        file.read(1)
+        file.seek(200)
+        file.read(1)
+        requests = file.request_count
+        file.seek(0)
+        file.read(1)
+        assert file.request_count == requests
+        file.seek(100)
+        file.read(1)
+        assert file.request_count == requests + 1
+
+
+@pytest.mark.parametrize("file_name", FILE_NAMES)
+def test_read(file_name: str, http_server: HttpServer, no_cache: None) -> None:
+    href = serve(http_server, file_name)
+    dataset_attributes = attributes.read(href)
+    expected = attributes.read(test_data.get_path(f"data-files/{file_name}"))
+    assert repr(dataset_attributes.attrs) == repr(expected.attrs)
+    assert dataset_attributes.sizes == expected.sizes
+    assert all(range_ is not None for _, _, range_ in http_server.requests)
+    assert len(http_server.requests) < len(http_server.files[file_name]) // (
+        remote.DEFAULT_BLOCK_SIZE
+    )
+
+
+def test_create_item(http_server: HttpServer, no_cache: None) -> None:
+    file_name = FILE_NAMES[0]
+    href = serve(http_server, file_name)
+    item = stac.create_item(href)
+    expected = stac.create_item(test_data.get_path(f"data-files/{file_name}"))
+    for asset in [*item.assets.values(), *expected.assets.values()]:
+        asset.href = os.path.basename(asset.href)
+    assert item.to_dict() == expected.to_dict()
+
+
+def test_read_many(http_server: HttpServer, no_cache: None) -> None:
+    hrefs = [serve(http_server, file_name) for file_name in FILE_NAMES]
+    expected = [attributes.read(href) for href in hrefs]
+    for dataset_attributes in [
+        list(attributes.read_many(hrefs)),
+        list(attributes.read_many(hrefs, workers=2)),
+    ]:
+        assert [a.attrs["id"] for a in dataset_attributes] == [
+            a.attrs["id"] for a in expected
+        ]
+    with pytest.raises(ValueError):
+        list(attributes.read_many(hrefs, workers=0))
+
+
+def test_read_cached(
+    tmp_path: Path, http_server: HttpServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv(cache.CACHE_DIR_ENVIRONMENT_VARIABLE, str(tmp_path))
+    href = serve(http_server, FILE_NAMES[0])
+    with Cache(str(tmp_path)).open(href):
+        pass
+    http_server.requests.clear()
+    assert attributes.read(href).attrs["id"]
+    assert [request[0] for request in http_server.requests] == ["HEAD"]
+
+
+def test_read_cached_changed(
+    tmp_path: Path, http_server: HttpServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv(cache.CACHE_DIR_ENVIRONMENT_VARIABLE, str(tmp_path))
+    href = serve(http_server, FILE_NAMES[0])
+    with Cache(str(tmp_path)).open(href):
+        pass
+    path = test_data.get_path(f"data-files/{FILE_NAMES[1]}")
+    with open(path, "rb") as file:
+        http_server.files[FILE_NAMES[0]] = file.read()
+    expected = attributes.read(path)
+    assert attributes.read(href).attrs["id"] == expected.attrs["id"]
@@ -0,0 +1,66 @@
+import os
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+import xarray
+from stactools.noaa_cdr.sea_ice_concentration import stac
+from stactools.noaa_cdr.session import DatasetSession
+
+from . import run_command, test_data
+
+SEA_ICE_PATH = test_data.get_path(
+    "data-files/seaice_conc_monthly_nh_202112_f17_v04r00.nc"
+)
+
+
+@pytest.fixture
+def open_dataset_calls(monkeypatch: pytest.MonkeyPatch) -> List[Any]:
+    calls = list()
+    open_dataset = xarray.open_dataset
+
+    def counting_open_dataset(*args: Any, **kwargs: Any) -> xarray.Dataset:
+        calls.append(args)
+        return open_dataset(*args, **kwargs)
+
+    monkeypatch.setattr(xarray, "open_dataset", counting_open_dataset)
+    return calls
+
+
+def test_create_item(tmp_path: Path, open_dataset_calls: List[Any]) -> None:
+    expected = stac.create_item(SEA_ICE_PATH)
+    stac.add_cogs(expected, str(tmp_path / "expected"))
+    assert len(open_dataset_calls) == 1
+
+    open_dataset_calls.clear()
+    with DatasetSession(SEA_ICE_PATH) as session:
+        item = stac.create_item(SEA_ICE_PATH, session=session)
+        stac.add_cogs(item, str(tmp_path / "actual"), session=session)
+    assert len(open_dataset_calls) == 1
+
+    for asset in [*expected.assets.values(), *item.assets.values()]:
+        asset.href = os.path.basename(asset.href)
+    assert item.to_dict(include_self_link=False) == expected.to_dict(
+        include_self_link=False
+    )
+
+
+def test_closed_session() -> None:
+    session = DatasetSession(SEA_ICE_PATH)
+    with pytest.raises(ValueError):
+        session.dataset
+    with session:
+        assert session.dataset.attrs
+    with pytest.raises(ValueError):
+        session.dataset
+
+
+def test_create_item_command_opens_once(
+    tmp_path: Path, open_dataset_calls: List[Any]
+) -> None:
+    result = run_command(
+        f"noaa-cdr sea-ice-concentration create-item {SEA_ICE_PATH} "
+        f"{tmp_path}/item.json --cogs"
+    )
+    assert result.exit_code == 0, result.output
+    assert len(open_dataset_calls) == 1
@@ -1,7 +1,9 @@
 import datetime
 from typing import Tuple
 
+import numpy
 import pytest
+from dateutil.tz import tzutc
 from stactools.noaa_cdr import time
 from stactools.noaa_cdr.time import TimeResolution
 
@@ -70,3 +72,104 @@ def test_time_interval_as_str(
     time: datetime.datetime, time_resolution: TimeResolution, expected: str
 ) -> None:
     assert time_resolution.as_str(time) == expected
+
+
+@pytest.mark.parametrize(
+    "base_time",
+    [
+        datetime.datetime(1955, 1, 1, tzinfo=tzutc()),
+        datetime.datetime(2022, 1, 31, 13, 5, 7),
+    ],
+)
+def test_add_months_to_datetimes(base_time: datetime.datetime) -> None:
+    months = numpy.concatenate([numpy.arange(-30, 30), numpy.arange(0.5, 800, 1.37)])
+    datetimes = time.add_months_to_datetimes(base_time, months)
+    for month, dt in zip(months, datetimes):
+        expected = time.add_months_to_datetime(base_time, month)
+        assert dt.item() == expected.replace(tzinfo=None)
+
+
+@pytest.mark.parametrize(
+    "time_resolution",
+    [
+        TimeResolution.Monthly,
+        TimeResolution.Seasonal,
+        TimeResolution.Yearly,
+        TimeResolution.Pentadal,
+    ],
+)
+def test_datetime_bounds_array_and_as_str_array(
+    time_resolution: TimeResolution,
+) -> None:
+    datetimes = time.add_months_to_datetimes(
+        datetime.datetime(1955, 1, 1), numpy.arange(0.5, 800, 1.37)
+    )
+    starts, ends = time_resolution.datetime_bounds_array(datetimes)
+    strings = time_resolution.as_str_array(datetimes)
+    for i, dt in enumerate(datetimes):
+        assert time_resolution.datetime_bounds(dt.item()) == (
+            starts[i].item(),
+            ends[i].item(),
+        )
+        assert time_resolution.as_str(dt.item()) == strings[i]
+
+
+def test_time_axis() -> None:
+    axis = time.TimeAxis.from_months(
+        datetime.datetime(1955, 1, 1), numpy.arange(0.5, 24), TimeResolution.Monthly
+    )
+    assert len(axis) == 24
+    assert axis.select() == range(0, 24)
+    assert axis.select(datetime.datetime(1955, 3, 1)) == range(2, 24)
+    assert axis.select(datetime.datetime(1955, 2, 28, 23, 59, 59)) == range(1, 24)
+    assert axis.select(end=datetime.datetime(1955, 3, 1)) == range(0, 3)
+    assert axis.select(
+        datetime.datetime(1955, 3, 5, tzinfo=tzutc()),
+        datetime.datetime(1955, 3, 6, tzinfo=tzutc()),
+    ) == range(2, 3)
+    assert axis.select(datetime.datetime(1957, 1, 1)) == range(24, 24)
+    assert axis.last(2) == range(22, 24)
+    assert axis.select_intervals(
+        [
+            (datetime.datetime(1956, 11, 5), None),
+            (None, datetime.datetime(1955, 1, 4)),
+            (datetime.datetime(1955, 1, 1), datetime.datetime(1955, 1, 2)),
+        ]
+    ) == [0, 22, 23]
+
+
+def test_time_axis_from_datetime64() -> None:
+    axis = time.TimeAxis.from_datetime64(
+        numpy.arange("2021-08-31T00", "2021-08-31T12", 3, dtype="datetime64[h]"),
+        datetime.timedelta(minutes=90),
+    )
+    assert axis.select(
+        datetime.datetime(2021, 8, 31, 3), datetime.datetime(2021, 8, 31, 3)
+    ) == range(1, 2)
+    assert axis.select(datetime.datetime(2021, 8, 31, 4, 31)) == range(2, 4)
+
+
+def test_datetime64_to_datetimes() -> None:
+    datetimes = numpy.arange(
+        "1988-01-01T00", "1988-01-04T00", 3, dtype="datetime64[h]"
+    ).astype("datetime64[ns]")
+    assert time.datetime64_to_datetimes(datetimes) == [
+        time.datetime64_to_datetime(dt) for dt in datetimes
+    ]
+
+
+def test_time_axis_to_datetimes() -> None:
+    axis = time.TimeAxis.from_datetime64(
+        numpy.arange("2021-08-31T00", "2021-08-31T12", 3, dtype="datetime64[h]").astype(
+            "datetime64[ns]"
+        ),
+        datetime.timedelta(minutes=90),
+    )
+    datetimes, starts, ends = axis.to_datetimes(range(1, 3))
+    assert datetimes == [
+        datetime.datetime(2021, 8, 31, 3, tzinfo=tzutc()),
+        datetime.datetime(2021, 8, 31, 6, tzinfo=tzutc()),
+    ]
+    assert starts == [dt - datetime.timedelta(minutes=90) for dt in datetimes]
+    assert ends == [dt + datetime.timedelta(minutes=90) for dt in datetimes]
+    assert len(axis.to_datetimes()[0]) == 4